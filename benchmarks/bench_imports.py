@@ -0,0 +1,51 @@
+"""Import cost of the `takt` and `debussy` entry points, checked against a budget.
+
+Each entry module is imported in a fresh interpreter under
+`python -X importtime`; the cumulative time of the top-level import is
+taken as the best of several runs to smooth out noise. Exits non-zero when
+an entry point goes over its budget.
+
+Usage: python benchmarks/bench_imports.py [runs]
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = Path(__file__).resolve().parent.parent / "src"
+
+# Cumulative import time budgets, in milliseconds.
+BUDGETS_MS = {
+    "debussy.takt.cli": 60,
+    "debussy.__main__": 30,
+}
+
+
+def import_time_us(module: str) -> int:
+    env = dict(os.environ, PYTHONPATH=str(SRC))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env, check=True,
+    )
+    for line in reversed(result.stderr.splitlines()):
+        fields = [f.strip() for f in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1])
+    raise RuntimeError(f"no importtime entry for {module}")
+
+
+def main(runs: int = 5) -> int:
+    over = 0
+    for module, budget in BUDGETS_MS.items():
+        best = min(import_time_us(module) for _ in range(runs)) / 1000
+        status = "ok" if best <= budget else "OVER"
+        over += best > budget
+        print(f"{module:<20} {best:7.1f} ms  (budget {budget} ms)  {status}")
+    return 1 if over else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(int(sys.argv[1]) if len(sys.argv) > 1 else 5))
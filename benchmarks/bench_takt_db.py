@@ -0,0 +1,75 @@
+"""Per-call overhead of takt.db.get_db, before and after connection caching.
+
+"before" reproduces the original behaviour: a fresh connection, pragmas,
+migrations, every CREATE ... IF NOT EXISTS and the default-project check on
+each call. "cold" is the first call in a new process. "warm" is every call
+after that, which reuses the thread's connection.
+
+Usage: python benchmarks/bench_takt_db.py [iterations]
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from debussy.takt import db as takt_db
+
+
+@contextmanager
+def legacy_get_db(root: Path):
+    conn = sqlite3.connect(str(root / ".takt" / "takt.db"))
+    conn.row_factory = sqlite3.Row
+    try:
+        takt_db._configure(conn)
+        takt_db._apply_schema(conn)
+        takt_db._ensure_default_project(conn, root)
+        yield conn
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _query(conn: sqlite3.Connection) -> None:
+    conn.execute("SELECT status FROM tasks WHERE id = 'X-1'").fetchone()
+
+
+def _time(label: str, iterations: int, fn) -> None:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    per_call = (time.perf_counter() - start) / iterations * 1e6
+    print(f"{label:<8} {per_call:10.1f} us/call")
+
+
+def main(iterations: int = 500) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        takt_db.init_db(root)
+
+        def before():
+            with legacy_get_db(root) as conn:
+                _query(conn)
+
+        def cold():
+            takt_db.clear_connection_cache()
+            with takt_db.get_db(root) as conn:
+                _query(conn)
+
+        def warm():
+            with takt_db.get_db(root) as conn:
+                _query(conn)
+
+        print(f"get_db + one lookup, {iterations} iterations")
+        _time("before", iterations, before)
+        _time("cold", iterations, cold)
+        _time("warm", iterations, warm)
+        takt_db.clear_connection_cache()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,91 @@
+"""Latency of one `takt show`, direct vs through `takt serve`.
+
+"in-process" times cli.main() alone: "direct" clears the connection cache
+first, as a fresh `takt` process would, while "served" forwards over
+.takt/takt.sock to a server holding a warm connection. "end-to-end" starts
+a new interpreter per call, so it also includes startup and import cost.
+
+Usage: python benchmarks/bench_takt_server.py [iterations]
+"""
+
+from __future__ import annotations
+
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+from debussy.takt import db as takt_db
+from debussy.takt.cli import main as takt_main
+from debussy.takt.client import socket_path
+from debussy.takt.models import create_task
+from debussy.takt.server import TaktServer
+
+CMD = [sys.executable, "-m", "debussy.takt.cli"]
+
+
+def _report(label: str, iterations: int, start: float) -> None:
+    per_call = (time.perf_counter() - start) / iterations * 1e3
+    print(f"{label:<8} {per_call:8.2f} ms/call")
+
+
+def _in_process(label: str, iterations: int, argv: list[str], before=None) -> None:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        if before:
+            before()
+        with redirect_stdout(io.StringIO()):
+            takt_main(argv)
+    _report(label, iterations, start)
+
+
+def _end_to_end(label: str, iterations: int, argv: list[str], cwd: Path, env: dict) -> None:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        subprocess.run(CMD + argv, cwd=cwd, env=env, check=True, capture_output=True)
+    _report(label, iterations, start)
+
+
+def main(iterations: int = 20) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        (root / ".git").mkdir()
+        takt_db.init_db(root)
+        with takt_db.get_db(root) as db:
+            task_id = create_task(db, "Benchmark")["id"]
+        argv = ["show", task_id]
+        os.chdir(root)
+
+        print(f"takt show, in-process, {iterations * 10} iterations")
+        _in_process("direct", iterations * 10, argv, takt_db.clear_connection_cache)
+        server = TaktServer(root)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            _in_process("served", iterations * 10, argv)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        env = dict(os.environ, TAKT_NO_SERVER="1")
+        print(f"takt show, end-to-end, {iterations} iterations")
+        _end_to_end("direct", iterations, argv, root, env)
+        proc = subprocess.Popen(CMD + ["serve"], cwd=root, stderr=subprocess.DEVNULL)
+        try:
+            while not socket_path(root).exists():
+                time.sleep(0.01)
+            env.pop("TAKT_NO_SERVER")
+            _end_to_end("served", iterations, argv, root, env)
+        finally:
+            proc.terminate()
+            proc.wait()
+        takt_db.clear_connection_cache()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
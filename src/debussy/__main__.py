@@ -2,10 +2,17 @@
 """Entry point for python -m debussy."""
 
 import argparse
+import importlib
 import sys
 
-from . import cli, __version__
-from .board import cmd_board
+from . import __version__
+
+
+def _command(module: str, name: str):
+    """Handler that imports its module on first use, keeping startup imports small."""
+    def run(args):
+        return getattr(importlib.import_module(f".{module}", __package__), name)(args)
+    return run
 
 
 def main():
@@ -20,47 +27,47 @@ def main():
     p = subparsers.add_parser("start", help="Start the system")
     p.add_argument("requirement", nargs="?", help="Initial requirement")
     p.add_argument("--paused", action="store_true", help="Start with pipeline paused")
-    p.set_defaults(func=cli.cmd_start)
+    p.set_defaults(func=_command("cli", "cmd_start"))
 
     p = subparsers.add_parser("watch", help="Run watcher")
-    p.set_defaults(func=cli.cmd_watch)
+    p.set_defaults(func=_command("cli", "cmd_watch"))
 
     p = subparsers.add_parser("upgrade", help="Upgrade to latest")
-    p.set_defaults(func=cli.cmd_upgrade)
+    p.set_defaults(func=_command("cli", "cmd_upgrade"))
 
     p = subparsers.add_parser("config", help="View or set config")
     p.add_argument("key", nargs="?", help="Config key (max_total_agents, use_tmux_windows, base_branch, paused)")
     p.add_argument("value", nargs="?", help="Value to set")
-    p.set_defaults(func=cli.cmd_config)
+    p.set_defaults(func=_command("cli", "cmd_config"))
 
     p = subparsers.add_parser("clear", help="Clear all tasks and config")
     p.add_argument("-f", "--force", action="store_true", help="Skip confirmation")
-    p.set_defaults(func=cli.cmd_clear)
+    p.set_defaults(func=_command("cli", "cmd_clear"))
 
     p = subparsers.add_parser("pause", help="Pause pipeline, kill agents")
-    p.set_defaults(func=cli.cmd_pause)
+    p.set_defaults(func=_command("cli", "cmd_pause"))
 
     p = subparsers.add_parser("resume", help="Resume paused pipeline")
-    p.set_defaults(func=cli.cmd_resume)
+    p.set_defaults(func=_command("cli", "cmd_resume"))
 
     p = subparsers.add_parser("board", help="Show kanban board")
     p.add_argument("-p", "--project", help="Filter by project prefix")
-    p.set_defaults(func=cmd_board)
+    p.set_defaults(func=_command("board", "cmd_board"))
 
     p = subparsers.add_parser("kill", help="Kill current session")
     p.add_argument("--all", action="store_true", help="Kill all debussy sessions")
-    p.set_defaults(func=cli.cmd_kill)
+    p.set_defaults(func=_command("cli", "cmd_kill"))
 
     p = subparsers.add_parser("kill-agent", help="Kill a single agent by name or task ID")
     p.add_argument("name", help="Agent name or task ID (e.g. PKL-1)")
-    p.set_defaults(func=cli.cmd_kill_agent)
+    p.set_defaults(func=_command("cli", "cmd_kill_agent"))
 
     p = subparsers.add_parser("sessions", help="List running debussy sessions")
-    p.set_defaults(func=cli.cmd_sessions)
+    p.set_defaults(func=_command("cli", "cmd_sessions"))
 
     p = subparsers.add_parser("connect", help="Attach to a running session")
     p.add_argument("name", nargs="?", help="Session name (e.g. piklr)")
-    p.set_defaults(func=cli.cmd_connect)
+    p.set_defaults(func=_command("cli", "cmd_connect"))
 
     args = parser.parse_args()
 
@@ -7,8 +7,10 @@ from .config import (
     STAGE_DONE, STAGE_MERGING, STAGE_PARKED, STAGE_REVIEWING,
     STAGE_SECURITY_REVIEW, STATUS_BLOCKED,
 )
+from .agent import repo_root
+from .snapshot import read_snapshot
 from .status import get_running_agents, print_runtime_info
-from .takt import get_db, get_unresolved_deps, list_tasks
+from .takt import get_db, get_unresolved_deps_map, list_tasks
 
 
 BOARD_COLUMNS = [
@@ -152,17 +154,28 @@ def _render_vertical(columns, buckets, running, unresolved_deps, term_width):
     return "\n".join(lines)
 
 
-def cmd_board(args):
-    prefix = getattr(args, "project", None)
+def _load_board_tasks(prefix: str | None) -> tuple[list[dict], dict[str, list[str]]]:
+    """Tasks and unresolved deps from the watcher's snapshot, else the database."""
+    try:
+        snapshot = read_snapshot(repo_root())
+    except RuntimeError:
+        snapshot = None
+    if snapshot is not None:
+        tasks = snapshot["tasks"]
+        if prefix:
+            tasks = [t for t in tasks if t["id"].startswith(f"{prefix}-")]
+        return tasks, snapshot["unresolved"]
     with get_db() as db:
         all_tasks = list_tasks(db, prefix=prefix)
-        unresolved_deps = {}
-        for task in all_tasks:
-            task_id = task.get("id", "")
-            if task_id:
-                deps = get_unresolved_deps(db, task_id)
-                if deps:
-                    unresolved_deps[task_id] = deps
+        unresolved_deps = get_unresolved_deps_map(
+            db, [t["id"] for t in all_tasks] if prefix else None,
+        )
+    return all_tasks, unresolved_deps
+
+
+def cmd_board(args):
+    prefix = getattr(args, "project", None)
+    all_tasks, unresolved_deps = _load_board_tasks(prefix)
     running = get_running_agents()
 
     buckets = _build_buckets(all_tasks, running, unresolved_deps)
@@ -9,7 +9,17 @@ import tempfile
 from datetime import datetime
 from pathlib import Path
 
+# Stage names live in .stages so takt can import them without this module.
+from .stages import (
+    NEXT_STAGE, SECURITY_NEXT_STAGE,
+    STAGE_ACCEPTANCE, STAGE_BACKLOG, STAGE_DEVELOPMENT, STAGE_DONE, STAGE_MERGING,
+    STAGE_PARKED, STAGE_REVIEWING, STAGE_SECURITY_REVIEW,
+    STATUS_ACTIVE, STATUS_BLOCKED, STATUS_PENDING,
+)
+
 POLL_INTERVAL = 5
+# Longest the watcher sleeps when nothing it can observe changes (see waker.py).
+WAKE_TIMEOUT = 15
 HEARTBEAT_TICKS = 12
 COMMENT_TRUNCATE_LEN = 80
 YOLO_MODE = True
@@ -23,19 +33,6 @@ def _derive_session_name() -> str:
 SESSION_NAME = _derive_session_name()
 AGENT_TIMEOUT = 3600
 
-STAGE_BACKLOG = "backlog"
-STAGE_DEVELOPMENT = "development"
-STAGE_REVIEWING = "reviewing"
-STAGE_SECURITY_REVIEW = "security_review"
-STAGE_MERGING = "merging"
-STAGE_ACCEPTANCE = "acceptance"
-STAGE_PARKED = "parked"
-STAGE_DONE = "done"
-
-STATUS_PENDING = "pending"
-STATUS_ACTIVE = "active"
-STATUS_BLOCKED = "blocked"
-
 
 LABEL_PRIORITY = "priority"
 
@@ -70,6 +67,8 @@ DEFAULTS = {
     "quota_check": False,
     "quota_command": "ccusage blocks --active --json --token-limit max",
     "quota_margin": 0.97,
+    "log_retention_days": 30,
+    "sqlite_profile": "default",
     "max_role_agents": {
         "developer": 10,
         "reviewer": 10,
@@ -87,19 +86,6 @@ STAGE_TO_ROLE = {
     STAGE_DEVELOPMENT: "developer",
 }
 
-NEXT_STAGE = {
-    STAGE_BACKLOG: STAGE_DEVELOPMENT,
-    STAGE_DEVELOPMENT: STAGE_REVIEWING,
-    STAGE_REVIEWING: STAGE_MERGING,
-    STAGE_SECURITY_REVIEW: STAGE_MERGING,
-    STAGE_MERGING: STAGE_DONE,
-    STAGE_ACCEPTANCE: STAGE_DONE,
-}
-
-SECURITY_NEXT_STAGE = {
-    STAGE_REVIEWING: STAGE_SECURITY_REVIEW,
-}
-
 STAGE_SHORT = {
     STAGE_BACKLOG: "backlog",
     STAGE_DEVELOPMENT: "dev",
@@ -187,6 +173,7 @@ KNOWN_KEYS = {
     "project_type", "conductor_session_id", "test_command",
     "autonomy", "role_efforts",
     "quota_check", "quota_command", "quota_margin", "pause_reason", "paused_until",
+    "log_retention_days", "sqlite_profile",
 }
 
 
@@ -0,0 +1,151 @@
+"""One `git fetch origin` at a time, shared by everyone who asks.
+
+Spawns, transition gates, preflight checks and branch cleanup all need
+fresh tracking refs. fetch_origin() hands a caller the result of a fetch
+already in flight when that fetch covers what it asked for, and skips the
+network entirely when a covering fetch succeeded within FETCH_FRESH_FOR
+seconds. Callers that need only some branches name them, and just those
+refspecs are fetched; if that fails (a branch is gone from origin) a full
+fetch runs instead. Full fetches prune, so deleted branches don't linger
+as tracking refs. Every fetch invalidates the git ref snapshot.
+
+Callers that must see a push made just before they asked (the transition
+gates) pass force=True: only a fetch that started after the request
+answers them, never a recent or in-flight one.
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import threading
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from .gitrefs import invalidate
+
+FETCH_TIMEOUT = 30
+FETCH_FRESH_FOR = 10.0
+
+
+@dataclass
+class FetchResult:
+    ok: bool
+    error: str = ""
+    cached: bool = False
+
+
+def _refspec(branch: str) -> str:
+    return f"+refs/heads/{branch}:refs/remotes/origin/{branch}"
+
+
+def _run_fetch(branches: frozenset[str] | None, timeout: float) -> FetchResult:
+    if branches is None:
+        cmd = ["git", "fetch", "--prune", "origin"]
+    else:
+        cmd = ["git", "fetch", "origin", *(_refspec(b) for b in sorted(branches))]
+    env = os.environ.copy()
+    env["GIT_TERMINAL_PROMPT"] = "0"
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout, env=env)
+        return FetchResult(result.returncode == 0, result.stderr.strip())
+    except (subprocess.SubprocessError, OSError) as e:
+        return FetchResult(False, str(e))
+    finally:
+        invalidate()
+
+
+class _Fetch:
+    def __init__(self, branches: frozenset[str] | None):
+        self.branches = branches
+        self.started = time.monotonic()
+        self.done = threading.Event()
+        self.result: FetchResult | None = None
+
+    def covers(self, branches: frozenset[str] | None) -> bool:
+        return self.branches is None or (branches is not None and branches <= self.branches)
+
+
+class FetchCoordinator:
+    def __init__(self, fresh_for: float = FETCH_FRESH_FOR):
+        self.fresh_for = fresh_for
+        self._lock = threading.Lock()
+        self._inflight: _Fetch | None = None
+        self._full_at: float | None = None
+        self._branch_at: dict[str, float] = {}
+
+    def _fresh(self, branches: frozenset[str] | None, since: float) -> bool:
+        """Whether a successful fetch covering branches started at or after since."""
+        if self._full_at is not None and self._full_at >= since:
+            return True
+        return branches is not None and all(self._branch_at.get(b, -1.0) >= since for b in branches)
+
+    def _record(self, branches: frozenset[str] | None, result: FetchResult, started: float) -> None:
+        if not result.ok:
+            return
+        if branches is None:
+            self._full_at = started
+        else:
+            self._branch_at.update(dict.fromkeys(branches, started))
+
+    def fetch(
+        self,
+        branches: Iterable[str] | None = None,
+        timeout: float = FETCH_TIMEOUT,
+        force: bool = False,
+    ) -> FetchResult:
+        """Fetch origin (or only the given branches) unless recently done.
+
+        Blocks while another thread's fetch is in flight; if that fetch
+        covers this request and started recently enough its result is
+        returned, otherwise this call runs its own. With force, only a
+        fetch started after this call counts.
+        """
+        want = frozenset(branches) if branches is not None else None
+        requested = time.monotonic()
+        while True:
+            since = requested if force else requested - self.fresh_for
+            with self._lock:
+                if self._fresh(want, since):
+                    return FetchResult(True, cached=True)
+                current = self._inflight
+                mine = current is None
+                if mine:
+                    current = self._inflight = _Fetch(want)
+            if not mine:
+                current.done.wait()
+                if current.covers(want) and current.started >= since:
+                    return current.result
+                continue
+
+            got = want
+            result = _run_fetch(got, timeout)
+            if not result.ok and got is not None:
+                got = None
+                result = _run_fetch(None, timeout)
+            with self._lock:
+                self._record(got, result, current.started)
+                current.branches = got
+                current.result = result
+                self._inflight = None
+            current.done.set()
+            return result
+
+
+_coordinators: dict[str, FetchCoordinator] = {}
+_coordinators_lock = threading.Lock()
+
+
+def fetch_origin(
+    branches: Iterable[str] | None = None,
+    timeout: float = FETCH_TIMEOUT,
+    force: bool = False,
+) -> FetchResult:
+    """Fetch origin for the repository in the current directory."""
+    cwd = os.getcwd()
+    with _coordinators_lock:
+        coordinator = _coordinators.get(cwd)
+        if coordinator is None:
+            coordinator = _coordinators[cwd] = FetchCoordinator()
+    return coordinator.fetch(branches, timeout, force)
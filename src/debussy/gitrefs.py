@@ -0,0 +1,167 @@
+"""Snapshot of the repository's git refs, read with one for-each-ref.
+
+Branch existence and ahead/behind questions used to cost one git process
+each (rev-parse --verify, ls-remote, rev-list --count). GitRefSnapshot
+reads refs/heads and refs/remotes/origin in a single `git for-each-ref`
+and answers them from memory. On git 2.41+ the same call also returns
+ahead/behind counts against origin/<base_branch>; older git computes a
+pair on first use with one `rev-list --left-right --count`.
+
+The watcher enables caching: one snapshot serves a whole tick, and any
+code that moves refs (fetch, push, branch -D, worktree add -b) calls
+invalidate(). Without caching every ref_snapshot() call reads fresh refs,
+so one-shot CLI commands never see stale state.
+"""
+
+from __future__ import annotations
+
+import functools
+import os
+import re
+import subprocess
+
+from .config import get_config
+
+REF_PREFIXES = ("refs/heads/", "refs/remotes/origin/")
+# Where rev-parse looks for a short name, minus tags and pseudo-refs.
+_RESOLVE_PREFIXES = ("", "refs/", "refs/heads/", "refs/remotes/")
+
+
+@functools.lru_cache(maxsize=1)
+def _has_ahead_behind() -> bool:
+    """for-each-ref learned %(ahead-behind:<base>) in git 2.41."""
+    try:
+        out = subprocess.run(["git", "version"], capture_output=True, text=True, timeout=5).stdout
+    except (subprocess.SubprocessError, OSError):
+        return False
+    m = re.search(r"(\d+)\.(\d+)", out)
+    return bool(m) and (int(m.group(1)), int(m.group(2))) >= (2, 41)
+
+
+def _for_each_ref(fmt: str) -> list[list[str]] | None:
+    result = subprocess.run(
+        ["git", "for-each-ref", f"--format={fmt}", *REF_PREFIXES],
+        capture_output=True, text=True, timeout=10,
+    )
+    if result.returncode != 0:
+        return None
+    return [line.split("\0") for line in result.stdout.splitlines() if line]
+
+
+class GitRefSnapshot:
+    def __init__(self, refs: dict[str, str], base: str | None = None,
+                 counts: dict[str, tuple[int, int]] | None = None, ok: bool = True):
+        self.refs = refs
+        self.base = base
+        self.ok = ok
+        # Keyed by full refnames: (ref, base ref).
+        base_ref = self.resolve(base) if base else None
+        self._counts: dict[tuple[str, str], tuple[int, int] | None] = {
+            (ref, base_ref): c for ref, c in (counts or {}).items()
+        } if base_ref else {}
+
+    @classmethod
+    def load(cls, base: str | None = None) -> GitRefSnapshot:
+        """Read every local and origin ref; base is what counts are against."""
+        try:
+            rows = None
+            if base and _has_ahead_behind():
+                # Fails as a whole if base doesn't resolve; retried without.
+                rows = _for_each_ref(f"%(refname)%00%(objectname)%00%(ahead-behind:{base})")
+            if rows is None:
+                rows = _for_each_ref("%(refname)%00%(objectname)")
+        except (subprocess.SubprocessError, OSError):
+            rows = None
+        if rows is None:
+            return cls({}, base, ok=False)
+        refs, counts = {}, {}
+        for row in rows:
+            refs[row[0]] = row[1]
+            if len(row) > 2:
+                ahead, behind = row[2].split()
+                counts[row[0]] = (int(ahead), int(behind))
+        return cls(refs, base, counts)
+
+    def resolve(self, name: str) -> str | None:
+        """Full refname for name, looked up the way rev-parse would."""
+        for prefix in _RESOLVE_PREFIXES:
+            if prefix + name in self.refs:
+                return prefix + name
+        return None
+
+    def exists(self, name: str) -> bool:
+        return self.resolve(name) is not None
+
+    def sha(self, name: str) -> str | None:
+        ref = self.resolve(name)
+        return self.refs[ref] if ref else None
+
+    def ahead_behind(self, name: str, base: str | None = None) -> tuple[int, int] | None:
+        """(commits in name not in base, commits in base not in name), or
+        None if either ref is missing or git fails. base defaults to the
+        snapshot's base."""
+        base = base or self.base
+        ref, base_ref = self.resolve(name), self.resolve(base) if base else None
+        if not ref or not base_ref:
+            return None
+        key = (ref, base_ref)
+        if key not in self._counts:
+            self._counts[key] = _rev_list_counts(base_ref, ref)
+        return self._counts[key]
+
+    def branches(self, prefix: str = "") -> list[str]:
+        """Local branch names starting with prefix."""
+        return [r.removeprefix("refs/heads/") for r in self.refs
+                if r.startswith("refs/heads/" + prefix)]
+
+    def remote_branches(self, prefix: str = "") -> list[str]:
+        """Branch names on origin (without "origin/") starting with prefix."""
+        return [r.removeprefix("refs/remotes/origin/") for r in self.refs
+                if r.startswith("refs/remotes/origin/" + prefix) and not r.endswith("/HEAD")]
+
+
+def _rev_list_counts(base_ref: str, ref: str) -> tuple[int, int] | None:
+    try:
+        result = subprocess.run(
+            ["git", "rev-list", "--left-right", "--count", f"{base_ref}...{ref}"],
+            capture_output=True, text=True, timeout=5,
+        )
+        if result.returncode != 0:
+            return None
+        behind, ahead = result.stdout.split()
+        return int(ahead), int(behind)
+    except (subprocess.SubprocessError, OSError, ValueError):
+        return None
+
+
+_cache_enabled = False
+_cached: tuple[str, GitRefSnapshot] | None = None
+# Bumped by invalidate(), so a load that raced a ref change on a worker
+# thread is not cached.
+_generation = 0
+
+
+def enable_cache() -> None:
+    """Keep one snapshot until invalidate() (the watcher, once per tick)."""
+    global _cache_enabled
+    _cache_enabled = True
+
+
+def invalidate() -> None:
+    global _cached, _generation
+    _generation += 1
+    _cached = None
+
+
+def ref_snapshot() -> GitRefSnapshot:
+    """The current snapshot, with counts against origin/<base_branch>."""
+    global _cached
+    cwd = os.getcwd()
+    if _cache_enabled and _cached is not None and _cached[0] == cwd:
+        return _cached[1]
+    generation = _generation
+    base = get_config().get("base_branch")
+    snapshot = GitRefSnapshot.load(f"origin/{base}" if base else None)
+    if _cache_enabled and generation == _generation:
+        _cached = (cwd, snapshot)
+    return snapshot
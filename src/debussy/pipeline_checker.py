@@ -8,20 +8,16 @@ from .config import (
     get_config, log,
 )
 from .spawner import MAX_TOTAL_SPAWNS, spawn_agent
-from .takt import (
-    add_comment, block_task, get_db, get_task,
-    get_unresolved_deps, list_tasks, release_task,
-)
 from .takt.log import MAX_REJECTIONS
+from .tick import TickSnapshot, tick_or_load
 from .transitions import MAX_RETRIES
 
 
-def get_unmerged_dep_branches(task: dict) -> list[str]:
+def get_unmerged_dep_branches(task: dict, tick: TickSnapshot) -> list[str]:
     """Check which dependency branches haven't been merged on origin."""
     unmerged = []
     for dep_id in task.get("dependencies", []):
-        with get_db() as db:
-            dep_task = get_task(db, dep_id)
+        dep_task = tick.get(dep_id)
         if dep_task and dep_task["stage"] in ("acceptance", "done"):
             continue
         try:
@@ -36,39 +32,31 @@ def get_unmerged_dep_branches(task: dict) -> list[str]:
     return unmerged
 
 
-def reset_orphaned(watcher):
-    with get_db() as db:
-        active_tasks = list_tasks(db, status=STATUS_ACTIVE)
-
+def reset_orphaned(watcher, tick: TickSnapshot | None = None):
     running_tasks = {a.task for a in watcher.running.values()}
-    for task in active_tasks:
-        task_id = task.get("id")
-        if not task_id or task_id in running_tasks:
-            continue
-        # Only reset tasks that are in a stage the watcher manages
-        if task.get("stage") not in STAGE_TO_ROLE:
-            continue
-        with get_db() as db:
-            release_task(db, task_id)
-        log(f"Reset orphaned {task_id}: no agent running", "👻")
-
+    with tick_or_load(tick) as tick:
+        for task in tick.with_status(STATUS_ACTIVE):
+            task_id = task.get("id")
+            if not task_id or task_id in running_tasks:
+                continue
+            # Only reset tasks that are in a stage the watcher manages
+            if task.get("stage") not in STAGE_TO_ROLE:
+                continue
+            tick.release(task_id)
+            log(f"Reset orphaned {task_id}: no agent running", "👻")
 
-def release_ready(watcher):
-    with get_db() as db:
-        blocked_tasks = list_tasks(db, status=STATUS_BLOCKED)
 
-    for task in blocked_tasks:
-        _try_unblock_task(watcher, task)
+def release_ready(watcher, tick: TickSnapshot | None = None):
+    with tick_or_load(tick) as tick:
+        for task in tick.with_status(STATUS_BLOCKED):
+            _try_unblock_task(watcher, task, tick)
 
 
-def _try_unblock_task(watcher, task):
+def _try_unblock_task(watcher, task, tick: TickSnapshot):
     task_id = task.get("id")
     if not task_id or not task.get("dependencies"):
         return
-
-    with get_db() as db:
-        unresolved = get_unresolved_deps(db, task_id)
-    if unresolved:
+    if task.get("unresolved_count"):
         return
 
     stage = task.get("stage")
@@ -79,27 +67,24 @@ def _try_unblock_task(watcher, task):
     if task.get("rejection_count", 0) >= MAX_REJECTIONS:
         return
 
-    with get_db() as db:
-        release_task(db, task_id)
-        log(f"Unblocked {task_id}: deps resolved", "🔓")
+    tick.release(task_id)
+    log(f"Unblocked {task_id}: deps resolved", "🔓")
 
 
-def _should_skip_task(watcher, task_id, task, role):
+def _should_skip_task(watcher, task_id, task, role, tick: TickSnapshot | None = None):
     if not task_id:
         return "no id"
     if watcher.is_task_running(task_id):
         return "already running"
-    if watcher.failures.get(task_id, 0) >= MAX_RETRIES:
-        _block_failed_task(watcher, task_id, "failures")
-        return "max failures"
-    if watcher.spawn_counts.get(task_id, 0) >= MAX_TOTAL_SPAWNS:
-        _block_failed_task(watcher, task_id, "total spawns")
-        return "max spawns"
-    if task.get("status") == STATUS_BLOCKED:
-        return "blocked"
-    skip = _check_dependencies(watcher, task_id, task, role)
-    if skip:
-        return skip
+    with tick_or_load(tick) as tick:
+        skip = _check_limits(watcher, task_id, tick)
+        if skip:
+            return skip
+        if task.get("status") == STATUS_BLOCKED:
+            return "blocked"
+        skip = _check_dependencies(watcher, task_id, task, role, tick)
+        if skip:
+            return skip
     max_for_role = get_config().get("max_role_agents", {}).get(role)
     if max_for_role and watcher.count_running_role(role) >= max_for_role:
         _queue_task(watcher, task_id, f"waiting for {role} slot")
@@ -110,25 +95,42 @@ def _should_skip_task(watcher, task_id, task, role):
     return None
 
 
-def _block_failed_task(watcher, task_id, reason="failures"):
+def _check_limits(watcher, task_id, tick: TickSnapshot):
+    if watcher.failures.get(task_id, 0) >= MAX_RETRIES:
+        _block_failed_task(watcher, task_id, tick, "failures")
+        return "max failures"
+    if watcher.spawn_counts.get(task_id, 0) >= MAX_TOTAL_SPAWNS:
+        _block_failed_task(watcher, task_id, tick, "total spawns")
+        return "max spawns"
+    return None
+
+
+def _block_waiting_over_limits(watcher, tick: TickSnapshot):
+    """Apply the failure and spawn caps to pending tasks that tick.ready()
+    leaves out because their dependencies are still unresolved."""
+    for task_id in {*watcher.failures, *watcher.spawn_counts}:
+        task = tick.get(task_id)
+        if (task and task["stage"] in STAGE_TO_ROLE and task["status"] == STATUS_PENDING
+                and task["unresolved_count"]):
+            _check_limits(watcher, task_id, tick)
+
+
+def _block_failed_task(watcher, task_id, tick: TickSnapshot, reason="failures"):
     if task_id in watcher.blocked_failures:
         return
     watcher.blocked_failures.add(task_id)
     log(f"Blocked {task_id}: max {reason}, needs conductor", "🚫")
-    with get_db() as db:
-        add_comment(db, task_id, "watcher", f"Blocked: max {reason} reached. Needs conductor intervention.")
-        block_task(db, task_id)
+    tick.comment(task_id, "watcher", f"Blocked: max {reason} reached. Needs conductor intervention.")
+    tick.block(task_id)
 
 
-def _check_dependencies(watcher, task_id, task, role):
+def _check_dependencies(watcher, task_id, task, role, tick: TickSnapshot):
     if not task.get("dependencies"):
         return None
-    with get_db() as db:
-        unresolved = get_unresolved_deps(db, task_id)
-    if unresolved:
+    if task.get("unresolved_count"):
         return "unresolved deps"
     if role == "tester":
-        unmerged = get_unmerged_dep_branches(task)
+        unmerged = get_unmerged_dep_branches(task, tick)
         if unmerged:
             _queue_task(watcher, task_id, f"{len(unmerged)} dep branch(es) still unmerged on origin")
             return "unmerged deps"
@@ -141,20 +143,13 @@ def _queue_task(watcher, task_id, reason):
         watcher.queued.add(task_id)
 
 
-def _scan_stage(watcher, stage, role, spawn_budget: int) -> int:
+def _scan_stage(watcher, stage, role, spawn_budget: int, tick: TickSnapshot) -> int:
     spawned = 0
-    with get_db() as db:
-        tasks = list_tasks(db, stage=stage, status=STATUS_PENDING)
-
-    tasks.sort(key=lambda t: (
-        LABEL_PRIORITY not in t.get("tags", []),
-        "bug" not in t.get("tags", []),
-    ))
-    for task in tasks:
+    for task in tick.ready(stage, prioritize=[LABEL_PRIORITY, "bug"]):
         if spawned >= spawn_budget:
             break
         task_id = task.get("id")
-        skip = _should_skip_task(watcher, task_id, task, role)
+        skip = _should_skip_task(watcher, task_id, task, role, tick)
         if skip:
             continue
         watcher.queued.discard(task_id)
@@ -166,9 +161,11 @@ def _scan_stage(watcher, stage, role, spawn_budget: int) -> int:
 MAX_SPAWNS_PER_CYCLE = 2
 
 
-def check_pipeline(watcher):
+def check_pipeline(watcher, tick: TickSnapshot | None = None):
     budget = MAX_SPAWNS_PER_CYCLE
-    for stage, role in STAGE_TO_ROLE.items():
-        if budget <= 0:
-            break
-        budget -= _scan_stage(watcher, stage, role, budget)
+    with tick_or_load(tick) as tick:
+        _block_waiting_over_limits(watcher, tick)
+        for stage, role in STAGE_TO_ROLE.items():
+            if budget <= 0:
+                break
+            budget -= _scan_stage(watcher, stage, role, budget, tick)
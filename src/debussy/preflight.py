@@ -1,6 +1,8 @@
 import subprocess
 
 from .config import get_config
+from .fetcher import fetch_origin
+from .gitrefs import ref_snapshot
 
 
 NEEDS_FEATURE_BRANCH = {"reviewer", "security-reviewer"}
@@ -14,36 +16,21 @@ def check_base_branch() -> str | None:
     if not base:
         return "base_branch not configured — run: debussy config base_branch <branch>"
     # Check local ref first (fast path)
-    result = subprocess.run(
-        ["git", "rev-parse", "--verify", f"origin/{base}"],
-        capture_output=True, timeout=5,
-    )
-    if result.returncode == 0:
+    if ref_snapshot().exists(f"origin/{base}"):
         return None
     # Local ref missing — try fetching before failing
-    try:
-        subprocess.run(["git", "fetch", "origin"], capture_output=True, timeout=15)
-    except (subprocess.SubprocessError, OSError):
-        pass
-    try:
-        result = subprocess.run(
-            ["git", "rev-parse", "--verify", f"origin/{base}"],
-            capture_output=True, timeout=5,
-        )
-        if result.returncode != 0:
-            return f"base_branch origin/{base} not found on remote"
-    except (subprocess.SubprocessError, OSError) as e:
-        return f"git check failed: {e}"
+    fetch_origin([base], timeout=15)
+    refs = ref_snapshot()
+    if not refs.ok:
+        return "git check failed: could not read refs"
+    if not refs.exists(f"origin/{base}"):
+        return f"base_branch origin/{base} not found on remote"
     return None
 
 
 def check_remote_ref(ref: str) -> str | None:
     # Check local tracking ref first
-    result = subprocess.run(
-        ["git", "rev-parse", "--verify", ref],
-        capture_output=True, timeout=5,
-    )
-    if result.returncode == 0:
+    if ref_snapshot().exists(ref):
         return None
     # Not found locally — check remote directly (avoids stale local state)
     branch = ref.removeprefix("origin/")
@@ -54,7 +41,7 @@ def check_remote_ref(ref: str) -> str | None:
         )
         if result.returncode == 0 and result.stdout.strip():
             # Exists on remote but not locally — fetch it
-            subprocess.run(["git", "fetch", "origin"], capture_output=True, timeout=15)
+            fetch_origin([branch], timeout=15)
             return None
     except (subprocess.SubprocessError, OSError):
         pass
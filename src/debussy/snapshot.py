@@ -0,0 +1,71 @@
+"""Compact snapshot of takt state for read-only consumers.
+
+The watcher rebuilds .debussy/takt_snapshot.json whenever the takt revision
+moves and touches it on every other tick, at least every WAKE_TIMEOUT.
+`debussy board` reads the file instead of opening the database while its
+mtime is recent, so it takes no locks and never competes with agents
+writing to the WAL. A stale or
+missing snapshot (no watcher running) sends readers back to the database.
+A snapshot may lag the database by up to one watcher tick.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+
+from .config import WAKE_TIMEOUT, atomic_write
+from .takt import current_revision, get_db, get_unresolved_deps_map, list_tasks
+
+SNAPSHOT_FILE = "takt_snapshot.json"
+SNAPSHOT_MAX_AGE = 2 * WAKE_TIMEOUT
+SNAPSHOT_FIELDS = ["id", "title", "stage", "status", "tags", "dependencies", "rejection_count"]
+
+
+def snapshot_path(root: Path) -> Path:
+    return root / ".debussy" / SNAPSHOT_FILE
+
+
+def build_snapshot(db) -> dict:
+    """Return {"revision", "tasks", "unresolved"} for every live task.
+
+    The revision is read first, so a write racing the reads can only make
+    the data newer than its revision, and the next refresh rebuilds it.
+    """
+    revision = current_revision(db)
+    return {
+        "revision": revision,
+        "tasks": list_tasks(db, fields=SNAPSHOT_FIELDS),
+        "unresolved": get_unresolved_deps_map(db),
+    }
+
+
+class SnapshotWriter:
+    def __init__(self, root: Path):
+        self.path = snapshot_path(root)
+        self.data: dict | None = None
+
+    def refresh(self) -> dict:
+        """Rewrite the snapshot if the takt revision moved, else mark it fresh."""
+        with get_db() as db:
+            revision = current_revision(db)
+            changed = self.data is None or revision != self.data["revision"]
+            if changed:
+                self.data = build_snapshot(db)
+        if changed or not self.path.exists():
+            atomic_write(self.path, json.dumps(self.data, separators=(",", ":")))
+        else:
+            os.utime(self.path)
+        return self.data
+
+
+def read_snapshot(root: Path, max_age: float = SNAPSHOT_MAX_AGE) -> dict | None:
+    """Return the snapshot if the watcher refreshed it within max_age seconds."""
+    path = snapshot_path(root)
+    try:
+        if time.time() - path.stat().st_mtime > max_age:
+            return None
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
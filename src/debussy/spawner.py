@@ -9,12 +9,14 @@ from pathlib import Path
 from .agent import AgentInfo
 from .config import SESSION_NAME, YOLO_MODE, get_base_branch, get_config, log, role_cli_args
 from .diagnostics import comment_on_task
+from .fetcher import fetch_origin
 from .preflight import preflight_spawn
 from .prompts import get_prompt_path, get_system_prompt, get_user_message
 from .transitions import MAX_RETRIES
 from .takt import get_db, add_comment as _takt_comment
 from .takt.log import add_log as _takt_log
 from .worktree import create_worktree, remove_worktree
+from . import workers
 
 COMPOSERS = [
     "bach", "mozart", "beethoven", "chopin", "liszt", "brahms", "wagner",
@@ -46,12 +48,11 @@ def get_agent_name(used_names: set[str], role: str) -> str:
 def create_agent_worktree(role: str, task_id: str, agent_name: str) -> str:
     cfg = get_config()
     base = cfg.get("base_branch", "master")
-    try:
-        result = subprocess.run(["git", "fetch", "origin"], capture_output=True, timeout=30)
-        if result.returncode != 0:
-            log(f"git fetch failed: {result.stderr.strip()}", "⚠️")
-    except (subprocess.SubprocessError, OSError) as e:
-        log(f"git fetch failed: {e}", "⚠️")
+    # Reviewers check out the task branch; everyone else starts from base.
+    needed = [f"feature/{task_id}"] if role in ("reviewer", "security-reviewer") else [base]
+    result = fetch_origin(needed)
+    if not result.ok:
+        log(f"git fetch failed: {result.error}", "⚠️")
     def _create(r, bid, name, b):
         if r == "developer":
             return str(create_worktree(name, f"feature/{bid}", start_point=f"origin/{b}", new_branch=True))
@@ -167,7 +168,7 @@ MAX_TOTAL_SPAWNS = 20
 def spawn_agent(watcher, role: str, task_id: str, stage: str, labels: list[str] | None = None) -> bool:
     key = f"{role}:{task_id}"
 
-    if key in watcher.running:
+    if key in watcher.running or key in watcher.starting or key in watcher.finishing:
         return False
 
     if watcher.failures.get(task_id, 0) >= MAX_RETRIES:
@@ -176,8 +177,48 @@ def spawn_agent(watcher, role: str, task_id: str, stage: str, labels: list[str]
     if watcher.spawn_counts.get(task_id, 0) >= MAX_TOTAL_SPAWNS:
         return False
 
+    # A teardown or branch deletion still running would race the fresh checkout.
+    if workers.busy(f"branch:{task_id}") or workers.busy_prefix(f"teardown:{task_id}:"):
+        return False
+
+    agent_name = get_agent_name(watcher.used_names, role)
+    args = (watcher, key, role, task_id, stage, labels, agent_name)
+    if not workers.active():
+        return _start_agent(*args, _prepare_spawn(role, task_id, agent_name))
+    # Preflight, fetch and worktree add run on the pool; a later tick starts the agent.
+    watcher.starting[key] = task_id
+    workers.submit(
+        f"spawn:{key}", _prepare_spawn, role, task_id, agent_name,
+        on_done=lambda f: _finish_spawn(*args, f),
+    )
+    return True
+
+
+def _prepare_spawn(role: str, task_id: str, agent_name: str) -> tuple[str | None, str]:
+    """Worker-pool half of a spawn. Returns (preflight error, worktree path)."""
     preflight_err = preflight_spawn(role, task_id)
     if preflight_err:
+        return preflight_err, ""
+    return None, create_agent_worktree(role, task_id, agent_name)
+
+
+def _finish_spawn(watcher, key, role, task_id, stage, labels, agent_name, future) -> None:
+    watcher.starting.pop(key, None)
+    prepared = (None, "") if future.exception() else future.result()
+    if prepared[1] and (watcher.should_exit or get_config().get("paused", False)):
+        log(f"Not starting {agent_name}: watcher paused or stopping", "⏸️")
+        workers.submit(f"worktree:{agent_name}", remove_worktree, agent_name,
+                       on_done=lambda f: watcher.used_names.discard(agent_name))
+        return
+    _start_agent(watcher, key, role, task_id, stage, labels, agent_name, prepared)
+
+
+def _start_agent(watcher, key: str, role: str, task_id: str, stage: str,
+                 labels: list[str] | None, agent_name: str,
+                 prepared: tuple[str | None, str]) -> bool:
+    preflight_err, worktree_path = prepared
+    if preflight_err:
+        watcher.used_names.discard(agent_name)
         fail_key = f"{role}:{task_id}" if stage == "acceptance" else task_id
         watcher.failures[fail_key] = watcher.failures.get(fail_key, 0) + 1
         count = watcher.failures[fail_key]
@@ -186,11 +227,12 @@ def spawn_agent(watcher, role: str, task_id: str, stage: str, labels: list[str]
             log(f"Preflight failed for {task_id}: {preflight_err} (attempt {count}/{MAX_RETRIES})", "🚫")
             watcher.preflight_warned.add(warn_key)
         return False
-
-    agent_name = get_agent_name(watcher.used_names, role)
     log(f"Spawning {agent_name} for {task_id}", "🚀")
+    return _launch_agent(watcher, key, role, task_id, stage, labels, agent_name, worktree_path)
+
 
-    worktree_path = create_agent_worktree(role, task_id, agent_name)
+def _launch_agent(watcher, key: str, role: str, task_id: str, stage: str,
+                  labels: list[str] | None, agent_name: str, worktree_path: str) -> bool:
     if not worktree_path:
         log(f"Worktree creation failed for {agent_name}, aborting spawn", "💥")
         watcher.used_names.discard(agent_name)
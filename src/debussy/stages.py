@@ -0,0 +1,31 @@
+"""Pipeline stage and status names shared by debussy and takt.
+
+Kept free of imports so the takt CLI can use them without loading
+debussy.config.
+"""
+
+STAGE_BACKLOG = "backlog"
+STAGE_DEVELOPMENT = "development"
+STAGE_REVIEWING = "reviewing"
+STAGE_SECURITY_REVIEW = "security_review"
+STAGE_MERGING = "merging"
+STAGE_ACCEPTANCE = "acceptance"
+STAGE_PARKED = "parked"
+STAGE_DONE = "done"
+
+STATUS_PENDING = "pending"
+STATUS_ACTIVE = "active"
+STATUS_BLOCKED = "blocked"
+
+NEXT_STAGE = {
+    STAGE_BACKLOG: STAGE_DEVELOPMENT,
+    STAGE_DEVELOPMENT: STAGE_REVIEWING,
+    STAGE_REVIEWING: STAGE_MERGING,
+    STAGE_SECURITY_REVIEW: STAGE_MERGING,
+    STAGE_MERGING: STAGE_DONE,
+    STAGE_ACCEPTANCE: STAGE_DONE,
+}
+
+SECURITY_NEXT_STAGE = {
+    STAGE_REVIEWING: STAGE_SECURITY_REVIEW,
+}
@@ -6,6 +6,7 @@ import time
 
 from .agent import repo_root
 from .config import get_config
+from .takt.db import wal_size
 
 
 def _fmt_duration(seconds: float) -> str:
@@ -54,13 +55,26 @@ def _get_branches() -> list[str]:
         return []
 
 
+def _fmt_size(size: int) -> str:
+    if size < 1024 * 1024:
+        return f"{size // 1024} KiB"
+    return f"{size / (1024 * 1024):.1f} MiB"
+
+
+def _wal_info() -> str:
+    try:
+        return _fmt_size(wal_size(repo_root()))
+    except RuntimeError:
+        return "?"
+
+
 def print_runtime_info(running):
     now = time.time()
     cfg = get_config()
     base = cfg.get("base_branch", "not set")
     max_agents = cfg.get("max_total_agents", 8)
 
-    print(f"  base: {base}  agents: {len(running)}/{max_agents}")
+    print(f"  base: {base}  agents: {len(running)}/{max_agents}  wal: {_wal_info()}")
     print()
 
     if running:
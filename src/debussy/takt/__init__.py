@@ -1,32 +1,77 @@
-"""Takt — SQLite-based task management for debussy."""
+"""Takt — SQLite-based task management for debussy.
 
+wait_for, get_stage_history and stage_stats are loaded on first use, so
+commands that don't need them (most of the CLI) skip importing their
+modules. Full-text search lives in debussy.takt.search.search: a package
+attribute of that name would be replaced by the submodule on import.
+"""
+
+import importlib
+
+from .changes import ChangesPruned, changed_task_ids, changes_since, current_revision
 from .db import get_db, get_prefix, init_db
-from .models import create_task, get_task, list_tasks, update_task
+from .models import (
+    create_task, create_tasks, get_deps_map, get_task, iter_tasks,
+    list_ready_tasks, list_tasks, update_task,
+)
 from .log import (
     add_comment,
     advance_task,
     block_task,
     claim_task,
+    follow_log,
     get_log,
+    get_log_since,
     get_unresolved_deps,
+    get_unresolved_deps_map,
     reject_task,
     release_task,
+    TransitionConflict,
 )
 
 __all__ = [
+    "ChangesPruned",
+    "changed_task_ids",
+    "changes_since",
+    "current_revision",
     "get_db",
     "get_prefix",
     "init_db",
+    "get_stage_history",
+    "stage_stats",
     "create_task",
+    "create_tasks",
+    "get_deps_map",
     "get_task",
+    "iter_tasks",
+    "list_ready_tasks",
     "list_tasks",
     "update_task",
     "add_comment",
     "advance_task",
     "block_task",
     "claim_task",
+    "follow_log",
     "get_log",
+    "get_log_since",
     "get_unresolved_deps",
+    "get_unresolved_deps_map",
     "reject_task",
     "release_task",
+    "TransitionConflict",
+    "wait_for",
 ]
+
+_LAZY = {
+    "get_stage_history": ".history",
+    "stage_stats": ".history",
+    "wait_for": ".wait",
+}
+
+
+def __getattr__(name: str):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+    globals()[name] = value
+    return value
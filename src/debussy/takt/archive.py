@@ -0,0 +1,404 @@
+"""Retention: move old done tasks and old log rows out of the working set.
+
+Archived rows live in .takt/archive.db next to the main database. The
+archive is opened only when it is needed (gc, a get_task miss, or reads
+that ask for archived entries), so normal commands never touch it. The
+archive keeps its own search_index, maintained by the same triggers as
+the main database, so `takt search` still finds archived tasks and
+comments. An archived task's id no longer exists in the main tasks table:
+readers of that table (get_task, wait, dependency checks, project ids)
+fall back to the archive, and add_comment refuses archived tasks.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from pathlib import Path
+
+from .changes import PRUNED_REV_KEY
+from .db import (
+    FTS_TRIGGERS_SQL, LOG_RETENTION_DAYS, NOW_MS, TASK_RETENTION_DAYS, _backfill_fts,
+    _create_fts, to_ms,
+)
+
+ARCHIVE_FILE = "archive.db"
+CHANGES_RETENTION_DAYS = 1
+ARCHIVE_BATCH = 1000
+FULL_VACUUM_HINT = ("Space is not returned to the filesystem until a one-off "
+                    "`takt gc --full` (run it while no agents are working)")
+DAY_MS = 86_400_000
+
+# Version 1: timestamp and archived_at are epoch ms, like the main database.
+# Version 2: archived tasks, with their dependency ids inlined as JSON.
+# Version 3: search_index over archived tasks and comments (with FTS5).
+ARCHIVE_VERSION = 3
+
+# Columns copied from the main tasks table.
+TASK_COLUMNS = (
+    "id", "seq", "title", "description", "stage", "status", "tags",
+    "rejection_count", "created_at", "updated_at", "unresolved_count",
+)
+
+_UPSERT_SET = ", ".join(f"{c} = excluded.{c}" for c in (*TASK_COLUMNS[1:], "dependencies"))
+
+ARCHIVE_SCHEMA_SQL = f"""\
+CREATE TABLE IF NOT EXISTS log (
+    id          INTEGER PRIMARY KEY,
+    task_id     TEXT,
+    timestamp   INTEGER,
+    type        TEXT,
+    author      TEXT,
+    message     TEXT,
+    archived_at INTEGER DEFAULT ({NOW_MS})
+);
+CREATE INDEX IF NOT EXISTS idx_log_task_id ON log(task_id, id);
+
+CREATE TABLE IF NOT EXISTS tasks (
+    id               TEXT PRIMARY KEY,
+    seq              INTEGER,
+    title            TEXT,
+    description      TEXT,
+    stage            TEXT,
+    status           TEXT,
+    tags             TEXT,
+    rejection_count  INTEGER,
+    created_at       INTEGER,
+    updated_at       INTEGER,
+    unresolved_count INTEGER,
+    dependencies     TEXT DEFAULT '[]',
+    archived_at      INTEGER DEFAULT ({NOW_MS})
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_created ON tasks(created_at);
+"""
+
+
+def archive_path(db: sqlite3.Connection) -> Path:
+    """Return the archive database path that belongs to db's main file."""
+    for row in db.execute("PRAGMA database_list").fetchall():
+        if row[1] == "main":
+            return Path(row[2]).parent / ARCHIVE_FILE
+    raise RuntimeError("Cannot locate main database file")
+
+
+def open_archive(db: sqlite3.Connection, create: bool = False) -> sqlite3.Connection | None:
+    """Open the archive next to db. Returns None if it does not exist and create is False."""
+    path = archive_path(db)
+    if not create and not path.exists():
+        return None
+    conn = sqlite3.connect(str(path))
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA busy_timeout=5000")
+    if conn.execute("PRAGMA user_version").fetchone()[0] < ARCHIVE_VERSION:
+        _upgrade_archive(conn)
+    return conn
+
+
+def _upgrade_archive(conn: sqlite3.Connection) -> None:
+    """Create or extend the archive schema, converting a version 0 archive's text timestamps."""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    old = version == 0 and conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='log'"
+    ).fetchone() is not None
+    if old:
+        conn.execute("ALTER TABLE log RENAME TO log_v0")
+        conn.execute("DROP INDEX IF EXISTS idx_log_task_id")
+    conn.executescript(ARCHIVE_SCHEMA_SQL)
+    if old:
+        conn.execute(
+            "INSERT INTO log (id, task_id, timestamp, type, author, message, archived_at) "
+            f"SELECT id, task_id, {to_ms('timestamp')}, type, author, message, "
+            f"{to_ms('archived_at')} FROM log_v0"
+        )
+        conn.execute("DROP TABLE log_v0")
+    if _create_fts(conn):
+        for trigger in FTS_TRIGGERS_SQL:
+            conn.execute(trigger)
+        _backfill_fts(conn)
+    conn.execute(f"PRAGMA user_version = {ARCHIVE_VERSION}")
+    conn.commit()
+
+
+def get_archived_log(db: sqlite3.Connection, task_id: str | None,
+                     type: str | None = None) -> list[dict]:
+    """Return archived log entries for a task (all tasks if None), oldest first."""
+    archive = open_archive(db)
+    if archive is None:
+        return []
+    try:
+        query = "SELECT id, task_id, timestamp, type, author, message FROM log WHERE 1"
+        params: list = []
+        if task_id is not None:
+            query += " AND task_id = ?"
+            params.append(task_id)
+        if type is not None:
+            query += " AND type = ?"
+            params.append(type)
+        rows = archive.execute(query + " ORDER BY id", params).fetchall()
+        return [dict(r) for r in rows]
+    finally:
+        archive.close()
+
+
+def _archived_task_to_dict(row: sqlite3.Row) -> dict:
+    d = dict(row)
+    d["tags"] = json.loads(d["tags"])
+    d["dependencies"] = json.loads(d["dependencies"])
+    return d
+
+
+def get_archived_task(db: sqlite3.Connection, task_id: str) -> dict | None:
+    """Return an archived task dict (with archived_at), or None."""
+    archive = open_archive(db)
+    if archive is None:
+        return None
+    try:
+        row = archive.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+        return _archived_task_to_dict(row) if row else None
+    finally:
+        archive.close()
+
+
+def archived_max_seq(db: sqlite3.Connection, prefix: str) -> int | None:
+    """Highest sequence number among archived tasks of a project, or None."""
+    archive = open_archive(db)
+    if archive is None:
+        return None
+    try:
+        return archive.execute(
+            "SELECT MAX(seq) FROM tasks WHERE id LIKE ?", (f"{prefix}-%",)
+        ).fetchone()[0]
+    finally:
+        archive.close()
+
+
+def list_archived_tasks(
+    db: sqlite3.Connection,
+    stage: str | None = None,
+    status: str | None = None,
+    tag: str | None = None,
+    prefix: str | None = None,
+    limit: int | None = None,
+    ids: list[str] | None = None,
+) -> list[dict]:
+    """Return archived tasks matching the filters, in creation order."""
+    archive = open_archive(db)
+    if archive is None:
+        return []
+    conditions = []
+    params: list = []
+    if ids is not None:
+        conditions.append("id IN (SELECT value FROM json_each(?))")
+        params.append(json.dumps(ids))
+    if prefix is not None:
+        conditions.append("id LIKE ?")
+        params.append(f"{prefix}-%")
+    if stage is not None:
+        conditions.append("stage = ?")
+        params.append(stage)
+    if status is not None:
+        conditions.append("status = ?")
+        params.append(status)
+    if tag is not None:
+        conditions.append("EXISTS (SELECT 1 FROM json_each(tags) WHERE value = ?)")
+        params.append(tag)
+    query = "SELECT * FROM tasks"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY created_at, id"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+    try:
+        return [_archived_task_to_dict(r) for r in archive.execute(query, params).fetchall()]
+    finally:
+        archive.close()
+
+
+def _archivable_task_ids(db: sqlite3.Connection, cutoff: int) -> list[str]:
+    """Done tasks last updated before cutoff that no remaining task depends on.
+
+    A task stays while any task outside the set depends on it, so the
+    dependencies foreign keys never dangle; dropping one can strand its own
+    dependencies, hence the loop until nothing changes.
+    """
+    ids = {r[0] for r in db.execute(
+        "SELECT id FROM tasks WHERE stage = 'done' AND updated_at < ?", (cutoff,)
+    )}
+    if not ids:
+        return []
+    edges = db.execute(
+        "SELECT task_id, depends_on_id FROM dependencies "
+        "WHERE depends_on_id IN (SELECT value FROM json_each(?))",
+        (json.dumps(sorted(ids)),),
+    ).fetchall()
+    while True:
+        pinned = {dep for task_id, dep in edges if task_id not in ids and dep in ids}
+        if not pinned:
+            return sorted(ids)
+        ids -= pinned
+
+
+def archive_tasks(db: sqlite3.Connection, older_than_days: int = TASK_RETENTION_DAYS) -> int:
+    """Move done tasks untouched for older_than_days, with their logs, into the archive.
+
+    get_task still finds them there. Like archive_logs, rows are committed
+    to the archive before they are deleted here, and db is committed as it
+    goes. stage_history rows stay behind for `takt history` and stats.
+    Returns tasks moved.
+    """
+    cutoff = db.execute(f"SELECT {NOW_MS}").fetchone()[0] - int(older_than_days) * DAY_MS
+    ids = _archivable_task_ids(db, cutoff)
+    if not ids:
+        return 0
+    # Read before any batch deletes the dependency rows it points at.
+    deps: dict[str, list[str]] = {}
+    for task_id, dep in db.execute(
+        "SELECT task_id, depends_on_id FROM dependencies "
+        "WHERE task_id IN (SELECT value FROM json_each(?)) ORDER BY rowid",
+        (json.dumps(ids),),
+    ):
+        deps.setdefault(task_id, []).append(dep)
+    columns = ", ".join(TASK_COLUMNS)
+    archive = open_archive(db, create=True)
+    try:
+        for start in range(0, len(ids), ARCHIVE_BATCH):
+            batch = json.dumps(ids[start:start + ARCHIVE_BATCH])
+            tasks = db.execute(
+                f"SELECT {columns} FROM tasks WHERE id IN (SELECT value FROM json_each(?))",
+                (batch,),
+            ).fetchall()
+            logs = db.execute(
+                "SELECT id, task_id, timestamp, type, author, message FROM log "
+                "WHERE task_id IN (SELECT value FROM json_each(?))",
+                (batch,),
+            ).fetchall()
+            # An upsert keeps the archived row's rowid, which keys its search_index document.
+            archive.executemany(
+                f"INSERT INTO tasks ({columns}, dependencies) "
+                f"VALUES ({', '.join('?' * (len(TASK_COLUMNS) + 1))}) "
+                f"ON CONFLICT(id) DO UPDATE SET {_UPSERT_SET}",
+                [(*r, json.dumps(deps.get(r["id"], []))) for r in tasks],
+            )
+            archive.executemany(
+                "INSERT OR IGNORE INTO log (id, task_id, timestamp, type, author, message) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [tuple(r) for r in logs],
+            )
+            archive.commit()
+            for table, column in (("log", "task_id"), ("dependencies", "task_id"),
+                                  ("dependencies", "depends_on_id"), ("tasks", "id")):
+                db.execute(
+                    f"DELETE FROM {table} WHERE {column} IN (SELECT value FROM json_each(?))",
+                    (batch,),
+                )
+            db.commit()
+    finally:
+        archive.close()
+    return len(ids)
+
+
+def archive_logs(db: sqlite3.Connection, older_than_days: int = LOG_RETENTION_DAYS) -> int:
+    """Move log rows of done tasks older than the cutoff into the archive.
+
+    Rows are copied (idempotently, keyed by id) and committed to the archive
+    before they are deleted from the main database, so an interruption can
+    only leave a row in both places, never in neither. Commits db as it
+    goes. Returns rows moved.
+    """
+    cutoff = db.execute(f"SELECT {NOW_MS}").fetchone()[0] - int(older_than_days) * DAY_MS
+    select = (
+        "SELECT l.id, l.task_id, l.timestamp, l.type, l.author, l.message FROM log l "
+        "JOIN tasks t ON t.id = l.task_id "
+        "WHERE t.stage = 'done' AND l.timestamp < ? "
+        "ORDER BY l.id LIMIT ?"
+    )
+    rows = db.execute(select, (cutoff, ARCHIVE_BATCH)).fetchall()
+    if not rows:
+        return 0
+    archive = open_archive(db, create=True)
+    moved = 0
+    try:
+        while rows:
+            archive.executemany(
+                "INSERT OR IGNORE INTO log (id, task_id, timestamp, type, author, message) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [tuple(r) for r in rows],
+            )
+            archive.commit()
+            db.executemany("DELETE FROM log WHERE id = ?", [(r["id"],) for r in rows])
+            db.commit()
+            moved += len(rows)
+            rows = db.execute(select, (cutoff, ARCHIVE_BATCH)).fetchall()
+    finally:
+        archive.close()
+    return moved
+
+
+def prune_changes(db: sqlite3.Connection, older_than_days: int = CHANGES_RETENTION_DAYS) -> int:
+    """Delete change-feed rows older than the cutoff. The revision counter is
+    unaffected; the highest deleted revision becomes the feed's low-water mark."""
+    cutoff = db.execute(f"SELECT {NOW_MS}").fetchone()[0] - int(older_than_days) * DAY_MS
+    row = db.execute("SELECT MAX(rev) FROM changes WHERE changed_at < ?", (cutoff,)).fetchone()
+    if row[0] is None:
+        return 0
+    db.execute(
+        "INSERT INTO metadata (key, value) VALUES (?, ?) "
+        "ON CONFLICT(key) DO UPDATE SET value = MAX(CAST(value AS INTEGER), excluded.value)",
+        (PRUNED_REV_KEY, row[0]),
+    )
+    cur = db.execute("DELETE FROM changes WHERE rev <= ?", (row[0],))
+    return cur.rowcount
+
+
+def _db_size(db: sqlite3.Connection) -> int:
+    page_size = db.execute("PRAGMA page_size").fetchone()[0]
+    page_count = db.execute("PRAGMA page_count").fetchone()[0]
+    return page_size * page_count
+
+
+def needs_full_vacuum(db: sqlite3.Connection) -> bool:
+    """True for a database created before incremental auto-vacuum."""
+    return db.execute("PRAGMA auto_vacuum").fetchone()[0] != 2
+
+
+def vacuum(db: sqlite3.Connection, full: bool = False) -> int:
+    """Return free pages to the filesystem. Returns bytes reclaimed.
+
+    A database created without incremental auto-vacuum is only switched
+    over by a full VACUUM, which locks it for the whole rewrite; that runs
+    only when full is set (`takt gc --full`). Otherwise the run is
+    incremental, or a no-op until the database has been converted.
+    """
+    db.commit()
+    before = _db_size(db)
+    if full:
+        db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        db.execute("VACUUM")
+    elif not needs_full_vacuum(db):
+        db.execute("PRAGMA incremental_vacuum")
+    else:
+        return 0
+    db.commit()
+    db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return max(0, before - _db_size(db))
+
+
+def gc(
+    db: sqlite3.Connection,
+    older_than_days: int = LOG_RETENTION_DAYS,
+    tasks_older_than_days: int = TASK_RETENTION_DAYS,
+    full: bool = False,
+) -> dict:
+    """Archive old done tasks and logs, prune the change feed and vacuum.
+
+    full allows the one-off VACUUM that converts an old database to
+    incremental auto-vacuum. Returns a report dict.
+    """
+    tasks_archived = archive_tasks(db, tasks_older_than_days)
+    archived = archive_logs(db, older_than_days)
+    pruned = prune_changes(db)
+    reclaimed = vacuum(db, full=full)
+    return {"tasks_archived": tasks_archived, "archived": archived,
+            "changes_pruned": pruned, "reclaimed_bytes": reclaimed,
+            "needs_full_vacuum": needs_full_vacuum(db)}
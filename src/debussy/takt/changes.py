@@ -0,0 +1,80 @@
+"""Change feed: a revision counter bumped by triggers on every write.
+
+Every insert/update/delete on tasks and dependencies, and every new log
+entry, appends a row to the changes table. The row's rev is the revision
+number; pollers keep the last revision they saw and ask only for newer rows.
+
+gc prunes old rows and records the highest pruned revision in metadata.
+Asking for changes since an older revision raises ChangesPruned: the feed
+can no longer say everything that happened, so the poller must resync.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+
+PRUNED_REV_KEY = "changes_pruned_rev"
+
+
+class ChangesPruned(ValueError):
+    """The requested revision is older than the oldest change still kept."""
+
+    def __init__(self, rev: int, pruned_rev: int):
+        super().__init__(
+            f"Changes up to revision {pruned_rev} were pruned; "
+            f"revision {rev} is too old, resync from the current state"
+        )
+        self.rev = rev
+        self.pruned_rev = pruned_rev
+
+
+def current_revision(db: sqlite3.Connection) -> int:
+    """Return the latest revision number (0 for a database with no writes)."""
+    row = db.execute(
+        "SELECT seq FROM sqlite_sequence WHERE name = 'changes'"
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def pruned_revision(db: sqlite3.Connection) -> int:
+    """Return the highest revision gc has pruned (0 if none)."""
+    row = db.execute(
+        "SELECT value FROM metadata WHERE key = ?", (PRUNED_REV_KEY,)
+    ).fetchone()
+    return int(row[0]) if row else 0
+
+
+def _check_rev(db: sqlite3.Connection, rev: int) -> None:
+    pruned = pruned_revision(db)
+    if rev < pruned:
+        raise ChangesPruned(rev, pruned)
+
+
+def changes_since(db: sqlite3.Connection, rev: int, limit: int | None = None) -> list[dict]:
+    """Return change rows with revision > rev, oldest first.
+
+    Raises ChangesPruned if rows after rev have been pruned.
+    """
+    _check_rev(db, rev)
+    query = "SELECT * FROM changes WHERE rev > ? ORDER BY rev"
+    params: list = [rev]
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+    return [dict(r) for r in db.execute(query, params).fetchall()]
+
+
+def changed_task_ids(db: sqlite3.Connection, rev: int) -> tuple[int, set[str]]:
+    """Return (new cursor, ids of tasks touched since rev).
+
+    The cursor is the highest revision actually read, so a write that lands
+    between two calls is never skipped. Raises ChangesPruned if rows after
+    rev have been pruned.
+    """
+    _check_rev(db, rev)
+    rows = db.execute(
+        "SELECT rev, task_id FROM changes WHERE rev > ? ORDER BY rev", (rev,)
+    ).fetchall()
+    if not rows:
+        return rev, set()
+    return rows[-1]["rev"], {r["task_id"] for r in rows}
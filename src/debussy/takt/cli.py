@@ -3,21 +3,56 @@
 from __future__ import annotations
 
 import argparse
+import functools
 import json
 import sys
+from datetime import datetime, timezone
+from pathlib import Path
 
-from .db import get_db, get_prefix, init_db, _find_project_root
-from .models import create_task, get_task, list_tasks, update_task
+from .changes import ChangesPruned, changes_since, current_revision
+from .db import (
+    LOG_RETENTION_DAYS, TASK_RETENTION_DAYS, get_db, get_prefix, init_db, _find_project_root,
+)
+from .models import create_task, create_tasks, get_task, iter_tasks, list_tasks, update_task
+from .client import forward, socket_path
 from .log import (
     add_comment,
     advance_task,
     block_task,
     claim_task,
+    follow_log,
     get_log,
+    get_log_since,
+    last_log_id,
     reject_task,
     release_task,
+    TransitionConflict,
 )
 
+# Exit status when a conditional transition (--expect-*) lost a race.
+EXIT_CONFLICT = 3
+# `takt changes --since` exits EXIT_RESYNC when gc pruned part of the range.
+EXIT_RESYNC = 4
+# `takt wait` exits EXIT_WAIT_MET + i when condition i was met, or
+# EXIT_TIMEOUT (as timeout(1) does) when none was in time.
+EXIT_WAIT_MET = 10
+EXIT_TIMEOUT = 124
+
+
+def _fmt_ts(ms: int | None) -> str | None:
+    """Render an epoch-ms timestamp in the UTC text form takt has always printed."""
+    if ms is None:
+        return None
+    return datetime.fromtimestamp(ms / 1000, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _task_for_output(task: dict) -> dict:
+    out = dict(task)
+    for key in ("created_at", "updated_at", "archived_at"):
+        if key in out:
+            out[key] = _fmt_ts(out[key])
+    return out
+
 
 def _print_task(task: dict) -> None:
     print(f"id:          {task['id']}")
@@ -32,8 +67,10 @@ def _print_task(task: dict) -> None:
         print(f"deps:        {', '.join(task['dependencies'])}")
     if task["rejection_count"]:
         print(f"rejections:  {task['rejection_count']}")
-    print(f"created:     {task['created_at']}")
-    print(f"updated:     {task['updated_at']}")
+    print(f"created:     {_fmt_ts(task['created_at'])}")
+    print(f"updated:     {_fmt_ts(task['updated_at'])}")
+    if task.get("archived_at"):
+        print(f"archived:    {_fmt_ts(task['archived_at'])}")
 
 
 def _print_task_list(tasks: list[dict]) -> None:
@@ -59,9 +96,117 @@ def _print_log(entries: list[dict]) -> None:
         print("No log entries.")
         return
     for e in entries:
-        print(f"[{e['timestamp']}] ({e['type']}) {e['author']}: {e['message']}")
+        print(f"[{_fmt_ts(e['timestamp'])}] ({e['type']}) {e['author']}: {e['message']}")
 
 
+def _print_log_entry(e: dict, with_task: bool) -> None:
+    task = f" {e['task_id']}" if with_task else ""
+    print(f"[{_fmt_ts(e['timestamp'])}]{task} ({e['type']}) {e['author']}: {e['message']}",
+          flush=True)
+
+
+def _split_list(value) -> list[str]:
+    if isinstance(value, str):
+        return [v.strip() for v in value.split(",") if v.strip()]
+    return list(value or [])
+
+
+def _read_import(path: str) -> list[dict]:
+    """Parse a JSON array, a single JSON object, or JSONL into task specs."""
+    if path == "-":
+        text = sys.stdin.read()
+    else:
+        with open(path) as f:
+            text = f.read()
+    try:
+        data = json.loads(text)
+        records = data if isinstance(data, list) else [data]
+    except json.JSONDecodeError:
+        records = []
+        for n, line in enumerate(text.splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON on line {n}: {e.msg}") from None
+    specs = []
+    for n, rec in enumerate(records, 1):
+        if not isinstance(rec, dict):
+            raise ValueError(f"Record {n} is not an object")
+        spec = dict(rec)
+        spec["tags"] = _split_list(rec.get("tags"))
+        spec["deps"] = _split_list(rec.get("deps"))
+        specs.append(spec)
+    return specs
+
+
+def _print_search_results(results: list[dict]) -> None:
+    if not results:
+        print("No matches.")
+        return
+    for r in results:
+        where = "comment" if r["kind"] == "comment" else "task"
+        if r["archived"]:
+            where += ", archived"
+        print(f"{r['task_id']}  [{r['stage']}]  {r['title']}  ({where})")
+        snippet = " ".join(r["snippet"].split())
+        if snippet:
+            print(f"    {snippet}")
+
+
+def _fmt_bytes(n: int) -> str:
+    if n < 1024:
+        return f"{n} B"
+    if n < 1024 * 1024:
+        return f"{n / 1024:.1f} KiB"
+    return f"{n / (1024 * 1024):.1f} MiB"
+
+
+def _print_changes(changes: list[dict], revision: int) -> None:
+    for c in changes:
+        row = f" #{c['row_id']}" if c["row_id"] is not None else ""
+        print(f"{c['rev']:>6}  {c['task_id']}  {c['kind']} {c['op']}{row}")
+    print(f"revision: {revision}")
+
+
+def _fmt_seconds(seconds: float | None) -> str:
+    if seconds is None:
+        return "-"
+    if seconds < 60:
+        return f"{int(seconds)}s"
+    if seconds < 3600:
+        return f"{int(seconds // 60)}m{int(seconds % 60):02d}s"
+    return f"{int(seconds // 3600)}h{int(seconds % 3600 // 60):02d}m"
+
+
+def _print_history(visits: list[dict]) -> None:
+    if not visits:
+        print("No stage history.")
+        return
+    for v in visits:
+        outcome = f"{v['outcome']} -> {v['next_stage']}" if v["exited_at"] else "(current)"
+        agent = v["agent"] or "-"
+        print(f"{_fmt_ts(v['entered_at'])}  {v['stage']:<16} {_fmt_seconds(v['duration_s']):>8}  "
+              f"{agent:<20} {outcome}")
+
+
+def _print_stats(stats: dict[str, dict]) -> None:
+    if not stats:
+        print("No completed stage visits.")
+        return
+    print(f"{'STAGE':<16} {'VISITS':>6} {'AVG':>8} {'MAX':>8} {'REJECTED':>8}")
+    for stage, s in stats.items():
+        print(f"{stage:<16} {s['visits']:>6} {_fmt_seconds(s['avg_s']):>8} "
+              f"{_fmt_seconds(s['max_s']):>8} {s['rejected']:>8}")
+
+
+def _add_expect_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--expect-stage", help="Only apply if the task is in this stage")
+    parser.add_argument("--expect-status", help="Only apply if the task has this status")
+
+
+@functools.cache  # built once per process; `takt serve` parses every request
 def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(prog="takt", description="Task management for debussy")
     sub = parser.add_subparsers(dest="command")
@@ -78,6 +223,11 @@ def _build_parser() -> argparse.ArgumentParser:
     p_create.add_argument("--deps", help="Comma-separated dependency IDs")
     p_create.add_argument("--tags", help="Comma-separated tags")
 
+    p_import = sub.add_parser("import", help="Create tasks from JSON or JSONL")
+    p_import.add_argument("file", nargs="?", default="-", help="Input file (default: stdin)")
+    p_import.add_argument("-p", "--project", help="Default project prefix for the batch")
+    p_import.add_argument("--json", action="store_true", help="Print created tasks as JSON")
+
     p_show = sub.add_parser("show", help="Show a task")
     p_show.add_argument("id")
     p_show.add_argument("--json", action="store_true")
@@ -87,11 +237,18 @@ def _build_parser() -> argparse.ArgumentParser:
     p_list.add_argument("--stage")
     p_list.add_argument("--status")
     p_list.add_argument("--tag")
+    p_list.add_argument("--limit", type=int, help="Return at most N tasks")
+    p_list.add_argument("--after", metavar="ID", help="Only tasks created after this one (page cursor)")
+    p_list.add_argument("--fields", help="Comma-separated fields to output (JSON only)")
     p_list.add_argument("--json", action="store_true")
+    p_list.add_argument("--ndjson", action="store_true", help="Stream one JSON task per line")
+    p_list.add_argument("--include-archived", action="store_true",
+                        help="Also list done tasks moved to the archive by gc")
 
     p_advance = sub.add_parser("advance", help="Advance task to next stage")
     p_advance.add_argument("id")
     p_advance.add_argument("--to", dest="to_stage")
+    _add_expect_args(p_advance)
 
     p_reject = sub.add_parser("reject", help="Reject a task")
     p_reject.add_argument("id")
@@ -99,12 +256,15 @@ def _build_parser() -> argparse.ArgumentParser:
     p_claim = sub.add_parser("claim", help="Claim a task")
     p_claim.add_argument("id")
     p_claim.add_argument("--agent", required=True)
+    _add_expect_args(p_claim)
 
     p_release = sub.add_parser("release", help="Release a task")
     p_release.add_argument("id")
+    _add_expect_args(p_release)
 
     p_block = sub.add_parser("block", help="Block a task")
     p_block.add_argument("id")
+    _add_expect_args(p_block)
 
     p_comment = sub.add_parser("comment", help="Add a comment")
     p_comment.add_argument("id")
@@ -118,8 +278,57 @@ def _build_parser() -> argparse.ArgumentParser:
     p_update.add_argument("--tags", help="Comma-separated tags (replaces existing)")
 
     p_log = sub.add_parser("log", help="Show task log")
-    p_log.add_argument("id")
+    p_log.add_argument("id", nargs="?")
     p_log.add_argument("--type", choices=["transition", "comment", "assignment"])
+    p_log.add_argument("--archived", action="store_true", help="Include archived entries")
+    p_log.add_argument("-f", "--follow", action="store_true", help="Keep printing new entries")
+    p_log.add_argument("--since-id", type=int, metavar="N", help="Only entries with id > N")
+    p_log.add_argument("--all", action="store_true", help="Entries of all tasks")
+
+    p_wait = sub.add_parser("wait", help="Block until tasks reach a stage or status")
+    p_wait.add_argument("ids", nargs="+", metavar="id")
+    p_wait.add_argument("--until", action="append", required=True, metavar="COND",
+                        help="stage=X or status=X; repeat or join with | for alternatives")
+    p_wait.add_argument("--all", action="store_true", help="Wait for every task, not just one")
+    p_wait.add_argument("--timeout", type=float, metavar="SECONDS")
+
+    p_gc = sub.add_parser("gc", help="Archive old done tasks and logs, reclaim space")
+    p_gc.add_argument("--older-than", type=int, default=LOG_RETENTION_DAYS, metavar="DAYS",
+                      help=f"Archive log entries older than DAYS (default {LOG_RETENTION_DAYS})")
+    p_gc.add_argument("--tasks-older-than", type=int, default=TASK_RETENTION_DAYS, metavar="DAYS",
+                      help="Archive done tasks not updated for DAYS "
+                           f"(default {TASK_RETENTION_DAYS})")
+    p_gc.add_argument("--full", action="store_true",
+                      help="Allow a full VACUUM (locks the database while it runs)")
+
+    p_search = sub.add_parser("search", help="Full-text search tasks and comments")
+    p_search.add_argument("query")
+    p_search.add_argument("-p", "--project", help="Filter by project prefix")
+    p_search.add_argument("--stage")
+    p_search.add_argument("--tag")
+    p_search.add_argument("--limit", type=int, default=20)
+    p_search.add_argument("--json", action="store_true")
+
+    p_history = sub.add_parser("history", help="Show a task's stage visits and durations")
+    p_history.add_argument("id")
+    p_history.add_argument("--json", action="store_true")
+
+    p_stats = sub.add_parser("stats", help="Time spent per stage across tasks")
+    p_stats.add_argument("--since", type=float, metavar="HOURS",
+                         help="Only visits that ended in the last HOURS")
+    p_stats.add_argument("--json", action="store_true")
+
+    p_profile = sub.add_parser("profile", help="Top SQL statements recorded with TAKT_PROFILE=1")
+    p_profile.add_argument("--top", type=int, default=15)
+    p_profile.add_argument("--reset", action="store_true", help="Delete recorded samples")
+    p_profile.add_argument("--json", action="store_true")
+
+    p_changes = sub.add_parser("changes", help="Show changes since a revision")
+    p_changes.add_argument("--since", type=int, default=0, help="Last revision seen")
+    p_changes.add_argument("--limit", type=int)
+    p_changes.add_argument("--json", action="store_true")
+
+    sub.add_parser("serve", help="Answer takt commands over .takt/takt.sock")
 
     p_project = sub.add_parser("project", help="Manage projects")
     project_sub = p_project.add_subparsers(dest="project_command")
@@ -140,7 +349,15 @@ def _build_parser() -> argparse.ArgumentParser:
     return parser
 
 
-def main(argv: list[str] | None = None) -> int:
+def main(argv: list[str] | None = None, root: Path | None = None) -> int:
+    """Run a takt command. root is set when called from `takt serve`."""
+    if root is None:
+        if argv is None:
+            argv = sys.argv[1:]
+        code = forward(argv, _find_project_root())
+        if code is not None:
+            return code
+
     parser = _build_parser()
     args = parser.parse_args(argv)
 
@@ -156,15 +373,171 @@ def main(argv: list[str] | None = None) -> int:
         print(f"Initialized takt database at {root / '.takt' / 'takt.db'} (prefix: {prefix})")
         return 0
 
-    root = _find_project_root()
+    root = root or _find_project_root()
+    if args.command == "profile":
+        return _profile(args, root)
+
+    if args.command == "serve":
+        from .server import serve
+
+        print(f"Serving takt on {socket_path(root)}", file=sys.stderr)
+        serve(root)
+        return 0
+
     try:
         with get_db(root) as db:
             return _dispatch(args, db)
+    except TransitionConflict as e:
+        print(f"Conflict: {e}", file=sys.stderr)
+        return EXIT_CONFLICT
     except Exception as e:
         print(f"Error: {e}", file=sys.stderr)
         return 1
 
 
+def _list(args: argparse.Namespace, db) -> int:
+    fields = [f.strip() for f in args.fields.split(",") if f.strip()] if args.fields else None
+    if fields and not (args.json or args.ndjson):
+        print("--fields requires --json or --ndjson", file=sys.stderr)
+        return 1
+    query = dict(stage=args.stage, status=args.status, tag=args.tag, prefix=args.project,
+                 limit=args.limit, after=args.after, fields=fields,
+                 include_archived=args.include_archived)
+    if args.ndjson:
+        for task in iter_tasks(db, **query):
+            sys.stdout.write(json.dumps(_task_for_output(task)) + "\n")
+        return 0
+    tasks = list_tasks(db, **query)
+    if args.json:
+        print(json.dumps([_task_for_output(t) for t in tasks], indent=2))
+    else:
+        _print_task_list(tasks)
+    return 0
+
+
+def _log(args: argparse.Namespace, db) -> int:
+    if bool(args.id) == args.all:
+        print("Give a task id or --all", file=sys.stderr)
+        return 1
+    if not (args.follow or args.since_id is not None):
+        entries = get_log(db, args.id, type=args.type, include_archived=args.archived)
+        if args.all and entries:
+            for e in entries:
+                _print_log_entry(e, True)
+        else:
+            _print_log(entries)
+        return 0
+
+    after_id = args.since_id
+    if after_id is None:
+        # Following one task replays its history first; --all starts at the tail.
+        after_id = last_log_id(db) if args.all else 0
+    if not args.follow:
+        entries = get_log_since(db, after_id, task_id=args.id)
+        for e in entries:
+            if args.type is None or e["type"] == args.type:
+                _print_log_entry(e, args.all)
+        return 0
+
+    db.commit()  # follow_log must see other connections' commits
+    try:
+        for e in follow_log(db, after_id, task_id=args.id):
+            if args.type is None or e["type"] == args.type:
+                _print_log_entry(e, args.all)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _gc(args: argparse.Namespace, db) -> int:
+    from .archive import FULL_VACUUM_HINT, gc
+
+    report = gc(db, older_than_days=args.older_than,
+                tasks_older_than_days=args.tasks_older_than, full=args.full)
+    print(f"Archived {report['tasks_archived']} done tasks")
+    print(f"Archived {report['archived']} log entries")
+    print(f"Pruned {report['changes_pruned']} change rows")
+    print(f"Reclaimed {_fmt_bytes(report['reclaimed_bytes'])}")
+    if report["needs_full_vacuum"]:
+        print(FULL_VACUUM_HINT)
+    return 0
+
+
+def _search(args: argparse.Namespace, db) -> int:
+    from .search import search
+
+    results = search(db, args.query, prefix=args.project, stage=args.stage,
+                     tag=args.tag, limit=args.limit)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        _print_search_results(results)
+    return 0
+
+
+def _history(args: argparse.Namespace, db) -> int:
+    from .history import get_stage_history
+
+    visits = get_stage_history(db, args.id)
+    if args.json:
+        for v in visits:
+            v["entered_at"], v["exited_at"] = _fmt_ts(v["entered_at"]), _fmt_ts(v["exited_at"])
+        print(json.dumps(visits, indent=2))
+    else:
+        _print_history(visits)
+    return 0
+
+
+def _stats(args: argparse.Namespace, db) -> int:
+    from .history import stage_stats
+
+    stats = stage_stats(db, since_hours=args.since)
+    if args.json:
+        print(json.dumps(stats, indent=2))
+    else:
+        _print_stats(stats)
+    return 0
+
+
+def _wait(args: argparse.Namespace, db) -> int:
+    from .wait import parse_condition, wait_for
+
+    until = [c for text in args.until for c in parse_condition(text)]
+    db.commit()  # wait_for must see other connections' commits
+    try:
+        met = wait_for(db, args.ids, until, require_all=args.all, timeout=args.timeout)
+    except KeyboardInterrupt:
+        return 130
+    if met is None:
+        print("Timed out", file=sys.stderr)
+        return EXIT_TIMEOUT
+    for task_id, i in met.items():
+        field, value = until[i]
+        print(f"{task_id}: {field}={value}")
+    # Conditions are listed best outcome first: report the last one any task met.
+    return EXIT_WAIT_MET + max(met.values())
+
+
+def _profile(args: argparse.Namespace, root: Path) -> int:
+    from .profile import load_samples, reset, summarize
+
+    if args.reset:
+        print(f"Removed {reset(root)} metrics file(s)")
+        return 0
+    rows = summarize(load_samples(root), top=args.top)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return 0
+    if not rows:
+        print("No samples. Run with TAKT_PROFILE=1 to record SQL timings.")
+        return 0
+    print(f"{'TOTAL ms':>10} {'COUNT':>7} {'P95 ms':>8}  CALLER / SQL")
+    for r in rows:
+        print(f"{r['total_ms']:>10.1f} {r['count']:>7} {r['p95_ms']:>8.3f}  {r['caller']}")
+        print(f"{'':>28}  {r['sql'][:100]}")
+    return 0
+
+
 def _dispatch(args: argparse.Namespace, db) -> int:
     cmd = args.command
 
@@ -191,27 +564,33 @@ def _dispatch(args: argparse.Namespace, db) -> int:
         print(task["id"])
         return 0
 
+    if cmd == "import":
+        specs = _read_import(args.file)
+        tasks = create_tasks(db, specs, prefix=args.project)
+        if args.json:
+            print(json.dumps([_task_for_output(t) for t in tasks], indent=2))
+        else:
+            for task in tasks:
+                print(task["id"])
+        return 0
+
     if cmd == "show":
         task = get_task(db, args.id)
         if task is None:
             print(f"Task not found: {args.id}", file=sys.stderr)
             return 1
         if args.json:
-            print(json.dumps(task, indent=2))
+            print(json.dumps(_task_for_output(task), indent=2))
         else:
             _print_task(task)
         return 0
 
     if cmd == "list":
-        tasks = list_tasks(db, stage=args.stage, status=args.status, tag=args.tag, prefix=args.project)
-        if args.json:
-            print(json.dumps(tasks, indent=2))
-        else:
-            _print_task_list(tasks)
-        return 0
+        return _list(args, db)
 
     if cmd == "advance":
-        task = advance_task(db, args.id, to_stage=args.to_stage)
+        task = advance_task(db, args.id, to_stage=args.to_stage,
+                            expect_stage=args.expect_stage, expect_status=args.expect_status)
         print(f"{task['id']}: {task['stage']}")
         return 0
 
@@ -221,22 +600,25 @@ def _dispatch(args: argparse.Namespace, db) -> int:
         return 0
 
     if cmd == "claim":
-        task = claim_task(db, args.id, args.agent)
+        task = claim_task(db, args.id, args.agent,
+                          expect_stage=args.expect_stage, expect_status=args.expect_status)
         print(f"{task['id']}: claimed by {args.agent}")
         return 0
 
     if cmd == "release":
-        task = release_task(db, args.id)
+        task = release_task(db, args.id,
+                            expect_stage=args.expect_stage, expect_status=args.expect_status)
         print(f"{task['id']}: released")
         return 0
 
     if cmd == "block":
-        task = block_task(db, args.id)
+        task = block_task(db, args.id,
+                          expect_stage=args.expect_stage, expect_status=args.expect_status)
         print(f"{task['id']}: blocked")
         return 0
 
     if cmd == "update":
-        task = get_task(db, args.id)
+        task = get_task(db, args.id, include_archived=False)
         if task is None:
             print(f"Task not found: {args.id}", file=sys.stderr)
             return 1
@@ -260,8 +642,36 @@ def _dispatch(args: argparse.Namespace, db) -> int:
         return 0
 
     if cmd == "log":
-        entries = get_log(db, args.id, type=args.type)
-        _print_log(entries)
+        return _log(args, db)
+
+    if cmd == "wait":
+        return _wait(args, db)
+
+    if cmd == "gc":
+        return _gc(args, db)
+
+    if cmd == "search":
+        return _search(args, db)
+
+    if cmd == "history":
+        return _history(args, db)
+
+    if cmd == "stats":
+        return _stats(args, db)
+
+    if cmd == "changes":
+        try:
+            changes = changes_since(db, args.since, limit=args.limit)
+        except ChangesPruned as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return EXIT_RESYNC
+        revision = changes[-1]["rev"] if changes else current_revision(db)
+        if args.json:
+            for c in changes:
+                c["changed_at"] = _fmt_ts(c["changed_at"])
+            print(json.dumps({"revision": revision, "changes": changes}, indent=2))
+        else:
+            _print_changes(changes, revision)
         return 0
 
     if cmd == "project":
@@ -302,6 +712,12 @@ def _project_add(args: argparse.Namespace, db) -> int:
     ).fetchone()
     if max_row and max_row[0] is not None:
         next_seq = max_row[0] + 1
+    # Archived tasks keep their ids: never hand those out again.
+    from .archive import archived_max_seq
+
+    archived_seq = archived_max_seq(db, prefix)
+    if archived_seq is not None:
+        next_seq = max(next_seq, archived_seq + 1)
     if args.default:
         db.execute("UPDATE projects SET is_default = 0 WHERE is_default = 1")
     has_any = db.execute("SELECT 1 FROM projects LIMIT 1").fetchone()
@@ -356,9 +772,11 @@ def _project_rm(args: argparse.Namespace, db) -> int:
     if is_default["is_default"]:
         print("Cannot remove default project. Switch default first.", file=sys.stderr)
         return 1
+    from .archive import archived_max_seq
+
     has_tasks = db.execute(
         "SELECT 1 FROM tasks WHERE id LIKE ?", (f"{prefix}-%",)
-    ).fetchone()
+    ).fetchone() or archived_max_seq(db, prefix) is not None
     if has_tasks:
         print(f"Cannot remove {prefix}: tasks still reference it", file=sys.stderr)
         return 1
@@ -0,0 +1,73 @@
+"""Client side of `takt serve`: forward a CLI command over .takt/takt.sock.
+
+Kept separate from .server so ordinary CLI runs never import socketserver.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+
+SOCKET_FILE = "takt.sock"
+CLIENT_TIMEOUT = 30.0
+
+# Short, non-interactive commands only; anything reading local files or
+# stdin, or running for a long time, stays in the calling process.
+SERVED_COMMANDS = frozenset({
+    "advance", "block", "changes", "claim", "comment", "create", "history",
+    "list", "log", "project", "reject", "release", "search", "show", "stats",
+    "update",
+})
+
+# Flags that keep an otherwise served command local (help, long-running).
+LOCAL_FLAGS = frozenset({"-h", "--help", "-f", "--follow"})
+
+
+def socket_path(root: Path) -> Path:
+    return root / ".takt" / SOCKET_FILE
+
+
+def forward(argv: list[str], root: Path) -> int | None:
+    """Run argv on a running server. Returns None when none is reachable.
+
+    Only a failed connect falls back to the caller: once the request is
+    sent the command may have run, so later errors are reported instead.
+    """
+    if os.environ.get("TAKT_NO_SERVER"):
+        return None
+    if not argv or argv[0] not in SERVED_COMMANDS or LOCAL_FLAGS.intersection(argv):
+        return None
+    path = socket_path(root)
+    if not path.exists():
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CLIENT_TIMEOUT)
+        try:
+            sock.connect(str(path))
+        except OSError:
+            return None
+        try:
+            sock.sendall(json.dumps({"argv": argv}).encode() + b"\n")
+            sock.shutdown(socket.SHUT_WR)
+            reply = json.loads(_recv_all(sock))
+        except (OSError, ValueError) as e:
+            print(f"Error: takt server: {e}", file=sys.stderr)
+            return 1
+    finally:
+        sock.close()
+    sys.stdout.write(reply["stdout"])
+    sys.stderr.write(reply["stderr"])
+    return reply["code"]
+
+
+def _recv_all(sock: socket.socket) -> bytes:
+    chunks = []
+    while True:
+        chunk = sock.recv(65536)
+        if not chunk:
+            return b"".join(chunks)
+        chunks.append(chunk)
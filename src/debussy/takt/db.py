@@ -2,13 +2,19 @@
 
 from __future__ import annotations
 
+import json
+import os
 import sqlite3
+import threading
 from contextlib import contextmanager
 from pathlib import Path
 
-SCHEMA_VERSION = 5
+SCHEMA_VERSION = 11
 
-SCHEMA_SQL = """\
+# Task and log timestamps are integer milliseconds since the Unix epoch.
+NOW_MS = "CAST(round((julianday('now') - 2440587.5) * 86400000) AS INTEGER)"
+
+SCHEMA_SQL = f"""\
 CREATE TABLE IF NOT EXISTS metadata (
     key   TEXT PRIMARY KEY,
     value TEXT NOT NULL
@@ -26,8 +32,9 @@ CREATE TABLE IF NOT EXISTS tasks (
                     CHECK(status IN ('pending','active','blocked')),
     tags            TEXT DEFAULT '[]',
     rejection_count INTEGER DEFAULT 0,
-    created_at      TEXT DEFAULT (datetime('now')),
-    updated_at      TEXT DEFAULT (datetime('now'))
+    created_at      INTEGER DEFAULT ({NOW_MS}),
+    updated_at      INTEGER DEFAULT ({NOW_MS}),
+    unresolved_count INTEGER NOT NULL DEFAULT 0
 );
 
 CREATE TABLE IF NOT EXISTS dependencies (
@@ -39,14 +46,16 @@ CREATE TABLE IF NOT EXISTS dependencies (
 CREATE TABLE IF NOT EXISTS log (
     id        INTEGER PRIMARY KEY AUTOINCREMENT,
     task_id   TEXT REFERENCES tasks(id),
-    timestamp TEXT DEFAULT (datetime('now')),
+    timestamp INTEGER DEFAULT ({NOW_MS}),
     type      TEXT CHECK(type IN ('comment','transition','assignment')),
     author    TEXT,
     message   TEXT
 );
 
-CREATE INDEX IF NOT EXISTS idx_tasks_stage_status ON tasks(stage, status);
-CREATE INDEX IF NOT EXISTS idx_log_task_id ON log(task_id);
+CREATE INDEX IF NOT EXISTS idx_tasks_stage_status ON tasks(stage, status, created_at);
+CREATE INDEX IF NOT EXISTS idx_tasks_created ON tasks(created_at);
+CREATE INDEX IF NOT EXISTS idx_tasks_updated ON tasks(updated_at);
+CREATE INDEX IF NOT EXISTS idx_log_task_id ON log(task_id, id);
 CREATE INDEX IF NOT EXISTS idx_deps_task ON dependencies(task_id);
 CREATE INDEX IF NOT EXISTS idx_deps_dep ON dependencies(depends_on_id);
 
@@ -57,8 +66,306 @@ CREATE TABLE IF NOT EXISTS projects (
     next_seq   INTEGER NOT NULL DEFAULT 1
 );
 CREATE UNIQUE INDEX IF NOT EXISTS idx_projects_default ON projects(is_default) WHERE is_default = 1;
+
+CREATE TABLE IF NOT EXISTS changes (
+    rev        INTEGER PRIMARY KEY AUTOINCREMENT,
+    task_id    TEXT NOT NULL,
+    kind       TEXT NOT NULL CHECK(kind IN ('task','dependency','log')),
+    op         TEXT NOT NULL CHECK(op IN ('insert','update','delete')),
+    row_id     INTEGER,
+    changed_at INTEGER DEFAULT ({NOW_MS})
+);
+
+CREATE TABLE IF NOT EXISTS task_tags (
+    task_id  TEXT NOT NULL,
+    tag      TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (task_id, tag)
+);
+CREATE INDEX IF NOT EXISTS idx_task_tags_tag ON task_tags(tag, task_id);
+
+CREATE TABLE IF NOT EXISTS stage_history (
+    id          INTEGER PRIMARY KEY,
+    task_id     TEXT NOT NULL,
+    stage       TEXT NOT NULL,
+    entered_at  INTEGER NOT NULL DEFAULT ({NOW_MS}),
+    exited_at   INTEGER,
+    duration_s  INTEGER,
+    agent       TEXT,
+    outcome     TEXT CHECK(outcome IN ('advanced','rejected')),
+    next_stage  TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_stage_history_task ON stage_history(task_id, id);
+CREATE INDEX IF NOT EXISTS idx_stage_history_stage ON stage_history(stage, entered_at);
+CREATE INDEX IF NOT EXISTS idx_stage_history_exited ON stage_history(exited_at);
 """
 
+# Trigger bodies contain ';', so they cannot live in SCHEMA_SQL.
+TRIGGERS_SQL = [
+    """CREATE TRIGGER IF NOT EXISTS trg_changes_task_insert AFTER INSERT ON tasks
+       BEGIN INSERT INTO changes (task_id, kind, op) VALUES (new.id, 'task', 'insert'); END""",
+    # unresolved_count is derived from dependency rows, which already log their own changes.
+    """CREATE TRIGGER IF NOT EXISTS trg_changes_task_update AFTER UPDATE ON tasks
+       WHEN old.unresolved_count = new.unresolved_count
+       BEGIN INSERT INTO changes (task_id, kind, op) VALUES (new.id, 'task', 'update'); END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_changes_task_delete AFTER DELETE ON tasks
+       BEGIN INSERT INTO changes (task_id, kind, op) VALUES (old.id, 'task', 'delete'); END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_changes_dep_insert AFTER INSERT ON dependencies
+       BEGIN INSERT INTO changes (task_id, kind, op) VALUES (new.task_id, 'dependency', 'insert'); END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_changes_dep_delete AFTER DELETE ON dependencies
+       BEGIN INSERT INTO changes (task_id, kind, op) VALUES (old.task_id, 'dependency', 'delete'); END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_changes_log_insert AFTER INSERT ON log
+       BEGIN INSERT INTO changes (task_id, kind, op, row_id) VALUES (new.task_id, 'log', 'insert', new.id); END""",
+    # task_tags mirrors the tags JSON column so tag filters and tag ordering
+    # can use an index instead of json_each() over every row.
+    """CREATE TRIGGER IF NOT EXISTS trg_task_tags_insert AFTER INSERT ON tasks
+       BEGIN
+         INSERT OR IGNORE INTO task_tags (task_id, tag, position)
+         SELECT new.id, value, key FROM json_each(new.tags);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_task_tags_update AFTER UPDATE OF tags ON tasks
+       BEGIN
+         DELETE FROM task_tags WHERE task_id = new.id;
+         INSERT OR IGNORE INTO task_tags (task_id, tag, position)
+         SELECT new.id, value, key FROM json_each(new.tags);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_task_tags_delete AFTER DELETE ON tasks
+       BEGIN DELETE FROM task_tags WHERE task_id = old.id; END""",
+    # tasks.unresolved_count = number of dependencies not yet in acceptance/done.
+    """CREATE TRIGGER IF NOT EXISTS trg_unresolved_dep_insert AFTER INSERT ON dependencies
+       WHEN NOT EXISTS (SELECT 1 FROM tasks WHERE id = new.depends_on_id
+                        AND stage IN ('acceptance', 'done'))
+       BEGIN
+         UPDATE tasks SET unresolved_count = unresolved_count + 1 WHERE id = new.task_id;
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_unresolved_dep_delete AFTER DELETE ON dependencies
+       WHEN NOT EXISTS (SELECT 1 FROM tasks WHERE id = old.depends_on_id
+                        AND stage IN ('acceptance', 'done'))
+       BEGIN
+         UPDATE tasks SET unresolved_count = unresolved_count - 1 WHERE id = old.task_id;
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_unresolved_stage AFTER UPDATE OF stage ON tasks
+       WHEN (old.stage IN ('acceptance', 'done')) != (new.stage IN ('acceptance', 'done'))
+       BEGIN
+         UPDATE tasks
+         SET unresolved_count = unresolved_count
+             + CASE WHEN new.stage IN ('acceptance', 'done') THEN -1 ELSE 1 END
+         WHERE id IN (SELECT task_id FROM dependencies WHERE depends_on_id = new.id);
+       END""",
+    # stage_history: one row per stage visit; the open row has exited_at NULL.
+    """CREATE TRIGGER IF NOT EXISTS trg_stage_history_insert AFTER INSERT ON tasks
+       BEGIN INSERT INTO stage_history (task_id, stage) VALUES (new.id, new.stage); END""",
+    f"""CREATE TRIGGER IF NOT EXISTS trg_stage_history_update AFTER UPDATE OF stage ON tasks
+       WHEN old.stage != new.stage
+       BEGIN
+         UPDATE stage_history
+         SET exited_at = {NOW_MS},
+             duration_s = CAST(round(({NOW_MS} - entered_at) / 1000.0) AS INTEGER),
+             outcome = CASE WHEN new.rejection_count > old.rejection_count
+                            THEN 'rejected' ELSE 'advanced' END,
+             next_stage = new.stage
+         WHERE task_id = new.id AND exited_at IS NULL;
+         INSERT INTO stage_history (task_id, stage) VALUES (new.id, new.stage);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_stage_history_claim AFTER INSERT ON log
+       WHEN new.type = 'assignment'
+       BEGIN
+         UPDATE stage_history SET agent = new.author
+         WHERE task_id = new.task_id AND exited_at IS NULL;
+       END""",
+]
+
+# Full-text index over task titles/descriptions and comments. A task is
+# indexed under rowid -tasks.rowid and a comment under rowid log.id, so the
+# sync triggers can address documents without scanning the index.
+FTS_SQL = """CREATE VIRTUAL TABLE IF NOT EXISTS search_index USING fts5(
+    title, body, task_id UNINDEXED, kind UNINDEXED, row_id UNINDEXED,
+    tokenize = 'porter unicode61'
+)"""
+
+FTS_TRIGGERS_SQL = [
+    """CREATE TRIGGER IF NOT EXISTS trg_search_task_insert AFTER INSERT ON tasks
+       BEGIN
+         INSERT INTO search_index (rowid, title, body, task_id, kind)
+         VALUES (-new.rowid, new.title, new.description, new.id, 'task');
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_search_task_update AFTER UPDATE OF title, description ON tasks
+       BEGIN
+         DELETE FROM search_index WHERE rowid = -old.rowid;
+         INSERT INTO search_index (rowid, title, body, task_id, kind)
+         VALUES (-new.rowid, new.title, new.description, new.id, 'task');
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_search_task_delete AFTER DELETE ON tasks
+       BEGIN DELETE FROM search_index WHERE rowid = -old.rowid; END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_search_log_insert AFTER INSERT ON log
+       WHEN new.type = 'comment'
+       BEGIN
+         INSERT INTO search_index (rowid, title, body, task_id, kind, row_id)
+         VALUES (new.id, '', new.message, new.task_id, 'comment', new.id);
+       END""",
+    """CREATE TRIGGER IF NOT EXISTS trg_search_log_delete AFTER DELETE ON log
+       WHEN old.type = 'comment'
+       BEGIN DELETE FROM search_index WHERE rowid = old.id; END""",
+]
+
+
+def _table_exists(conn: sqlite3.Connection, name: str) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (name,)
+    ).fetchone() is not None
+
+
+def has_fts(conn: sqlite3.Connection) -> bool:
+    """True if the full-text search index exists (SQLite built with FTS5)."""
+    return _table_exists(conn, "search_index")
+
+
+def _create_fts(conn: sqlite3.Connection) -> bool:
+    try:
+        conn.execute(FTS_SQL)
+    except sqlite3.OperationalError:
+        # SQLite built without FTS5 — search is unavailable, everything else works.
+        return False
+    return True
+
+
+def _backfill_fts(conn: sqlite3.Connection) -> None:
+    conn.execute("DELETE FROM search_index")
+    conn.execute(
+        "INSERT INTO search_index (rowid, title, body, task_id, kind) "
+        "SELECT -rowid, title, description, id, 'task' FROM tasks"
+    )
+    if _table_exists(conn, "log"):
+        conn.execute(
+            "INSERT INTO search_index (rowid, title, body, task_id, kind, row_id) "
+            "SELECT id, '', message, task_id, 'comment', id FROM log WHERE type = 'comment'"
+        )
+
+
+def recount_unresolved(conn: sqlite3.Connection) -> None:
+    """Recompute tasks.unresolved_count from scratch (used by migrations)."""
+    conn.execute(
+        "UPDATE tasks SET unresolved_count = ("
+        "SELECT COUNT(*) FROM dependencies d LEFT JOIN tasks t ON t.id = d.depends_on_id "
+        "WHERE d.task_id = tasks.id "
+        "AND (t.stage IS NULL OR t.stage NOT IN ('acceptance', 'done')))"
+    )
+
+
+def to_ms(expr: str) -> str:
+    """SQL converting a datetime('now')-style text expression to epoch ms; other values pass through."""
+    return (
+        f"CASE WHEN typeof({expr}) = 'text' "
+        f"THEN CAST(round((julianday({expr}) - 2440587.5) * 86400000) AS INTEGER) "
+        f"ELSE {expr} END"
+    )
+
+
+def _migrate_epoch_ms(conn: sqlite3.Connection) -> None:
+    """Rebuild tasks, log, stage_history and changes with integer epoch-ms
+    timestamps (schema v11).
+
+    Task rowids, log ids and change revisions are kept, so search_index
+    documents, ids in the log archive and change-feed cursors stay valid.
+    Triggers are dropped first because they reference these tables;
+    _apply_schema recreates them.
+    """
+    conn.commit()
+    conn.execute("PRAGMA foreign_keys=OFF")
+    for (name,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='trigger'"
+    ).fetchall():
+        conn.execute(f"DROP TRIGGER {name}")
+
+    conn.execute("DROP TABLE IF EXISTS tasks_new")
+    conn.execute(
+        "CREATE TABLE tasks_new ("
+        "id TEXT PRIMARY KEY, seq INTEGER NOT NULL, "
+        "title TEXT NOT NULL, description TEXT DEFAULT '', "
+        "stage TEXT DEFAULT 'backlog' "
+        "CHECK(stage IN ('backlog','development','reviewing',"
+        "'security_review','merging','acceptance','parked','done')), "
+        "status TEXT DEFAULT 'pending' "
+        "CHECK(status IN ('pending','active','blocked')), "
+        "tags TEXT DEFAULT '[]', "
+        "rejection_count INTEGER DEFAULT 0, "
+        f"created_at INTEGER DEFAULT ({NOW_MS}), "
+        f"updated_at INTEGER DEFAULT ({NOW_MS}), "
+        "unresolved_count INTEGER NOT NULL DEFAULT 0)"
+    )
+    conn.execute(
+        "INSERT INTO tasks_new (rowid, id, seq, title, description, stage, status, tags, "
+        "rejection_count, created_at, updated_at, unresolved_count) "
+        "SELECT rowid, id, seq, title, description, stage, status, tags, rejection_count, "
+        f"{to_ms('created_at')}, {to_ms('updated_at')}, unresolved_count FROM tasks"
+    )
+    conn.execute("DROP TABLE tasks")
+    conn.execute("ALTER TABLE tasks_new RENAME TO tasks")
+
+    if _table_exists(conn, "log"):
+        seq = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'log'").fetchone()
+        conn.execute("DROP TABLE IF EXISTS log_new")
+        conn.execute(
+            "CREATE TABLE log_new ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "task_id TEXT REFERENCES tasks(id), "
+            f"timestamp INTEGER DEFAULT ({NOW_MS}), "
+            "type TEXT CHECK(type IN ('comment','transition','assignment')), "
+            "author TEXT, message TEXT)"
+        )
+        conn.execute(
+            "INSERT INTO log_new (id, task_id, timestamp, type, author, message) "
+            f"SELECT id, task_id, {to_ms('timestamp')}, type, author, message FROM log"
+        )
+        conn.execute("DROP TABLE log")
+        conn.execute("ALTER TABLE log_new RENAME TO log")
+        if seq:
+            # Archived rows left the table; never hand their ids out again.
+            conn.execute(
+                "UPDATE sqlite_sequence SET seq = max(seq, ?) WHERE name = 'log'", (seq[0],)
+            )
+
+    if _table_exists(conn, "stage_history"):
+        conn.execute("DROP TABLE IF EXISTS stage_history_new")
+        conn.execute(
+            "CREATE TABLE stage_history_new ("
+            "id INTEGER PRIMARY KEY, task_id TEXT NOT NULL, stage TEXT NOT NULL, "
+            f"entered_at INTEGER NOT NULL DEFAULT ({NOW_MS}), exited_at INTEGER, "
+            "duration_s INTEGER, agent TEXT, "
+            "outcome TEXT CHECK(outcome IN ('advanced','rejected')), next_stage TEXT)"
+        )
+        conn.execute(
+            "INSERT INTO stage_history_new SELECT id, task_id, stage, "
+            f"{to_ms('entered_at')}, {to_ms('exited_at')}, duration_s, agent, outcome, "
+            "next_stage FROM stage_history"
+        )
+        conn.execute("DROP TABLE stage_history")
+        conn.execute("ALTER TABLE stage_history_new RENAME TO stage_history")
+
+    if _table_exists(conn, "changes"):
+        seq = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'changes'").fetchone()
+        conn.execute("DROP TABLE IF EXISTS changes_new")
+        conn.execute(
+            "CREATE TABLE changes_new ("
+            "rev INTEGER PRIMARY KEY AUTOINCREMENT, task_id TEXT NOT NULL, "
+            "kind TEXT NOT NULL CHECK(kind IN ('task','dependency','log')), "
+            "op TEXT NOT NULL CHECK(op IN ('insert','update','delete')), "
+            f"row_id INTEGER, changed_at INTEGER DEFAULT ({NOW_MS}))"
+        )
+        conn.execute(
+            "INSERT INTO changes_new SELECT rev, task_id, kind, op, row_id, "
+            f"{to_ms('changed_at')} FROM changes"
+        )
+        conn.execute("DROP TABLE changes")
+        conn.execute("ALTER TABLE changes_new RENAME TO changes")
+        if seq:
+            # Pruned revisions must never be handed out again.
+            conn.execute(
+                "UPDATE sqlite_sequence SET seq = max(seq, ?) WHERE name = 'changes'", (seq[0],)
+            )
+    conn.commit()
+    conn.execute("PRAGMA foreign_keys=ON")
+
 
 def _find_project_root(start: Path | None = None) -> Path:
     """Walk up from start to find a directory containing .takt/ or .git/."""
@@ -204,6 +511,52 @@ def _migrate(conn: sqlite3.Connection) -> None:
             conn.execute("ALTER TABLE tasks_new RENAME TO tasks")
             conn.commit()
             conn.execute("PRAGMA foreign_keys=ON")
+    has_tasks = _table_exists(conn, "tasks")
+    if version < 7 and has_tasks:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS task_tags ("
+            "task_id TEXT NOT NULL, tag TEXT NOT NULL, position INTEGER NOT NULL, "
+            "PRIMARY KEY (task_id, tag))"
+        )
+        conn.execute(
+            "INSERT OR IGNORE INTO task_tags (task_id, tag, position) "
+            "SELECT t.id, j.value, j.key FROM tasks t, json_each(t.tags) j"
+        )
+    if version < 8 and has_tasks and _create_fts(conn):
+        _backfill_fts(conn)
+    if version < 9 and has_tasks:
+        cols = [r[1] for r in conn.execute("PRAGMA table_info(tasks)").fetchall()]
+        if "unresolved_count" not in cols:
+            conn.execute(
+                "ALTER TABLE tasks ADD COLUMN unresolved_count INTEGER NOT NULL DEFAULT 0"
+            )
+        if _table_exists(conn, "dependencies"):
+            recount_unresolved(conn)
+        # Recreated by _apply_schema with a WHEN clause that ignores counter updates.
+        conn.execute("DROP TRIGGER IF EXISTS trg_changes_task_update")
+    if version < 10 and has_tasks:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS stage_history ("
+            "id INTEGER PRIMARY KEY, task_id TEXT NOT NULL, stage TEXT NOT NULL, "
+            "entered_at TEXT NOT NULL DEFAULT (datetime('now')), exited_at TEXT, "
+            "duration_s INTEGER, agent TEXT, "
+            "outcome TEXT CHECK(outcome IN ('advanced','rejected')), next_stage TEXT)"
+        )
+        # Earlier visits only exist as free-text log messages; open one row
+        # per task for its current stage, entered at its last transition.
+        entered = "t.created_at"
+        if _table_exists(conn, "log"):
+            entered = (
+                "COALESCE((SELECT MAX(timestamp) FROM log l WHERE l.task_id = t.id "
+                "AND l.type = 'transition'), t.created_at)"
+            )
+        conn.execute(
+            "INSERT INTO stage_history (task_id, stage, entered_at) "
+            f"SELECT t.id, t.stage, COALESCE({entered}, datetime('now')) FROM tasks t "
+            "WHERE NOT EXISTS (SELECT 1 FROM stage_history h WHERE h.task_id = t.id)"
+        )
+    if version < 11 and has_tasks:
+        _migrate_epoch_ms(conn)
     conn.commit()
     conn.execute("PRAGMA user_version = %d" % SCHEMA_VERSION)
 
@@ -215,23 +568,193 @@ def _apply_schema(conn: sqlite3.Connection) -> None:
     _migrate(conn)
     for stmt in _SCHEMA_STATEMENTS:
         conn.execute(stmt)
+    for stmt in TRIGGERS_SQL:
+        conn.execute(stmt)
+    if _create_fts(conn):
+        for stmt in FTS_TRIGGERS_SQL:
+            conn.execute(stmt)
     conn.execute("PRAGMA user_version = %d" % SCHEMA_VERSION)
 
 
-def _configure(conn: sqlite3.Connection) -> None:
+# Named sets of per-connection pragmas, picked with the sqlite_profile key
+# in .debussy/config.json (or TAKT_SQLITE_PROFILE). "default" keeps
+# SQLite's own settings. synchronous=NORMAL is durable against crashes of
+# the process in WAL mode; only a power loss can drop the last commits.
+PERF_PROFILES: dict[str, dict[str, int | str]] = {
+    "default": {},
+    "balanced": {
+        "synchronous": "NORMAL",
+        "cache_size": -16_000,          # KiB
+        "temp_store": "MEMORY",
+        "mmap_size": 64 * 1024 * 1024,
+    },
+    "throughput": {
+        "synchronous": "NORMAL",
+        "cache_size": -64_000,
+        "temp_store": "MEMORY",
+        "mmap_size": 256 * 1024 * 1024,
+        # Fewer automatic checkpoints inside writers' commits; the watcher
+        # checkpoints on its heartbeat instead.
+        "wal_autocheckpoint": 4000,
+    },
+}
+PERF_PROFILE_ENV = "TAKT_SQLITE_PROFILE"
+
+# Above this WAL size the watcher's checkpoint truncates the file.
+WAL_TRUNCATE_BYTES = 32 * 1024 * 1024
+
+# Default retention for `takt gc`; kept here so the CLI parser needn't
+# import the archive module.
+LOG_RETENTION_DAYS = 30
+TASK_RETENTION_DAYS = 7
+
+
+def perf_profile_name(root: Path) -> str:
+    """Return the configured performance profile name for root."""
+    name = os.environ.get(PERF_PROFILE_ENV)
+    if name:
+        return name
+    try:
+        config = json.loads((root / ".debussy" / "config.json").read_text())
+    except (OSError, ValueError):
+        return "default"
+    name = config.get("sqlite_profile") if isinstance(config, dict) else None
+    return name if isinstance(name, str) else "default"
+
+
+def _configure(conn: sqlite3.Connection, profile: str = "default") -> None:
+    # Only takes effect on a new, empty database; `takt gc` converts old ones.
+    conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
     row = conn.execute("PRAGMA journal_mode=WAL").fetchone()
     if row and row[0] != "wal":
         import logging
         logging.warning("takt: WAL mode not available (mode=%s), concurrent access may be unreliable", row[0])
     conn.execute("PRAGMA busy_timeout=5000")
     conn.execute("PRAGMA foreign_keys=ON")
+    pragmas = PERF_PROFILES.get(profile)
+    if pragmas is None:
+        import logging
+        logging.warning("takt: unknown sqlite_profile %r, using default", profile)
+        pragmas = {}
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name}={value}")
+
+
+def checkpoint(conn: sqlite3.Connection, mode: str = "PASSIVE") -> tuple[int, int, int]:
+    """Run a WAL checkpoint; returns (busy, wal frames, frames checkpointed).
+
+    PASSIVE copies what it can without waiting on readers or writers;
+    TRUNCATE also resets the WAL file to zero bytes when no reader needs it.
+    """
+    if mode not in ("PASSIVE", "FULL", "RESTART", "TRUNCATE"):
+        raise ValueError(f"Unknown checkpoint mode: {mode}")
+    row = conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone()
+    return tuple(row)  # type: ignore[return-value]
+
+
+def wal_size(project_dir: Path | str | None = None) -> int:
+    """Size in bytes of the takt WAL file (0 when there is none). Does not open the database."""
+    root = Path(project_dir) if project_dir else _find_project_root()
+    try:
+        return (root / ".takt" / "takt.db-wal").stat().st_size
+    except OSError:
+        return 0
+
+
+class _CachedConnection:
+    """A configured connection reused by one thread for one database file."""
+
+    __slots__ = ("conn", "inode", "depth")
+
+    def __init__(self, conn: sqlite3.Connection, inode: int):
+        self.conn = conn
+        self.inode = inode
+        self.depth = 0
+
+
+# Database paths whose schema has been verified by this process.
+_verified: set[str] = set()
+_verified_lock = threading.Lock()
+_local = threading.local()
+
+
+def _thread_cache() -> dict[str, _CachedConnection]:
+    cache = getattr(_local, "connections", None)
+    if cache is None:
+        cache = _local.connections = {}
+    return cache
+
+
+def _inode(path: Path) -> int | None:
+    try:
+        return path.stat().st_ino
+    except FileNotFoundError:
+        return None
+
+
+def _ensure_schema(conn: sqlite3.Connection, key: str, root: Path) -> None:
+    """Run migrations and schema creation once per database path per process."""
+    with _verified_lock:
+        if key in _verified:
+            return
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            _apply_schema(conn)
+        _ensure_default_project(conn, root)
+        conn.commit()
+        _verified.add(key)
+
+
+def _connection(root: Path, db_path: Path) -> _CachedConnection:
+    key = str(db_path)
+    cache = _thread_cache()
+    cached = cache.get(key)
+    inode = _inode(db_path)
+    if cached is not None and (cached.depth or (inode is not None and inode == cached.inode)):
+        return cached
+    if cached is not None:
+        # The file was deleted or replaced (e.g. `debussy clear`) — start over.
+        cached.conn.close()
+        del cache[key]
+        with _verified_lock:
+            _verified.discard(key)
+
+    if os.environ.get("TAKT_PROFILE"):  # see takt/profile.py
+        from .profile import profiled_connect
+        conn = profiled_connect(key, root)
+    else:
+        conn = sqlite3.connect(key)
+    conn.row_factory = sqlite3.Row
+    try:
+        _configure(conn, perf_profile_name(root))
+        _ensure_schema(conn, key, root)
+    except Exception:
+        conn.close()
+        raise
+    cached = _CachedConnection(conn, _inode(db_path) or 0)
+    cache[key] = cached
+    return cached
+
+
+def clear_connection_cache() -> None:
+    """Close this thread's cached connections and forget verified schemas."""
+    cache = _thread_cache()
+    for cached in cache.values():
+        cached.conn.close()
+    cache.clear()
+    with _verified_lock:
+        _verified.clear()
 
 
 @contextmanager
 def get_db(project_dir: Path | str | None = None):
     """Context manager that yields a configured SQLite connection.
 
-    Auto-creates .takt/ directory and schema if missing.
+    Auto-creates .takt/ directory and schema if missing. Connections are
+    cached per thread and the schema is verified once per process, so
+    repeated calls cost a stat() rather than a reconnect. The outermost
+    context commits on success and rolls back on error; nested contexts
+    on the same thread run inside a savepoint.
     """
     root = Path(project_dir) if project_dir else _find_project_root()
     takt_dir = root / ".takt"
@@ -241,21 +764,34 @@ def get_db(project_dir: Path | str | None = None):
             "Remove it and recreate as a real directory."
         )
     takt_dir.mkdir(parents=True, exist_ok=True)
-    db_path = takt_dir / "takt.db"
+    cached = _connection(root, takt_dir / "takt.db")
+    conn = cached.conn
 
-    conn = sqlite3.connect(str(db_path))
-    conn.row_factory = sqlite3.Row
+    if cached.depth:
+        savepoint = f"takt_{cached.depth}"
+        conn.execute(f"SAVEPOINT {savepoint}")
+        cached.depth += 1
+        try:
+            yield conn
+        except Exception:
+            conn.execute(f"ROLLBACK TO {savepoint}")
+            conn.execute(f"RELEASE {savepoint}")
+            raise
+        else:
+            conn.execute(f"RELEASE {savepoint}")
+        finally:
+            cached.depth -= 1
+        return
+
+    cached.depth = 1
     try:
-        _configure(conn)
-        _apply_schema(conn)
-        _ensure_default_project(conn, root)
         yield conn
         conn.commit()
     except Exception:
         conn.rollback()
         raise
     finally:
-        conn.close()
+        cached.depth = 0
 
 
 def init_db(project_dir: Path | str | None = None) -> None:
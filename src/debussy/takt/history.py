@@ -0,0 +1,47 @@
+"""Stage history: one row per stage visit, maintained by triggers.
+
+Entering a stage opens a row; leaving it stamps exited_at (epoch ms, like
+every takt timestamp), the duration in seconds, the outcome (advanced or rejected) and the stage moved to. Claims
+record the agent on the open row.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+
+from .db import NOW_MS
+
+
+def get_stage_history(db: sqlite3.Connection, task_id: str) -> list[dict]:
+    """Return a task's stage visits, oldest first; the last one may be open."""
+    rows = db.execute(
+        "SELECT * FROM stage_history WHERE task_id = ? ORDER BY id", (task_id,)
+    ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def stage_stats(db: sqlite3.Connection, since_hours: float | None = None) -> dict[str, dict]:
+    """Per-stage statistics over completed visits.
+
+    Returns {stage: {"visits", "avg_s", "max_s", "rejected"}}, optionally
+    limited to visits that ended in the last since_hours.
+    """
+    query = (
+        "SELECT stage, COUNT(*) AS visits, AVG(duration_s) AS avg_s, "
+        "MAX(duration_s) AS max_s, SUM(outcome = 'rejected') AS rejected "
+        "FROM stage_history WHERE exited_at IS NOT NULL"
+    )
+    params: list = []
+    if since_hours is not None:
+        query += f" AND exited_at >= {NOW_MS} - ?"
+        params.append(int(since_hours * 3_600_000))
+    rows = db.execute(query + " GROUP BY stage", params).fetchall()
+    return {
+        r["stage"]: {
+            "visits": r["visits"],
+            "avg_s": round(r["avg_s"], 1),
+            "max_s": r["max_s"],
+            "rejected": r["rejected"],
+        }
+        for r in rows
+    }
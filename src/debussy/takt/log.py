@@ -4,9 +4,11 @@ from __future__ import annotations
 
 import json
 import sqlite3
+import time
+from collections.abc import Iterator
 
-from .models import get_task, update_task
-from ..config import NEXT_STAGE, SECURITY_NEXT_STAGE
+from .db import NOW_MS
+from ..stages import NEXT_STAGE, SECURITY_NEXT_STAGE
 
 MAX_REJECTIONS = 3
 
@@ -22,39 +24,194 @@ def add_log(db: sqlite3.Connection, task_id: str, type: str, author: str, messag
 
 
 def add_comment(db: sqlite3.Connection, task_id: str, author: str, message: str) -> None:
-    """Add a comment log entry."""
-    add_log(db, task_id, "comment", author, message)
+    """Add a comment log entry.
+
+    Raises ValueError for a task gc has moved to the archive: its log is read-only.
+    """
+    try:
+        add_log(db, task_id, "comment", author, message)
+    except sqlite3.IntegrityError:
+        from .archive import get_archived_task
+
+        if get_archived_task(db, task_id) is not None:
+            raise ValueError(f"Task {task_id} is archived; its log is read-only") from None
+        raise
 
 
-def get_log(db: sqlite3.Connection, task_id: str, type: str | None = None) -> list[dict]:
-    """Return log entries for a task, optionally filtered by type."""
+def get_log(
+    db: sqlite3.Connection,
+    task_id: str | None,
+    type: str | None = None,
+    include_archived: bool = False,
+) -> list[dict]:
+    """Return log entries for a task, or all tasks when task_id is None,
+    optionally filtered by type.
+
+    include_archived also reads entries moved to .takt/archive.db by gc.
+    """
+    query = "SELECT * FROM log WHERE 1"
+    params: list = []
+    if task_id is not None:
+        query += " AND task_id = ?"
+        params.append(task_id)
     if type is not None:
-        rows = db.execute(
-            "SELECT * FROM log WHERE task_id = ? AND type = ? ORDER BY id",
-            (task_id, type),
-        ).fetchall()
-    else:
-        rows = db.execute(
-            "SELECT * FROM log WHERE task_id = ? ORDER BY id",
-            (task_id,),
-        ).fetchall()
-    return [dict(r) for r in rows]
+        query += " AND type = ?"
+        params.append(type)
+    entries = [dict(r) for r in db.execute(query + " ORDER BY id", params).fetchall()]
+    if include_archived:
+        from .archive import get_archived_log
+
+        archived = get_archived_log(db, task_id, type=type)
+        if archived:
+            live_ids = {e["id"] for e in entries}
+            entries = [e for e in archived if e["id"] not in live_ids] + entries
+    return entries
+
+
+FOLLOW_BATCH = 500
+FOLLOW_POLL_INTERVAL = 0.25
+
+
+def get_log_since(
+    db: sqlite3.Connection,
+    after_id: int,
+    task_id: str | None = None,
+    limit: int | None = None,
+) -> list[dict]:
+    """Return log entries with id > after_id, oldest first, for one task or all."""
+    query = "SELECT * FROM log WHERE id > ?"
+    params: list = [after_id]
+    if task_id is not None:
+        query += " AND task_id = ?"
+        params.append(task_id)
+    query += " ORDER BY id"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+    return [dict(r) for r in db.execute(query, params).fetchall()]
+
+
+def last_log_id(db: sqlite3.Connection) -> int:
+    return db.execute("SELECT COALESCE(MAX(id), 0) FROM log").fetchone()[0]
+
+
+def follow_log(
+    db: sqlite3.Connection,
+    after_id: int = 0,
+    task_id: str | None = None,
+    poll_interval: float = FOLLOW_POLL_INTERVAL,
+) -> Iterator[dict]:
+    """Yield log entries with id > after_id as they are written. Never returns.
+
+    Rows are read in id order behind a cursor, so each is read once. Between
+    reads the generator sleeps until PRAGMA data_version shows a commit from
+    another connection; the version is taken before draining so a commit
+    landing mid-drain is not missed. db must not be inside a transaction.
+    """
+    while True:
+        version = db.execute("PRAGMA data_version").fetchone()[0]
+        while True:
+            rows = get_log_since(db, after_id, task_id=task_id, limit=FOLLOW_BATCH)
+            yield from rows
+            if rows:
+                after_id = rows[-1]["id"]
+            if len(rows) < FOLLOW_BATCH:
+                break
+        while db.execute("PRAGMA data_version").fetchone()[0] == version:
+            time.sleep(poll_interval)
 
 
 # --- Workflow operations ---
 
-def advance_task(db: sqlite3.Connection, task_id: str, to_stage: str | None = None) -> dict:
-    """Move a task to the next stage (or a specific stage). Logs the transition."""
-    task = get_task(db, task_id)
-    if task is None:
+class TransitionConflict(ValueError):
+    """A conditional transition found the task in a different state than expected."""
+
+    def __init__(self, task_id: str, stage: str, status: str):
+        super().__init__(f"{task_id} changed concurrently (now {stage}/{status})")
+        self.task_id = task_id
+        self.stage = stage
+        self.status = status
+
+
+_RETURNING = (
+    "RETURNING *, (SELECT json_group_array(depends_on_id) FROM "
+    "(SELECT depends_on_id FROM dependencies WHERE task_id = tasks.id ORDER BY rowid)) "
+    "AS deps_json"
+)
+
+
+def _transition(
+    db: sqlite3.Connection,
+    task_id: str,
+    fields: dict,
+    entry: tuple[str, str, str],
+    expect_stage: str | None = None,
+    expect_status: str | None = None,
+    expect_rejections: int | None = None,
+) -> dict:
+    """Apply fields to a task only if it is still in the expected state.
+
+    The UPDATE is a single compare-and-set statement returning the new row;
+    the (type, author, message) log entry is written only when it matched.
+    Raises TransitionConflict when the task exists but no longer matches.
+    """
+    sets = [f"{k} = ?" for k in fields] + [f"updated_at = {NOW_MS}"]
+    params: list = list(fields.values()) + [task_id]
+    where = ["id = ?"]
+    for column, value in (("stage", expect_stage), ("status", expect_status),
+                          ("rejection_count", expect_rejections)):
+        if value is not None:
+            where.append(f"{column} = ?")
+            params.append(value)
+    rows = db.execute(
+        f"UPDATE tasks SET {', '.join(sets)} WHERE {' AND '.join(where)} {_RETURNING}",
+        params,
+    ).fetchall()
+    if not rows:
+        current = db.execute(
+            "SELECT stage, status FROM tasks WHERE id = ?", (task_id,)
+        ).fetchone()
+        if current is None:
+            raise ValueError(f"Task not found: {task_id}")
+        raise TransitionConflict(task_id, current["stage"], current["status"])
+    add_log(db, task_id, *entry)
+    task = dict(rows[0])
+    deps = json.loads(task.pop("deps_json"))
+    task["tags"] = json.loads(task["tags"])
+    task["dependencies"] = deps
+    return task
+
+
+def _current(db: sqlite3.Connection, task_id: str, expect_stage: str | None) -> sqlite3.Row:
+    row = db.execute(
+        "SELECT stage, status, tags, rejection_count FROM tasks WHERE id = ?", (task_id,)
+    ).fetchone()
+    if row is None:
         raise ValueError(f"Task not found: {task_id}")
+    if expect_stage is not None and row["stage"] != expect_stage:
+        raise TransitionConflict(task_id, row["stage"], row["status"])
+    return row
+
 
+def advance_task(
+    db: sqlite3.Connection,
+    task_id: str,
+    to_stage: str | None = None,
+    expect_stage: str | None = None,
+    expect_status: str | None = None,
+) -> dict:
+    """Move a task to the next stage (or a specific stage). Logs the transition.
+
+    The move only applies if the task is still in the stage it was read in,
+    so two concurrent advances cannot both succeed.
+    """
+    task = _current(db, task_id, expect_stage)
     current = task["stage"]
     if to_stage is not None:
         next_stage = to_stage
     else:
         # Check security routing
-        has_security = "security" in task["tags"]
+        has_security = "security" in json.loads(task["tags"])
         if has_security and current in SECURITY_NEXT_STAGE:
             next_stage = SECURITY_NEXT_STAGE[current]
         elif current in NEXT_STAGE:
@@ -62,9 +219,11 @@ def advance_task(db: sqlite3.Connection, task_id: str, to_stage: str | None = No
         else:
             raise ValueError(f"No next stage from: {current}")
 
-    updated = update_task(db, task_id, stage=next_stage, status="pending")
-    add_log(db, task_id, "transition", "system", f"{current} -> {next_stage}")
-    return updated
+    return _transition(
+        db, task_id, {"stage": next_stage, "status": "pending"},
+        ("transition", "system", f"{current} -> {next_stage}"),
+        expect_stage=current, expect_status=expect_status,
+    )
 
 
 def reject_task(db: sqlite3.Connection, task_id: str, author: str | None = None) -> dict:
@@ -74,53 +233,78 @@ def reject_task(db: sqlite3.Connection, task_id: str, author: str | None = None)
     because they are test-only tasks with no code to fix. The conductor handles
     recovery by creating targeted fix tasks.
     """
-    task = get_task(db, task_id)
-    if task is None:
-        raise ValueError(f"Task not found: {task_id}")
-
+    task = _current(db, task_id, None)
     new_count = task["rejection_count"] + 1
     who = author or "system"
+    guard = {"expect_stage": task["stage"], "expect_rejections": task["rejection_count"]}
 
     # Acceptance tasks are test-only — block for conductor, never send to development
     if task["stage"] == "acceptance":
-        updated = update_task(db, task_id, rejection_count=new_count,
-                              status="blocked")
-        add_log(db, task_id, "transition", who,
-                f"acceptance rejected (count={new_count}), blocked for conductor")
-        return updated
+        return _transition(
+            db, task_id, {"rejection_count": new_count, "status": "blocked"},
+            ("transition", who,
+             f"acceptance rejected (count={new_count}), blocked for conductor"),
+            **guard,
+        )
 
     if new_count >= MAX_REJECTIONS:
-        updated = update_task(db, task_id, rejection_count=new_count,
-                              stage="development", status="blocked")
-        add_log(db, task_id, "transition", who,
-                f"rejected (count={new_count}), auto-blocked")
-    else:
-        updated = update_task(db, task_id, rejection_count=new_count,
-                              stage="development", status="pending")
-        add_log(db, task_id, "transition", who,
-                f"rejected (count={new_count}), back to development")
-    return updated
+        return _transition(
+            db, task_id,
+            {"rejection_count": new_count, "stage": "development", "status": "blocked"},
+            ("transition", who, f"rejected (count={new_count}), auto-blocked"),
+            **guard,
+        )
+    return _transition(
+        db, task_id,
+        {"rejection_count": new_count, "stage": "development", "status": "pending"},
+        ("transition", who, f"rejected (count={new_count}), back to development"),
+        **guard,
+    )
+
 
+def claim_task(
+    db: sqlite3.Connection,
+    task_id: str,
+    agent: str,
+    expect_stage: str | None = None,
+    expect_status: str | None = None,
+) -> dict:
+    """Claim a task: set status=active, log assignment.
 
-def claim_task(db: sqlite3.Connection, task_id: str, agent: str) -> dict:
-    """Claim a task: set status=active, log assignment."""
-    updated = update_task(db, task_id, status="active")
-    add_log(db, task_id, "assignment", agent, f"claimed by {agent}")
-    return updated
+    With expect_stage/expect_status the claim only succeeds if the task is
+    still in that state; otherwise TransitionConflict is raised.
+    """
+    return _transition(
+        db, task_id, {"status": "active"},
+        ("assignment", agent, f"claimed by {agent}"),
+        expect_stage=expect_stage, expect_status=expect_status,
+    )
 
 
-def release_task(db: sqlite3.Connection, task_id: str) -> dict:
+def release_task(
+    db: sqlite3.Connection,
+    task_id: str,
+    expect_stage: str | None = None,
+    expect_status: str | None = None,
+) -> dict:
     """Release a task: set status=pending, log transition."""
-    updated = update_task(db, task_id, status="pending")
-    add_log(db, task_id, "transition", "system", "released")
-    return updated
+    return _transition(
+        db, task_id, {"status": "pending"}, ("transition", "system", "released"),
+        expect_stage=expect_stage, expect_status=expect_status,
+    )
 
 
-def block_task(db: sqlite3.Connection, task_id: str) -> dict:
+def block_task(
+    db: sqlite3.Connection,
+    task_id: str,
+    expect_stage: str | None = None,
+    expect_status: str | None = None,
+) -> dict:
     """Block a task: set status=blocked, log transition."""
-    updated = update_task(db, task_id, status="blocked")
-    add_log(db, task_id, "transition", "system", "blocked")
-    return updated
+    return _transition(
+        db, task_id, {"status": "blocked"}, ("transition", "system", "blocked"),
+        expect_stage=expect_stage, expect_status=expect_status,
+    )
 
 
 def get_unresolved_deps(db: sqlite3.Connection, task_id: str) -> list[str]:
@@ -133,3 +317,27 @@ def get_unresolved_deps(db: sqlite3.Connection, task_id: str) -> list[str]:
         (task_id,),
     ).fetchall()
     return [r["depends_on_id"] for r in rows]
+
+
+def get_unresolved_deps_map(
+    db: sqlite3.Connection, task_ids: list[str] | None = None,
+) -> dict[str, list[str]]:
+    """Return {task_id: [unresolved dependency ids]} in a single query.
+
+    Only tasks with a non-zero unresolved_count are looked at; tasks whose
+    dependencies are all resolved are absent from the map.
+    """
+    query = (
+        "SELECT d.task_id, d.depends_on_id FROM dependencies d "
+        "JOIN tasks w ON w.id = d.task_id AND w.unresolved_count > 0 "
+        "LEFT JOIN tasks t ON t.id = d.depends_on_id "
+        "WHERE (t.stage IS NULL OR t.stage NOT IN ('acceptance', 'done'))"
+    )
+    params: tuple = ()
+    if task_ids is not None:
+        query += " AND d.task_id IN (SELECT value FROM json_each(?))"
+        params = (json.dumps(task_ids),)
+    unresolved: dict[str, list[str]] = {}
+    for r in db.execute(query + " ORDER BY d.rowid", params).fetchall():
+        unresolved.setdefault(r["task_id"], []).append(r["depends_on_id"])
+    return unresolved
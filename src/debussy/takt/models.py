@@ -4,8 +4,10 @@ from __future__ import annotations
 
 import json
 import sqlite3
+from collections.abc import Iterator
+from graphlib import CycleError, TopologicalSorter
 
-from .db import get_prefix
+from .db import NOW_MS, get_prefix
 
 
 def generate_id(db: sqlite3.Connection, prefix: str | None = None) -> tuple[str, int]:
@@ -31,11 +33,54 @@ def _task_row_to_dict(row: sqlite3.Row, deps: list[str] | None = None) -> dict:
 
 def _get_deps(db: sqlite3.Connection, task_id: str) -> list[str]:
     rows = db.execute(
-        "SELECT depends_on_id FROM dependencies WHERE task_id = ?", (task_id,)
+        "SELECT depends_on_id FROM dependencies WHERE task_id = ? ORDER BY rowid", (task_id,)
     ).fetchall()
     return [r["depends_on_id"] for r in rows]
 
 
+def get_deps_map(db: sqlite3.Connection, task_ids: list[str] | None = None) -> dict[str, list[str]]:
+    """Return {task_id: [dependency ids]} in a single query.
+
+    With task_ids=None every dependency row is loaded; otherwise only rows for
+    the given tasks. Tasks without dependencies are absent from the map.
+    """
+    if task_ids is None:
+        rows = db.execute(
+            "SELECT task_id, depends_on_id FROM dependencies ORDER BY rowid"
+        ).fetchall()
+    else:
+        rows = db.execute(
+            "SELECT task_id, depends_on_id FROM dependencies "
+            "WHERE task_id IN (SELECT value FROM json_each(?)) ORDER BY rowid",
+            (json.dumps(task_ids),),
+        ).fetchall()
+    deps: dict[str, list[str]] = {}
+    for r in rows:
+        deps.setdefault(r["task_id"], []).append(r["depends_on_id"])
+    return deps
+
+
+def _check_deps_exist(db: sqlite3.Connection, deps: set[str]) -> None:
+    """Raise ValueError unless every id in deps is a task in the main database.
+
+    Archived tasks are done, but the dependencies foreign keys cannot
+    point at them.
+    """
+    found = {r["id"] for r in db.execute(
+        "SELECT id FROM tasks WHERE id IN (SELECT value FROM json_each(?))",
+        (json.dumps(sorted(deps)),),
+    ).fetchall()}
+    missing = sorted(deps - found)
+    if not missing:
+        return
+    from .archive import list_archived_tasks
+
+    archived = [t["id"] for t in list_archived_tasks(db, ids=missing)]
+    if archived:
+        raise ValueError(f"Dependency already done and archived: {', '.join(archived)}")
+    raise ValueError(f"Unknown dependency: {', '.join(missing)}")
+
+
 def create_task(
     db: sqlite3.Connection,
     title: str,
@@ -45,6 +90,8 @@ def create_task(
     prefix: str | None = None,
 ) -> dict:
     """Create a new task and return its dict representation."""
+    if deps:
+        _check_deps_exist(db, set(deps))
     task_id, seq = generate_id(db, prefix=prefix)
     tags_json = json.dumps(tags or [])
     db.execute(
@@ -59,25 +106,151 @@ def create_task(
     return get_task(db, task_id)  # type: ignore[return-value]
 
 
-def get_task(db: sqlite3.Connection, task_id: str) -> dict | None:
-    """Return a task dict with dependencies, or None if not found."""
+def _reserve_ids(db: sqlite3.Connection, prefix: str, count: int) -> list[tuple[str, int]]:
+    """Reserve count consecutive sequence numbers for prefix in one UPDATE."""
+    row = db.execute(
+        "UPDATE projects SET next_seq = next_seq + ? WHERE prefix = ? RETURNING next_seq - ?",
+        (count, prefix, count),
+    ).fetchone()
+    if row is None:
+        raise RuntimeError(f"Project not found: {prefix}")
+    return [(f"{prefix}-{seq}", seq) for seq in range(row[0], row[0] + count)]
+
+
+def create_tasks(db: sqlite3.Connection, specs: list[dict], prefix: str | None = None) -> list[dict]:
+    """Create many tasks at once and return their dicts in input order.
+
+    Each spec has title and optional description, tags, deps, project and
+    key. A dep names either an existing task id or the key of another spec
+    in the same batch; unknown ids and dependency cycles within the batch
+    raise ValueError before any id is reserved. Sequence numbers are
+    reserved once per project and rows are inserted with executemany; the
+    caller's transaction makes the batch all-or-nothing.
+    """
+    if not specs:
+        return []
+    default_prefix = prefix or get_prefix(db)
+    by_prefix: dict[str, list[int]] = {}
+    keys: dict[str, int] = {}
+    for i, spec in enumerate(specs):
+        if not spec.get("title"):
+            raise ValueError(f"Task #{i + 1} has no title")
+        key = spec.get("key")
+        if key is not None:
+            if key in keys:
+                raise ValueError(f"Duplicate key: {key}")
+            keys[key] = i
+        by_prefix.setdefault(spec.get("project") or default_prefix, []).append(i)
+
+    graph: dict[int, list[int]] = {}
+    external = set()
+    for i, spec in enumerate(specs):
+        graph[i] = []
+        for dep in spec.get("deps") or []:
+            if dep in keys:
+                graph[i].append(keys[dep])
+            else:
+                external.add(dep)
+    try:
+        TopologicalSorter(graph).prepare()
+    except CycleError as e:
+        cycle = [specs[i].get("key") for i in e.args[1]]
+        raise ValueError(f"Dependency cycle: {' -> '.join(cycle)}") from None
+    if external:
+        _check_deps_exist(db, external)
+
+    ids: list[tuple[str, int]] = [("", 0)] * len(specs)
+    for pfx, indexes in by_prefix.items():
+        for i, reserved in zip(indexes, _reserve_ids(db, pfx, len(indexes))):
+            ids[i] = reserved
+
+    dep_rows = [
+        (ids[i][0], ids[keys[dep]][0] if dep in keys else dep)
+        for i, spec in enumerate(specs)
+        for dep in spec.get("deps") or []
+    ]
+
+    db.executemany(
+        "INSERT INTO tasks (id, seq, title, description, tags) VALUES (?, ?, ?, ?, ?)",
+        [
+            (task_id, seq, spec["title"], spec.get("description") or "",
+             json.dumps(spec.get("tags") or []))
+            for (task_id, seq), spec in zip(ids, specs)
+        ],
+    )
+    db.executemany(
+        "INSERT INTO dependencies (task_id, depends_on_id) VALUES (?, ?)", dep_rows,
+    )
+
+    created = [task_id for task_id, _ in ids]
+    rows = {r["id"]: r for r in db.execute(
+        "SELECT * FROM tasks WHERE id IN (SELECT value FROM json_each(?))",
+        (json.dumps(created),),
+    ).fetchall()}
+    deps = get_deps_map(db, created)
+    return [_task_row_to_dict(rows[t], deps.get(t, [])) for t in created]
+
+
+def get_task(db: sqlite3.Connection, task_id: str, include_archived: bool = True) -> dict | None:
+    """Return a task dict with dependencies, or None if not found.
+
+    Tasks moved to the archive by gc are found there unless include_archived
+    is False; their dicts carry an extra archived_at key.
+    """
     row = db.execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
     if row is None:
-        return None
+        if not include_archived:
+            return None
+        from .archive import get_archived_task
+
+        return get_archived_task(db, task_id)
     deps = _get_deps(db, task_id)
     return _task_row_to_dict(row, deps)
 
 
-def list_tasks(
+TASK_FIELDS = (
+    "id", "title", "description", "stage", "status", "tags", "rejection_count",
+    "created_at", "updated_at", "unresolved_count", "dependencies",
+)
+
+_ITER_BATCH = 256
+
+
+def iter_tasks(
     db: sqlite3.Connection,
     stage: str | None = None,
     status: str | None = None,
     tag: str | None = None,
     prefix: str | None = None,
-) -> list[dict]:
-    """List tasks with optional filters."""
+    prioritize: list[str] | None = None,
+    ready: bool = False,
+    limit: int | None = None,
+    after: str | None = None,
+    fields: list[str] | None = None,
+    include_archived: bool = False,
+    exclude_stage: str | None = None,
+) -> Iterator[dict]:
+    """Yield tasks matching the filters as the cursor produces them.
+
+    Dependencies are loaded one batch of rows at a time. limit caps the rows
+    returned; after is a task id cursor: only tasks created after it (in
+    creation order) are returned, so a caller can page by passing the last
+    id it saw. fields projects each task onto a subset of TASK_FIELDS, and
+    columns not asked for (e.g. description) are not read at all.
+    include_archived appends matching archived tasks after the live ones.
+    exclude_stage skips tasks in that stage (e.g. everything but done).
+    """
+    if fields is not None:
+        unknown = [f for f in fields if f not in TASK_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown field: {unknown[0]}")
+    if after is not None and prioritize:
+        raise ValueError("after cannot be combined with prioritize")
+    if after is not None and include_archived:
+        raise ValueError("after cannot be combined with include_archived")
+
     conditions = []
-    params: list[str] = []
+    params: list = []
 
     if prefix is not None:
         conditions.append("id LIKE ?")
@@ -86,24 +259,106 @@ def list_tasks(
     if stage is not None:
         conditions.append("stage = ?")
         params.append(stage)
+    if exclude_stage is not None:
+        conditions.append("stage != ?")
+        params.append(exclude_stage)
     if status is not None:
         conditions.append("status = ?")
         params.append(status)
     if tag is not None:
-        conditions.append("EXISTS (SELECT 1 FROM json_each(tags) WHERE value = ?)")
+        conditions.append("id IN (SELECT task_id FROM task_tags WHERE tag = ?)")
         params.append(tag)
+    if ready:
+        conditions.append("unresolved_count = 0")
+    if after is not None:
+        cursor_row = db.execute(
+            "SELECT created_at, rowid FROM tasks WHERE id = ?", (after,)
+        ).fetchone()
+        if cursor_row is None:
+            raise ValueError(f"Task not found: {after}")
+        conditions.append("(created_at, rowid) > (?, ?)")
+        params += [cursor_row[0], cursor_row[1]]
 
-    query = "SELECT * FROM tasks"
+    with_deps = fields is None or "dependencies" in fields
+    if fields is None:
+        columns = "*"
+    else:
+        # id is always read: dependencies are looked up by it.
+        columns = ", ".join(dict.fromkeys(["id"] + [f for f in fields if f != "dependencies"]))
+    query = f"SELECT {columns} FROM tasks"
     if conditions:
         query += " WHERE " + " AND ".join(conditions)
-    query += " ORDER BY created_at"
+    order = []
+    for t in prioritize or []:
+        order.append("NOT EXISTS (SELECT 1 FROM task_tags WHERE task_id = tasks.id AND tag = ?)")
+        params.append(t)
+    order += ["created_at", "rowid"]
+    query += " ORDER BY " + ", ".join(order)
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+
+    cursor = db.execute(query, params)
+    count = 0
+    while rows := cursor.fetchmany(_ITER_BATCH):
+        deps = get_deps_map(db, [r["id"] for r in rows]) if with_deps else {}
+        for row in rows:
+            task = dict(row)
+            if "tags" in task:
+                task["tags"] = json.loads(task["tags"])
+            if with_deps:
+                task["dependencies"] = deps.get(row["id"], [])
+            count += 1
+            yield task if fields is None else {f: task[f] for f in fields}
+
+    if include_archived and (limit is None or count < limit):
+        from .archive import list_archived_tasks
+
+        remaining = None if limit is None else limit - count
+        for task in list_archived_tasks(db, stage=stage, status=status, tag=tag,
+                                        prefix=prefix, limit=remaining):
+            if task["stage"] == exclude_stage:
+                continue
+            yield task if fields is None else {f: task[f] for f in fields}
+
+
+def list_tasks(
+    db: sqlite3.Connection,
+    stage: str | None = None,
+    status: str | None = None,
+    tag: str | None = None,
+    prefix: str | None = None,
+    prioritize: list[str] | None = None,
+    ready: bool = False,
+    limit: int | None = None,
+    after: str | None = None,
+    fields: list[str] | None = None,
+    include_archived: bool = False,
+    exclude_stage: str | None = None,
+) -> list[dict]:
+    """List tasks with optional filters.
 
-    rows = db.execute(query, params).fetchall()
-    results = []
-    for row in rows:
-        deps = _get_deps(db, row["id"])
-        results.append(_task_row_to_dict(row, deps))
-    return results
+    prioritize: tags that sort first, in order of precedence; tasks without
+    any of them keep creation order.
+    ready: only tasks whose dependencies are all in acceptance or done.
+    limit, after, fields, include_archived, exclude_stage: paging, projection,
+    archived tasks and stage exclusion, see iter_tasks.
+    """
+    return list(iter_tasks(db, stage=stage, status=status, tag=tag, prefix=prefix,
+                           prioritize=prioritize, ready=ready, limit=limit,
+                           after=after, fields=fields, include_archived=include_archived,
+                           exclude_stage=exclude_stage))
+
+
+def list_ready_tasks(
+    db: sqlite3.Connection,
+    stage: str,
+    prefix: str | None = None,
+    prioritize: list[str] | None = None,
+) -> list[dict]:
+    """Pending tasks in stage with no unresolved dependencies, ready to dispatch."""
+    return list_tasks(db, stage=stage, status="pending", prefix=prefix,
+                      prioritize=prioritize, ready=True)
 
 
 def update_task(db: sqlite3.Connection, task_id: str, **fields) -> dict:
@@ -118,14 +373,14 @@ def update_task(db: sqlite3.Connection, task_id: str, **fields) -> dict:
         to_set[k] = v
 
     if not to_set:
-        return get_task(db, task_id)  # type: ignore[return-value]
+        return get_task(db, task_id, include_archived=False)  # type: ignore[return-value]
 
-    to_set["updated_at"] = "datetime('now')"
+    to_set["updated_at"] = NOW_MS
     set_parts = []
     params: list = []
     for k, v in to_set.items():
         if k == "updated_at":
-            set_parts.append("updated_at = datetime('now')")
+            set_parts.append(f"updated_at = {NOW_MS}")
         else:
             set_parts.append(f"{k} = ?")
             params.append(v)
@@ -135,4 +390,4 @@ def update_task(db: sqlite3.Connection, task_id: str, **fields) -> dict:
         f"UPDATE tasks SET {', '.join(set_parts)} WHERE id = ?",
         params,
     )
-    return get_task(db, task_id)  # type: ignore[return-value]
+    return get_task(db, task_id, include_archived=False)  # type: ignore[return-value]
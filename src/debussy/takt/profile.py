@@ -0,0 +1,154 @@
+"""Opt-in SQL timing for takt, enabled with TAKT_PROFILE=1.
+
+With the variable set, get_db opens connections through profiled_connect:
+a Connection subclass that times every execute/executemany and records
+(normalized SQL, calling function, seconds) in a ring buffer. The buffer
+is appended to .debussy/metrics/sql-<pid>.jsonl whenever it fills and at
+exit, and `takt profile` aggregates those files. Without the variable,
+get_db uses plain sqlite3 connections and this module is never imported.
+
+Times cover execute() itself (prepare and first step), not later fetches.
+"""
+
+from __future__ import annotations
+
+import atexit
+import functools
+import json
+import math
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+PROFILE_ENV = "TAKT_PROFILE"
+METRICS_DIR = Path(".debussy") / "metrics"
+BUFFER_SIZE = 2000
+
+
+@functools.lru_cache(maxsize=1024)
+def normalize(sql: str) -> str:
+    return " ".join(sql.split())
+
+
+class Recorder:
+    """Ring buffer of samples for one project, flushed to its metrics dir."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.samples: deque = deque(maxlen=BUFFER_SIZE)
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def record(self, sql: str, caller: str, seconds: float) -> None:
+        sample = (normalize(sql), caller, seconds)
+        with self._lock:
+            self.samples.append(sample)
+            if len(self.samples) >= BUFFER_SIZE:
+                self._flush()
+
+    def flush(self) -> None:
+        """Append buffered samples to the metrics file. On I/O errors the
+        buffer keeps its newest samples and the oldest are dropped."""
+        with self._lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self.samples:
+            return
+        batch = list(self.samples)
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a") as f:
+                for sql, caller, seconds in batch:
+                    f.write(json.dumps([sql, caller, round(seconds * 1e6, 1)]) + "\n")
+        except OSError:
+            return
+        self.samples.clear()
+
+
+_recorders: dict[Path, Recorder] = {}
+_recorders_lock = threading.Lock()
+
+
+def recorder_for(root: Path) -> Recorder:
+    with _recorders_lock:
+        rec = _recorders.get(root)
+        if rec is None:
+            rec = Recorder(root / METRICS_DIR / f"sql-{os.getpid()}.jsonl")
+            _recorders[root] = rec
+        return rec
+
+
+def _caller() -> str:
+    frame = sys._getframe(2)
+    return f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_name}"
+
+
+class ProfilingConnection(sqlite3.Connection):
+    recorder: Recorder
+
+    def execute(self, sql, parameters=(), /):
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self.recorder.record(sql, _caller(), time.perf_counter() - start)
+
+    def executemany(self, sql, parameters, /):
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, parameters)
+        finally:
+            self.recorder.record(sql, _caller(), time.perf_counter() - start)
+
+
+def profiled_connect(path: str, root: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, factory=ProfilingConnection)
+    conn.recorder = recorder_for(root)
+    return conn
+
+
+def load_samples(root: Path) -> list[tuple[str, str, float]]:
+    """Read every flushed sample under root's metrics dir as (sql, caller, us)."""
+    samples = []
+    for path in sorted((root / METRICS_DIR).glob("sql-*.jsonl")):
+        with open(path) as f:
+            for line in f:
+                try:
+                    sql, caller, us = json.loads(line)
+                except ValueError:
+                    continue  # torn write from a killed process
+                samples.append((sql, caller, us))
+    return samples
+
+
+def summarize(samples: list[tuple[str, str, float]], top: int | None = None) -> list[dict]:
+    """Aggregate samples per (sql, caller), most total time first."""
+    groups: dict[tuple[str, str], list[float]] = {}
+    for sql, caller, us in samples:
+        groups.setdefault((sql, caller), []).append(us)
+    rows = []
+    for (sql, caller), times in groups.items():
+        times.sort()
+        rows.append({
+            "sql": sql,
+            "caller": caller,
+            "count": len(times),
+            "total_ms": round(sum(times) / 1000, 3),
+            "p95_ms": round(times[math.ceil(0.95 * len(times)) - 1] / 1000, 3),
+        })
+    rows.sort(key=lambda r: r["total_ms"], reverse=True)
+    return rows[:top] if top else rows
+
+
+def reset(root: Path) -> int:
+    """Delete flushed samples. Returns files removed."""
+    removed = 0
+    for path in (root / METRICS_DIR).glob("sql-*.jsonl"):
+        path.unlink(missing_ok=True)
+        removed += 1
+    return removed
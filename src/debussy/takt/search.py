@@ -0,0 +1,133 @@
+"""Full-text search over task titles, descriptions and comments."""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+
+from .archive import open_archive
+from .db import has_fts
+
+SNIPPET_TOKENS = 12
+
+_COLUMNS = (
+    f"snippet(search_index, -1, '[', ']', '...', {SNIPPET_TOKENS}) AS snippet, "
+    "bm25(search_index, 10.0, 1.0) AS rank"
+)
+
+
+def _quote(query: str) -> str:
+    """Turn free text into an FTS5 query that matches all words literally."""
+    return " ".join('"' + word.replace('"', '""') + '"' for word in query.split())
+
+
+def _match(conn: sqlite3.Connection, sql: str, query: str, params: list) -> list[dict]:
+    try:
+        rows = conn.execute(sql, [query, *params]).fetchall()
+    except sqlite3.OperationalError:
+        rows = conn.execute(sql, [_quote(query), *params]).fetchall()
+    return [dict(r) for r in rows]
+
+
+def _search_archive(
+    db: sqlite3.Connection,
+    query: str,
+    prefix: str | None,
+    stage: str | None,
+    tag: str | None,
+    limit: int,
+) -> list[dict]:
+    """Matches from the archive's index. A comment archived while its task
+    stayed in the main database takes the task's fields from there."""
+    archive = open_archive(db)
+    if archive is None:
+        return []
+    try:
+        if not has_fts(archive):
+            return []
+        conditions = ["search_index MATCH ?"]
+        params: list = []
+        if prefix is not None:
+            conditions.append("search_index.task_id LIKE ?")
+            params.append(f"{prefix}-%")
+        if stage is not None:
+            conditions.append("(t.id IS NULL OR t.stage = ?)")
+            params.append(stage)
+        if tag is not None:
+            conditions.append(
+                "(t.id IS NULL OR EXISTS (SELECT 1 FROM json_each(t.tags) WHERE value = ?))"
+            )
+            params.append(tag)
+        rows = _match(archive, (
+            "SELECT search_index.task_id, search_index.kind, search_index.row_id, "
+            f"t.title, t.stage, t.status, t.id IS NULL AS live, {_COLUMNS} "
+            "FROM search_index LEFT JOIN tasks t ON t.id = search_index.task_id "
+            "WHERE " + " AND ".join(conditions) + " ORDER BY rank LIMIT ?"
+        ), query, [*params, limit])
+    finally:
+        archive.close()
+
+    live_ids = sorted({r["task_id"] for r in rows if r["live"]})
+    live = {r["id"]: r for r in db.execute(
+        "SELECT id, title, stage, status, tags FROM tasks "
+        "WHERE id IN (SELECT value FROM json_each(?))",
+        (json.dumps(live_ids),),
+    ).fetchall()} if live_ids else {}
+    results = []
+    for r in rows:
+        if r.pop("live"):
+            task = live.get(r["task_id"])
+            if task is None or (stage is not None and task["stage"] != stage):
+                continue
+            if tag is not None and tag not in json.loads(task["tags"]):
+                continue
+            r.update(title=task["title"], stage=task["stage"], status=task["status"])
+        r["archived"] = True
+        results.append(r)
+    return results
+
+
+def search(
+    db: sqlite3.Connection,
+    query: str,
+    prefix: str | None = None,
+    stage: str | None = None,
+    tag: str | None = None,
+    limit: int = 20,
+) -> list[dict]:
+    """Return matches from the main database, best first, then matches from
+    the archive, best first.
+
+    Each result has task_id, kind ('task' or 'comment'), row_id (log id for
+    comments), title, stage, status, snippet, rank (lower is better) and
+    archived (True for tasks and comments moved to the archive by gc).
+    bm25 ranks depend on each index's own statistics, so a live and an
+    archived rank are not compared; the archive only fills what the live
+    matches leave of limit.
+    The query may use FTS5 syntax; if it does not parse, its words are
+    matched literally.
+    """
+    if not has_fts(db):
+        raise RuntimeError("Full-text search unavailable: SQLite was built without FTS5")
+    conditions = ["search_index MATCH ?"]
+    params: list = []
+    if prefix is not None:
+        conditions.append("t.id LIKE ?")
+        params.append(f"{prefix}-%")
+    if stage is not None:
+        conditions.append("t.stage = ?")
+        params.append(stage)
+    if tag is not None:
+        conditions.append("t.id IN (SELECT task_id FROM task_tags WHERE tag = ?)")
+        params.append(tag)
+    results = _match(db, (
+        "SELECT search_index.task_id, search_index.kind, search_index.row_id, "
+        f"t.title, t.stage, t.status, {_COLUMNS} "
+        "FROM search_index JOIN tasks t ON t.id = search_index.task_id "
+        "WHERE " + " AND ".join(conditions) + " ORDER BY rank LIMIT ?"
+    ), query, [*params, limit])
+    for r in results:
+        r["archived"] = False
+    if len(results) < limit:
+        results += _search_archive(db, query, prefix, stage, tag, limit - len(results))
+    return results
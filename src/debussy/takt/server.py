@@ -0,0 +1,88 @@
+"""Optional takt server: answers CLI commands over a Unix socket in .takt/.
+
+Every `takt` invocation otherwise pays interpreter startup, imports and the
+schema check in get_db. `takt serve` keeps a warm connection and runs the
+same command handlers; the CLI forwards to it when the socket is present
+and falls back to direct SQLite when it is not.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import signal
+import socket
+import socketserver
+import sys
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+
+from .client import SERVED_COMMANDS, socket_path
+
+
+def _run(argv: list[str], root: Path) -> tuple[int, str, str]:
+    from .cli import main
+
+    out, err = io.StringIO(), io.StringIO()
+    with redirect_stdout(out), redirect_stderr(err):
+        try:
+            code = main(argv, root=root)
+        except SystemExit as e:  # argparse usage errors
+            code = e.code if isinstance(e.code, int) else int(e.code is not None)
+    return code, out.getvalue(), err.getvalue()
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line:  # liveness probe
+            return
+        try:
+            argv = json.loads(line)["argv"]
+        except (ValueError, KeyError, TypeError):
+            reply = {"code": 2, "stdout": "", "stderr": "Error: malformed request\n"}
+        else:
+            if argv and argv[0] in SERVED_COMMANDS:
+                code, out, err = _run(argv, self.server.root)
+                reply = {"code": code, "stdout": out, "stderr": err}
+            else:
+                reply = {"code": 2, "stdout": "", "stderr": "Error: command not served\n"}
+        self.wfile.write(json.dumps(reply).encode() + b"\n")
+
+
+class TaktServer(socketserver.UnixStreamServer):
+    """Handles one request at a time so every command reuses the same connection."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        path = socket_path(root)
+        if path.exists():
+            if _alive(path):
+                raise RuntimeError(f"takt server already running on {path}")
+            path.unlink()
+        super().__init__(str(path), _Handler)
+
+    def server_close(self) -> None:
+        super().server_close()
+        socket_path(self.root).unlink(missing_ok=True)
+
+
+def _alive(path: Path) -> bool:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(path))
+        except OSError:
+            return False
+    return True
+
+
+def serve(root: Path) -> None:
+    """Serve until interrupted; removes the socket on exit."""
+    server = TaktServer(root)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
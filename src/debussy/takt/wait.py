@@ -0,0 +1,80 @@
+"""Block until tasks reach a stage or status.
+
+Replaces `takt show` polling loops: the task rows are re-read only when
+PRAGMA data_version reports a commit from another connection, so an idle
+wait costs one pragma per poll interval.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+
+
+WAIT_FIELDS = ("stage", "status")
+WAIT_POLL_INTERVAL = 0.25
+
+
+def parse_condition(text: str) -> list[tuple[str, str]]:
+    """Parse "stage=done" or "stage=done|status=blocked" into (field, value) pairs."""
+    conditions = []
+    for part in text.split("|"):
+        field, sep, value = part.strip().partition("=")
+        if not sep or field not in WAIT_FIELDS or not value:
+            raise ValueError(f"Invalid condition: {part!r} (expected stage=X or status=X)")
+        conditions.append((field, value))
+    return conditions
+
+
+def _matches(db: sqlite3.Connection, task_ids: list[str],
+             until: list[tuple[str, str]]) -> dict[str, int]:
+    rows = db.execute(
+        "SELECT id, stage, status FROM tasks WHERE id IN (SELECT value FROM json_each(?))",
+        (json.dumps(task_ids),),
+    ).fetchall()
+    found = {r["id"]: r for r in rows}
+    missing = [t for t in task_ids if t not in found]
+    if missing:
+        # gc moves done tasks to the archive; they still meet stage=done.
+        from .archive import list_archived_tasks
+
+        found.update((t["id"], t) for t in list_archived_tasks(db, ids=missing))
+    for task_id in task_ids:
+        if task_id not in found:
+            raise ValueError(f"Task not found: {task_id}")
+    met = {}
+    for task_id in task_ids:
+        row = found[task_id]
+        for i, (field, value) in enumerate(until):
+            if row[field] == value:
+                met[task_id] = i
+                break
+    return met
+
+
+def wait_for(
+    db: sqlite3.Connection,
+    task_ids: list[str],
+    until: list[tuple[str, str]],
+    require_all: bool = False,
+    timeout: float | None = None,
+    poll_interval: float = WAIT_POLL_INTERVAL,
+) -> dict[str, int] | None:
+    """Wait until one (or, with require_all, every) task meets a condition.
+
+    until is a list of (field, value) pairs; a task meets the first one
+    that holds. Returns {task_id: condition index} for the tasks that met
+    one, or None when timeout seconds pass first. db must not be inside
+    a transaction, or commits by other connections stay invisible.
+    """
+    deadline = None if timeout is None else time.monotonic() + timeout
+    while True:
+        version = db.execute("PRAGMA data_version").fetchone()[0]
+        met = _matches(db, task_ids, until)
+        if met and (not require_all or len(met) == len(task_ids)):
+            return met
+        while db.execute("PRAGMA data_version").fetchone()[0] == version:
+            if deadline is not None and time.monotonic() >= deadline:
+                return None
+            time.sleep(poll_interval)
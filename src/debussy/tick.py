@@ -0,0 +1,140 @@
+"""One consistent view of takt per watcher tick.
+
+TickSnapshot loads every task that is not done, with its dependencies and
+unresolved_count, in one read at the start of a tick. The timeout, cleanup,
+orphan, unblock and pipeline phases all read from it instead of querying
+takt themselves, and their writes (releases, blocks, comments, log entries)
+are applied to the snapshot at once and buffered for the database. flush()
+commits the buffer in one transaction; each write runs in its own savepoint
+so one that fails does not undo the others. Releases and blocks only apply
+if the task still has the stage and status the snapshot saw: an agent that
+claimed or advanced it meanwhile wins, and the snapshot takes its state.
+
+Writes that cannot wait, stage transitions and spawns, still go straight
+to takt; callers reload() the tasks they touched.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from contextlib import nullcontext
+
+from .config import STAGE_DONE, STATUS_BLOCKED, STATUS_PENDING, log
+from .takt import (
+    TransitionConflict, add_comment, block_task, get_db, get_task, list_tasks, release_task,
+)
+from .takt.log import add_log
+
+
+class TickSnapshot:
+    def __init__(self, tasks: list[dict]):
+        self.tasks: dict[str, dict | None] = {t["id"]: t for t in tasks}
+        self._writes: list[tuple[Callable, tuple]] = []
+
+    @classmethod
+    def load(cls) -> TickSnapshot:
+        with get_db() as db:
+            return cls(list_tasks(db, exclude_stage=STAGE_DONE))
+
+    def __enter__(self) -> TickSnapshot:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        # Writes decided before an error are still valid; don't drop them.
+        self.flush()
+
+    def get(self, task_id: str) -> dict | None:
+        """Return a task; ones outside the snapshot (done, archived, created
+        this tick) are read from takt once and cached, misses included."""
+        if task_id not in self.tasks:
+            with get_db() as db:
+                self.tasks[task_id] = get_task(db, task_id)
+        return self.tasks[task_id]
+
+    def status(self, task_id: str) -> str | None:
+        task = self.get(task_id)
+        return task["status"] if task else None
+
+    def _live(self) -> list[dict]:
+        return [t for t in self.tasks.values() if t and t["stage"] != STAGE_DONE]
+
+    def with_status(self, status: str) -> list[dict]:
+        return [t for t in self._live() if t["status"] == status]
+
+    def ready(self, stage: str, prioritize: list[str] | None = None) -> list[dict]:
+        """Pending tasks in stage with no unresolved dependencies, ordered
+        like list_ready_tasks: prioritize tags first, then creation order."""
+        tasks = [
+            t for t in self._live()
+            if t["stage"] == stage and t["status"] == STATUS_PENDING and not t["unresolved_count"]
+        ]
+        prioritize = prioritize or []
+        tasks.sort(key=lambda t: ([tag not in t["tags"] for tag in prioritize], t["created_at"]))
+        return tasks
+
+    def reload(self, task_id: str) -> None:
+        """Re-read a task written outside the buffer, and its dependents,
+        whose unresolved_count follows its stage."""
+        with get_db() as db:
+            dependents = [r[0] for r in db.execute(
+                "SELECT task_id FROM dependencies WHERE depends_on_id = ?", (task_id,)
+            )]
+            for tid in [task_id] + dependents:
+                self.tasks[tid] = get_task(db, tid)
+
+    def _buffer(self, func: Callable, *args) -> None:
+        self._writes.append((func, args))
+
+    def _set_status(self, func: Callable, task_id: str, status: str) -> None:
+        """Buffer func conditioned on the state seen here, then apply status."""
+        task = self.get(task_id)
+        if task is None:
+            self._buffer(func, task_id)
+            return
+        self._buffer(func, task_id, task["stage"], task["status"])
+        task["status"] = status
+
+    def release(self, task_id: str) -> None:
+        self._set_status(release_task, task_id, STATUS_PENDING)
+
+    def block(self, task_id: str) -> None:
+        self._set_status(block_task, task_id, STATUS_BLOCKED)
+
+    def comment(self, task_id: str, author: str, message: str) -> None:
+        self._buffer(add_comment, task_id, author, message)
+
+    def log(self, task_id: str, type: str, author: str, message: str) -> None:
+        self._buffer(add_log, task_id, type, author, message)
+
+    @property
+    def pending_writes(self) -> int:
+        return len(self._writes)
+
+    def flush(self) -> None:
+        """Commit buffered writes in one transaction, in the order made."""
+        if not self._writes:
+            return
+        writes, self._writes = self._writes, []
+        with get_db() as db:
+            # A savepoint opened outside a transaction would commit on its
+            # own release, so start the enclosing transaction explicitly.
+            if not db.in_transaction:
+                db.execute("BEGIN IMMEDIATE")
+            for func, args in writes:
+                try:
+                    with get_db() as sp:
+                        func(sp, *args)
+                except TransitionConflict as e:
+                    # Lost the race to an agent or the conductor; keep their state.
+                    task = self.tasks.get(e.task_id)
+                    if task:
+                        task["stage"], task["status"] = e.stage, e.status
+                    log(f"Skipped {func.__name__} for {e.task_id}: now {e.stage}/{e.status}", "↩️")
+                except Exception as e:
+                    log(f"Deferred {func.__name__}{args} failed: {e}", "⚠️")
+
+
+def tick_or_load(tick: TickSnapshot | None):
+    """Context for a phase run outside the watcher loop: the caller's tick,
+    or a fresh snapshot flushed when the phase ends."""
+    return nullcontext(tick) if tick is not None else TickSnapshot.load()
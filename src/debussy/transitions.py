@@ -12,11 +12,14 @@ from .config import (
 )
 from .takt import (
     get_db, get_task, advance_task, release_task,
-    block_task, add_comment, update_task,
+    block_task, add_comment, TransitionConflict,
 )
 from .takt.log import add_log
 from .config import NEXT_STAGE, SECURITY_NEXT_STAGE
+from .fetcher import fetch_origin
+from .gitrefs import ref_snapshot
 from .worktree import delete_branch
+from . import workers
 
 if TYPE_CHECKING:
     from .agent import AgentInfo
@@ -26,28 +29,36 @@ MAX_RETRIES = 3
 
 
 def _remote_branch_exists(task_id: str) -> bool | None:
+    """Whether origin has the task branch; None if origin can't be asked.
+
+    Call after a successful fetch. A tracking ref answers yes; a missing
+    one can't prove the branch is gone, so origin is asked with ls-remote.
+    """
+    refs = ref_snapshot()
+    if refs.ok and refs.exists(f"refs/remotes/origin/feature/{task_id}"):
+        return True
     try:
         result = subprocess.run(
             ["git", "ls-remote", "--heads", "origin", f"feature/{task_id}"],
             capture_output=True, text=True, timeout=15,
         )
-        if result.returncode != 0:
-            return None
-        return bool(result.stdout.strip())
     except (subprocess.SubprocessError, OSError):
         return None
+    if result.returncode != 0:
+        return None
+    if not result.stdout.strip():
+        return False
+    # Pushed after the fetch: bring the tracking ref in for the commit check.
+    fetch_origin([f"feature/{task_id}"], force=True)
+    return True
 
 
 def _branch_has_commits(task_id: str, base: str) -> bool:
-    try:
-        result = subprocess.run(
-            ["git", "rev-list", "--count", f"{base}..origin/feature/{task_id}"],
-            capture_output=True, text=True, timeout=5,
-        )
-        return result.returncode == 0 and int(result.stdout.strip()) > 0
-    except (subprocess.SubprocessError, OSError, ValueError):
+    counts = ref_snapshot().ahead_behind(f"origin/feature/{task_id}", base)
+    if counts is None:
         log(f"Git error checking commits for feature/{task_id}, treating as no commits", "⚠️")
         return False
+    return counts[0] > 0
 
 
 # Stages where agent completion means "task is done" (watcher moves to done)
@@ -61,28 +72,49 @@ def _is_terminal_stage(stage: str) -> bool:
 def _verify_merge_landed(task_id: str) -> bool:
     base = get_config().get("base_branch", "master")
     log(f"Fetching origin to verify merge for {task_id}", "🔄")
-    try:
-        subprocess.run(["git", "fetch", "origin"], capture_output=True, timeout=10)
-    except (subprocess.SubprocessError, OSError):
+    if not fetch_origin([f"feature/{task_id}", base], timeout=10, force=True).ok:
         log(f"Git fetch failed/timed out for {task_id}, cannot verify merge", "⚠️")
         return False
-    try:
-        ref_check = subprocess.run(
-            ["git", "rev-parse", "--verify", f"origin/feature/{task_id}"],
-            capture_output=True, timeout=5,
-        )
-        if ref_check.returncode != 0:
-            log(f"origin/feature/{task_id} does not exist on remote", "⚠️")
-            return False
-        result = subprocess.run(
-            ["git", "merge-base", "--is-ancestor",
-             f"origin/feature/{task_id}", f"origin/{base}"],
-            capture_output=True, timeout=10,
-        )
-        return result.returncode == 0
-    except (subprocess.SubprocessError, OSError):
+    refs = ref_snapshot()
+    if not refs.exists(f"origin/feature/{task_id}"):
+        log(f"origin/feature/{task_id} does not exist on remote", "⚠️")
+        return False
+    # Merged means the branch has nothing base lacks (merge-base --is-ancestor).
+    counts = refs.ahead_behind(f"origin/feature/{task_id}", f"origin/{base}")
+    if counts is None:
         log(f"Git error verifying merge for {task_id}, treating as unverified", "⚠️")
         return False
+    return counts[0] == 0
+
+
+# Outcomes of the completion gate, which checks a finished agent's work on origin.
+GATE_OK = "ok"
+GATE_EMPTY = "empty"            # development: no branch or no commits on origin
+GATE_UNVERIFIED = "unverified"  # merging: branch not merged into base
+GATE_UNCHECKED = "unchecked"    # origin could not be asked
+_GATED_STAGES = {STAGE_DEVELOPMENT, STAGE_MERGING}
+
+
+def run_gate(task_id: str, stage: str) -> str:
+    """Check origin for an agent that finished a gated stage. Returns a GATE_* outcome.
+
+    Does forced fetches and ls-remote, so the watcher runs it on the worker pool.
+    """
+    if stage == STAGE_MERGING:
+        return GATE_OK if _verify_merge_landed(task_id) else GATE_UNVERIFIED
+    # The agent pushed just before exiting: don't reuse an earlier fetch.
+    # A full fetch prunes, so a branch deleted on origin doesn't linger.
+    if not fetch_origin(force=True).ok:
+        return GATE_UNCHECKED
+    if _remote_branch_exists(task_id) is False:
+        return GATE_EMPTY
+    base = get_config().get("base_branch", "master")
+    return GATE_OK if _branch_has_commits(task_id, f"origin/{base}") else GATE_EMPTY
+
+
+def _needs_gate(agent: AgentInfo, task: dict) -> bool:
+    return (task["status"] == STATUS_PENDING and task["stage"] == agent.spawned_stage
+            and task["stage"] in _GATED_STAGES)
 
 
 def _compute_next_stage(spawned_stage: str, tags: list[str]) -> str | None:
@@ -94,8 +126,12 @@ def _compute_next_stage(spawned_stage: str, tags: list[str]) -> str | None:
     return NEXT_STAGE.get(spawned_stage)
 
 
-def _dispatch_transition(watcher: Watcher, agent: AgentInfo, task: dict, db) -> bool:
-    """Dispatch the appropriate transition based on task state after agent finishes."""
+def _dispatch_transition(watcher: Watcher, agent: AgentInfo, task: dict, db,
+                         gate: str | None = None) -> bool:
+    """Dispatch the appropriate transition based on task state after agent finishes.
+
+    gate is the run_gate outcome if it already ran; otherwise it runs here when needed.
+    """
     status = task["status"]
     stage = task["stage"]
     tags = task.get("tags", [])
@@ -104,7 +140,7 @@ def _dispatch_transition(watcher: Watcher, agent: AgentInfo, task: dict, db) ->
     # Agent left task as active — reset to pending for retry
     if status == STATUS_ACTIVE:
         log(f"Agent left {task_id} as active, resetting to pending for retry", "⚠️")
-        release_task(db, task_id)
+        release_task(db, task_id, expect_stage=stage, expect_status=STATUS_ACTIVE)
         return True
 
     # Stage was changed externally (not the one we spawned for)
@@ -120,12 +156,15 @@ def _dispatch_transition(watcher: Watcher, agent: AgentInfo, task: dict, db) ->
 
     # Pending — agent finished work, determine next action
     if status == STATUS_PENDING:
-        return _handle_agent_success(watcher, agent, task, db)
+        if gate is None and _needs_gate(agent, task):
+            gate = run_gate(task_id, stage)
+        return _handle_agent_success(watcher, agent, task, db, gate)
 
     return True
 
 
-def _handle_agent_success(watcher: Watcher, agent: AgentInfo, task: dict, db) -> bool:
+def _handle_agent_success(watcher: Watcher, agent: AgentInfo, task: dict, db,
+                          gate: str | None = None) -> bool:
     """Handle the case where an agent finished and set status=pending."""
     task_id = agent.task
     stage = task["stage"]
@@ -133,57 +172,66 @@ def _handle_agent_success(watcher: Watcher, agent: AgentInfo, task: dict, db) ->
 
     # Terminal stages: task is done
     if _is_terminal_stage(stage):
-        if stage == STAGE_MERGING:
-            if not _verify_merge_landed(task_id):
-                log(f"Merge not verified on base branch for {task_id}, retrying merge", "⚠️")
-                add_log(db, task_id, "transition", "watcher", "unverified merge, retrying")
-                return True
-        delete_branch(f"feature/{task_id}")
-        update_task(db, task_id, stage="done")
+        if stage == STAGE_MERGING and gate != GATE_OK:
+            log(f"Merge not verified on base branch for {task_id}, retrying merge", "⚠️")
+            add_log(db, task_id, "transition", "watcher", "unverified merge, retrying")
+            return True
+        advance_task(db, task_id, to_stage="done",
+                     expect_stage=stage, expect_status=STATUS_PENDING)
         log(f"Closed {task_id}: {stage} complete", "✅")
-        add_log(db, task_id, "transition", "watcher", f"{stage} -> done")
+        workers.submit(f"branch:{task_id}", delete_branch, f"feature/{task_id}")
         return True
 
     if stage == STAGE_DEVELOPMENT:
-        subprocess.run(["git", "fetch", "origin"], capture_output=True, timeout=30)
-        remote_exists = _remote_branch_exists(task_id)
-        if remote_exists is False:
-            return _handle_empty_branch(watcher, agent, task, db)
-        base = get_config().get("base_branch", "master")
-        if not _branch_has_commits(task_id, base):
+        if gate == GATE_EMPTY:
             return _handle_empty_branch(watcher, agent, task, db)
+        if gate == GATE_UNCHECKED:
+            log(f"Git fetch failed for {task_id}, advancing without checking commits", "⚠️")
 
     # Advance to next stage
     watcher.empty_branch_retries.pop(task_id, None)
     next_stage = _compute_next_stage(stage, tags)
     if next_stage:
-        advance_task(db, task_id, to_stage=next_stage)
+        advance_task(db, task_id, to_stage=next_stage,
+                     expect_stage=stage, expect_status=STATUS_PENDING)
         log(f"Advancing {task_id}: {stage} → {next_stage}", "⏩")
     return True
 
 
 def _handle_empty_branch(watcher: Watcher, agent: AgentInfo, task: dict, db) -> bool:
-    """Handle developer completing without commits on the feature branch."""
+    """Handle developer completing without commits on the feature branch.
+
+    The conditional release/block comes first: if it conflicts, nothing is
+    logged and the retry is not counted.
+    """
     task_id = agent.task
-    watcher.empty_branch_retries[task_id] = watcher.empty_branch_retries.get(task_id, 0) + 1
-    count = watcher.empty_branch_retries[task_id]
+    count = watcher.empty_branch_retries.get(task_id, 0) + 1
 
     if count >= MAX_RETRIES:
+        block_task(db, task_id, expect_stage=task["stage"], expect_status=STATUS_PENDING)
+        watcher.empty_branch_retries[task_id] = count
         log(f"Blocked {task_id}: empty branch after {count} attempts, needs conductor", "🚫")
-        block_task(db, task_id)
         add_comment(db, task_id, "watcher",
                     f"Blocked after {count} empty-branch retries — needs conductor intervention")
         return True
 
+    # Keep at development stage for another attempt
+    release_task(db, task_id, expect_stage=task["stage"], expect_status=STATUS_PENDING)
+    watcher.empty_branch_retries[task_id] = count
     log(f"No commits on feature/{task_id} — retry {count}/{MAX_RETRIES}", "⚠️")
     add_log(db, task_id, "transition", "watcher", f"empty branch retry {count}/{MAX_RETRIES}")
-    # Keep at development stage for another attempt
-    release_task(db, task_id)
     return True
 
 
 def ensure_stage_transition(watcher: Watcher, agent: AgentInfo) -> bool:
-    """Main entry point: read task state and dispatch appropriate transition."""
+    """Main entry point: read task state and dispatch appropriate transition.
+
+    Every write is conditioned on the state read here; if the conductor or
+    another agent moved the task meanwhile, their change stands. With the
+    worker pool running, the origin checks of run_gate happen there as job
+    gate:<task> and the transition follows on the main thread; the task
+    stays in watcher.finishing, so nothing is spawned for it meanwhile.
+    """
     if not agent.spawned_stage:
         return True
 
@@ -192,4 +240,35 @@ def ensure_stage_transition(watcher: Watcher, agent: AgentInfo) -> bool:
         if not task:
             log(f"Could not read task {agent.task}, skipping stage transition", "⚠️")
             return False
-        return _dispatch_transition(watcher, agent, task, db)
+        if not (workers.active() and _needs_gate(agent, task)):
+            return _apply_transition(watcher, agent, task, db)
+
+    key = f"{agent.role}:{agent.task}"
+    watcher.finishing[key] = agent.task
+    workers.submit(f"gate:{agent.task}", run_gate, agent.task, task["stage"],
+                   on_done=lambda f: _finish_gate(watcher, agent, key, f))
+    return True
+
+
+def _finish_gate(watcher: Watcher, agent: AgentInfo, key: str, future) -> None:
+    watcher.finishing.pop(key, None)
+    if future.exception() is not None:
+        log(f"Checking origin for {agent.task} failed: {future.exception()}", "⚠️")
+        gate = GATE_UNCHECKED
+    else:
+        gate = future.result()
+    with get_db() as db:
+        task = get_task(db, agent.task)
+        if not task:
+            log(f"Could not read task {agent.task}, skipping stage transition", "⚠️")
+            return
+        _apply_transition(watcher, agent, task, db, gate)
+
+
+def _apply_transition(watcher: Watcher, agent: AgentInfo, task: dict, db,
+                      gate: str | None = None) -> bool:
+    try:
+        return _dispatch_transition(watcher, agent, task, db, gate)
+    except TransitionConflict as e:
+        log(f"{e}, skipping transition", "⏭️")
+        return True
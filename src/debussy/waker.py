@@ -0,0 +1,103 @@
+"""Wake the watcher when something it reacts to changes.
+
+Instead of sleeping a fixed POLL_INTERVAL between ticks, the watcher waits
+on cheap signals checked every WAKE_CHECK_INTERVAL: the stat() of the takt
+database and its WAL (every commit grows or rewrites the WAL), the config
+file, and exit of agent processes (Popen.poll is a non-blocking waitpid).
+A fallback timeout still bounds the sleep for what cannot be observed this
+way, such as agents running in tmux windows or quota pause deadlines.
+
+Wakes are debounced: a tick starts at most every MIN_TICK_INTERVAL, so a
+burst of agent commits coalesces into one tick. Writes the watcher makes
+itself inside own_writes() do not count as a change.
+"""
+
+import os
+import subprocess
+import time
+from collections.abc import Callable, Iterable
+from contextlib import contextmanager
+from pathlib import Path
+
+WAKE_CHECK_INTERVAL = 0.05
+MIN_TICK_INTERVAL = 0.25
+
+
+def _stat_key(path: Path) -> tuple[int, int] | None:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class Waker:
+    def __init__(
+        self,
+        paths: Iterable[Path],
+        check_interval: float = WAKE_CHECK_INTERVAL,
+        min_interval: float = MIN_TICK_INTERVAL,
+    ):
+        self.paths = list(paths)
+        self.check_interval = check_interval
+        self.min_interval = min_interval
+        self._baseline = self._signature()
+        self._marked_at = time.monotonic() - min_interval
+
+    def _signature(self) -> tuple:
+        return tuple(_stat_key(p) for p in self.paths)
+
+    def mark(self) -> None:
+        """Record the current file state; call at the start of a tick so a
+        change made while the tick runs still wakes the next wait."""
+        self._baseline = self._signature()
+        self._marked_at = time.monotonic()
+
+    @contextmanager
+    def own_writes(self):
+        """Don't wake for the caller's writes inside this block. A change
+        made by someone else since mark() still wakes, as does one that
+        lands while the block runs after such a change."""
+        before = self._signature()
+        try:
+            yield
+        finally:
+            if before == self._baseline:
+                self._baseline = self._signature()
+
+    def wait(
+        self,
+        timeout: float,
+        procs: Iterable[subprocess.Popen] = (),
+        should_exit: Callable[[], bool] = lambda: False,
+        jobs_done: Callable[[], bool] = lambda: False,
+    ) -> str:
+        """Block until a watched file changes, a process exits, a background
+        job finishes or timeout, but not earlier than min_interval after
+        the last mark().
+
+        Returns "file", "proc", "job", "exit" or "timeout". A process that
+        has already exited counts, so pass only ones the caller has not reaped.
+        """
+        procs = list(procs)
+        deadline = time.monotonic() + timeout
+        earliest = self._marked_at + self.min_interval
+        while True:
+            if should_exit():
+                return "exit"
+            now = time.monotonic()
+            reason = self._wake_reason(procs, jobs_done) if now >= earliest else None
+            if reason:
+                return reason
+            if now >= deadline:
+                return "timeout"
+            time.sleep(min(self.check_interval, deadline - now))
+
+    def _wake_reason(self, procs: list[subprocess.Popen], jobs_done: Callable[[], bool]) -> str | None:
+        if self._signature() != self._baseline:
+            return "file"
+        if any(p.poll() is not None for p in procs):
+            return "proc"
+        if jobs_done():
+            return "job"
+        return None
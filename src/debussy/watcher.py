@@ -8,22 +8,83 @@ import time
 import traceback
 from pathlib import Path
 
-from .agent import AgentInfo, get_task_status, repo_root
+from .agent import AgentInfo, repo_root
 from .config import (
-    AGENT_TIMEOUT, POLL_INTERVAL, SESSION_NAME,
+    AGENT_TIMEOUT, CONFIG_FILE, POLL_INTERVAL, SESSION_NAME, WAKE_TIMEOUT,
     HEARTBEAT_TICKS, STATUS_ACTIVE, STATUS_BLOCKED, STATUS_PENDING,
     _ensure_gitignored, atomic_write, get_config, log, set_config,
 )
 from .quota import check_quota, detect_limit_signal, QUOTA_CHECK_INTERVAL, QUOTA_DEFAULT_COOLDOWN
 from .pipeline_checker import check_pipeline, release_ready, reset_orphaned
-from .takt import get_db, get_task, init_db, list_tasks, release_task, add_comment
-from .takt.log import add_log
+from .gitrefs import enable_cache as cache_git_refs, invalidate as invalidate_git_refs
+from .snapshot import SnapshotWriter
+from .tick import TickSnapshot, tick_or_load
+from .waker import Waker
+from . import workers
+from .takt import (
+    add_comment, get_db, get_task, init_db, release_task,
+)
+from .takt.archive import FULL_VACUUM_HINT, gc as takt_gc
+from .takt.db import WAL_TRUNCATE_BYTES, checkpoint, wal_size
 from .tmux import send_keys, run_tmux, tmux_window_id_names, tmux_window_ids as get_tmux_windows
 from .transitions import MAX_RETRIES, ensure_stage_transition
 from .diagnostics import comment_on_task, format_death_comment, read_log_tail
 from .worktree import cleanup_orphaned_branches, cleanup_stale_worktrees, delete_task_branch, remove_worktree
 
 MIN_AGENT_RUNTIME = 30
+GC_INTERVAL = 3600
+HEARTBEAT_INTERVAL = HEARTBEAT_TICKS * POLL_INTERVAL
+
+
+def _teardown(agent: AgentInfo, kill_window: bool, delete_branch: bool):
+    """Worker-pool half of removing an agent. The worktree goes first:
+    git refuses to delete a branch that is still checked out."""
+    if kill_window:
+        agent.stop()
+    if agent.worktree_path:
+        remove_worktree(agent.name)
+    if delete_branch:
+        delete_task_branch(agent.task)
+
+
+def _teardown_key(agent: AgentInfo) -> str:
+    # Prefixed by task so a respawn can wait for the teardown to finish.
+    return f"teardown:{agent.task}:{agent.name}"
+
+
+def _run_gc(days: int):
+    try:
+        with get_db() as db:
+            report = takt_gc(db, older_than_days=days)
+    except Exception as e:
+        log(f"takt gc failed: {e}", "⚠️")
+        return
+    if report["archived"] or report["reclaimed_bytes"]:
+        log(f"Archived {report['archived']} log entries, "
+            f"reclaimed {report['reclaimed_bytes'] // 1024} KiB", "🗄️")
+    if report["needs_full_vacuum"]:
+        log(FULL_VACUUM_HINT, "🗄️")
+
+
+def _checkpoint_wal(root: Path):
+    size = wal_size(root)
+    mode = "TRUNCATE" if size > WAL_TRUNCATE_BYTES else "PASSIVE"
+    try:
+        with get_db() as db:
+            busy, _, _ = checkpoint(db, mode)
+    except Exception as e:
+        log(f"WAL checkpoint failed: {e}", "⚠️")
+        return
+    if mode == "TRUNCATE" and not busy:
+        log(f"Truncated takt WAL ({size // 1024} KiB)", "🗄️")
+
+
+def _kill_window(wid: str, name: str):
+    try:
+        subprocess.run(["tmux", "kill-window", "-t", wid], capture_output=True, timeout=10)
+        log(f"Killed orphan window: {name}", "🧹")
+    except (subprocess.SubprocessError, OSError):
+        pass
 
 
 class Watcher:
@@ -31,6 +92,10 @@ class Watcher:
     def __init__(self):
         self._root = repo_root()
         self.running: dict[str, AgentInfo] = {}
+        # role:task keys whose worktree is being prepared on the worker pool
+        self.starting: dict[str, str] = {}
+        # role:task keys of finished agents whose completion gate is running there
+        self.finishing: dict[str, str] = {}
         self.queued: set[str] = set()
         self.used_names: set[str] = set()
         self.failures: dict[str, int] = {}
@@ -40,12 +105,17 @@ class Watcher:
         self.preflight_warned: set[str] = set()
         self._last_quota_check = 0.0
         self._quota_warned = 0.0
+        self._last_gc = 0.0
         self.should_exit = False
         self.lock_file = self._root / ".debussy" / "watcher.lock"
         self.state_file = self._root / ".debussy" / "watcher_state.json"
         self._empty_branch_file = self._root / ".debussy" / "empty_branch_retries.json"
         self._cached_windows: set[str] | None = None
         self.last_notified_tasks: str = ""
+        self._notify_revision: int | None = None
+        self.snapshot = SnapshotWriter(self._root)
+        takt_db = self._root / ".takt" / "takt.db"
+        self.waker = Waker([takt_db, takt_db.with_name("takt.db-wal"), self._root / CONFIG_FILE])
         self._load_empty_branch_retries()
         _ensure_gitignored()
         cleanup_stale_worktrees()
@@ -140,11 +210,7 @@ class Watcher:
                     break
             if matched_role is None:
                 continue
-            try:
-                subprocess.run(["tmux", "kill-window", "-t", wid], capture_output=True)
-                log(f"Killed orphan window: {name}", "🧹")
-            except (subprocess.SubprocessError, OSError):
-                pass
+            workers.submit(f"window:{wid}", _kill_window, wid, name)
 
     def _alive_agents(self) -> list[AgentInfo]:
         return [a for a in self.running.values() if a.is_alive(self._cached_windows)]
@@ -166,106 +232,121 @@ class Watcher:
         atomic_write(self.state_file, json.dumps(state))
 
     def is_task_running(self, task_id: str) -> bool:
+        if task_id in self.starting.values() or task_id in self.finishing.values():
+            return True
         return any(a.task == task_id and a.is_alive(self._cached_windows) for a in self.running.values())
 
     def is_at_capacity(self) -> bool:
         max_total = get_config().get("max_total_agents", 8)
-        return len(self._alive_agents()) >= max_total
+        return len(self._alive_agents()) + len(self.starting) >= max_total
 
     def has_running_role(self, role: str) -> bool:
-        return any(a.role == role for a in self._alive_agents())
+        return self.count_running_role(role) > 0
 
     def count_running_role(self, role: str) -> int:
-        return sum(1 for a in self._alive_agents() if a.role == role)
+        starting = sum(1 for key in self.starting if key.startswith(f"{role}:"))
+        return starting + sum(1 for a in self._alive_agents() if a.role == role)
 
-    def _check_timeouts(self):
+    def _check_timeouts(self, tick: TickSnapshot | None = None):
         now = time.time()
         timeout = get_config().get("agent_timeout", AGENT_TIMEOUT)
-        for key, agent in list(self.running.items()):
-            if not agent.is_alive(self._cached_windows):
-                continue
-            elapsed = now - agent.started_at
-            if elapsed < timeout:
-                continue
-            log(f"{agent.name} timed out after {int(elapsed)}s on {agent.task}", "⏰")
+        with tick_or_load(tick) as tick:
+            for key, agent in list(self.running.items()):
+                if not agent.is_alive(self._cached_windows):
+                    continue
+                elapsed = now - agent.started_at
+                if elapsed < timeout:
+                    continue
+                log(f"{agent.name} timed out after {int(elapsed)}s on {agent.task}", "⏰")
+                tick.comment(agent.task, "watcher",
+                             f"Agent {agent.name} timed out after {int(elapsed)}s")
+                tick.log(agent.task, "transition", "watcher", "timeout")
+                tick.release(agent.task)
+                self._remove_agent(key, agent, stop=True)
+
+    def _remove_agent(self, key: str, agent: AgentInfo, stop: bool = False,
+                      delete_branch: bool = False):
+        """Forget an agent. Killing its tmux window, removing its worktree and,
+        with delete_branch, its task branch run as one job on the worker
+        pool; its name stays taken until that finishes."""
+        kill_window = stop and agent.tmux
+        if stop and not kill_window:
             agent.stop()
-            with get_db() as db:
-                add_comment(db, agent.task, "watcher",
-                            f"Agent {agent.name} timed out after {int(elapsed)}s")
-                add_log(db, agent.task, "transition", "watcher", "timeout")
-                release_task(db, agent.task)
-            self._remove_agent(key, agent)
-
-    def _remove_agent(self, key: str, agent: AgentInfo):
         agent.cleanup()
-        if agent.worktree_path:
-            try:
-                remove_worktree(agent.name)
-            except (subprocess.SubprocessError, OSError) as e:
-                log(f"Failed to remove worktree for {agent.name}: {e}", "⚠️")
-        self.used_names.discard(agent.name)
         if self._cached_windows is not None:
             if agent.window_id:
                 self._cached_windows.discard(agent.window_id)
             else:
                 self._cached_windows.discard(agent.name)
         del self.running[key]
+        if not kill_window and not agent.worktree_path and not delete_branch:
+            self.used_names.discard(agent.name)
+            return
+        workers.submit(_teardown_key(agent), _teardown, agent, kill_window, delete_branch,
+                       on_done=lambda f: self._teardown_done(agent, f))
+
+    def _teardown_done(self, agent: AgentInfo, future):
+        error = future.exception()
+        if error is not None:
+            stderr = (getattr(error, "stderr", "") or "").strip()
+            detail = f" — {stderr}" if stderr else ""
+            log(f"Failed to tear down {agent.name}: {error}{detail}", "⚠️")
+        self.used_names.discard(agent.name)
 
-    def cleanup_finished(self):
+    def cleanup_finished(self, tick: TickSnapshot | None = None):
         cleaned = False
         transitioned = False
         quota_hit = False
         quota_ts = None
         quota_on = get_config().get("quota_check")
-        for key, agent in list(self.running.items()):
-            if agent.tmux and agent.is_alive(self._cached_windows):
-                if agent.check_completion():
-                    log(f"{agent.name} completed {agent.task}", "✅")
-                    agent.stop()
-                    if ensure_stage_transition(self, agent):
-                        self.failures.pop(agent.task, None)
-                        transitioned = True
-                    self._remove_agent(key, agent)
-                    cleaned = True
-                continue
+        with tick_or_load(tick) as tick:
+            for key, agent in list(self.running.items()):
+                if agent.tmux and agent.is_alive(self._cached_windows):
+                    if agent.check_completion():
+                        log(f"{agent.name} completed {agent.task}", "✅")
+                        if ensure_stage_transition(self, agent):
+                            self.failures.pop(agent.task, None)
+                            transitioned = True
+                        tick.reload(agent.task)
+                        self._remove_agent(key, agent, stop=True)
+                        cleaned = True
+                    continue
 
-            if not agent.is_alive(self._cached_windows):
-                elapsed = time.time() - agent.started_at
-                task_status = get_task_status(agent.task)
-                if agent.tmux:
-                    agent_completed = agent.claimed and task_status not in (STATUS_ACTIVE, None)
-                else:
-                    agent_completed = elapsed >= MIN_AGENT_RUNTIME and task_status != STATUS_ACTIVE
-                if agent_completed:
-                    if ensure_stage_transition(self, agent):
-                        self.failures.pop(agent.task, None)
-                        transitioned = True
-                    log(f"{agent.name} finished {agent.task}", "✔️")
-                else:
-                    self.failures[agent.task] = self.failures.get(agent.task, 0) + 1
-                    log(f"{agent.name} died on {agent.task} after {int(elapsed)}s, status={task_status} (attempt {self.failures[agent.task]}/{MAX_RETRIES})", "💥")
-                    log_tail = read_log_tail(agent.log_path) if agent.log_path else ""
-                    if quota_on:
-                        hit, ts = detect_limit_signal(log_tail)
-                        if hit:
-                            quota_hit = True
-                            if ts is not None:
-                                quota_ts = ts if quota_ts is None else min(quota_ts, ts)
-                            self.failures[agent.task] = max(0, self.failures.get(agent.task, 0) - 1)
-                    comment = format_death_comment(agent.name, int(elapsed), str(task_status), log_tail)
-                    comment_on_task(agent.task, comment)
-                    if task_status == STATUS_ACTIVE:
-                        with get_db() as db:
-                            release_task(db, agent.task)
+                if not agent.is_alive(self._cached_windows):
+                    elapsed = time.time() - agent.started_at
+                    # The agent may have written just before exiting, after
+                    # the snapshot was taken: read its task fresh.
+                    tick.reload(agent.task)
+                    task_status = tick.status(agent.task)
+                    if agent.tmux:
+                        agent_completed = agent.claimed and task_status not in (STATUS_ACTIVE, None)
+                    else:
+                        agent_completed = elapsed >= MIN_AGENT_RUNTIME and task_status != STATUS_ACTIVE
+                    if agent_completed:
+                        if ensure_stage_transition(self, agent):
+                            self.failures.pop(agent.task, None)
+                            transitioned = True
+                        tick.reload(agent.task)
+                        log(f"{agent.name} finished {agent.task}", "✔️")
+                    else:
+                        self.failures[agent.task] = self.failures.get(agent.task, 0) + 1
+                        log(f"{agent.name} died on {agent.task} after {int(elapsed)}s, status={task_status} (attempt {self.failures[agent.task]}/{MAX_RETRIES})", "💥")
+                        log_tail = read_log_tail(agent.log_path) if agent.log_path else ""
+                        if quota_on:
+                            hit, ts = detect_limit_signal(log_tail)
+                            if hit:
+                                quota_hit = True
+                                if ts is not None:
+                                    quota_ts = ts if quota_ts is None else min(quota_ts, ts)
+                                self.failures[agent.task] = max(0, self.failures.get(agent.task, 0) - 1)
+                        comment = format_death_comment(agent.name, int(elapsed), str(task_status), log_tail)
+                        comment_on_task(agent.task, comment)
+                        if task_status == STATUS_ACTIVE:
+                            tick.release(agent.task)
                     # Clean up stale task branch so next developer spawn gets a fresh checkout
-                    if agent.role == "developer":
-                        try:
-                            delete_task_branch(agent.task)
-                            log(f"Deleted stale branch feature/{agent.task} after agent death", "🧹")
-                        except (subprocess.SubprocessError, OSError) as e:
-                            log(f"Failed to delete branch for {agent.task}: {e}", "⚠️")
-                self._remove_agent(key, agent)
-                cleaned = True
+                    self._remove_agent(key, agent, delete_branch=(
+                        not agent_completed and agent.role == "developer"))
+                    cleaned = True
 
         if cleaned:
             self.save_state()
@@ -285,16 +366,14 @@ class Watcher:
     def _pause_running_agents(self, comment: str):
         for key, agent in list(self.running.items()):
             agent.stop()
-            if get_task_status(agent.task) == STATUS_ACTIVE:
-                with get_db() as db:
-                    add_comment(db, agent.task, "watcher", comment)
-                    release_task(db, agent.task)
-            self._remove_agent(key, agent)
-            if agent.role == "developer":
+            with get_db() as db:
                 try:
-                    delete_task_branch(agent.task)
-                except (subprocess.SubprocessError, OSError):
-                    pass
+                    release_task(db, agent.task, expect_status=STATUS_ACTIVE)
+                except ValueError:
+                    pass  # No longer active (TransitionConflict) or gone
+                else:
+                    add_comment(db, agent.task, "watcher", comment)
+            self._remove_agent(key, agent, delete_branch=agent.role == "developer")
         self.save_state()
 
     def _enter_quota_pause(self, reset_at, source: str, status=None):
@@ -345,8 +424,11 @@ class Watcher:
         if not get_config().get("notify_conductor", False):
             return
         try:
-            with get_db() as db:
-                all_tasks = list_tasks(db)
+            snapshot = self.snapshot.data or self.snapshot.refresh()
+            if snapshot["revision"] == self._notify_revision:
+                return
+            all_tasks = snapshot["tasks"]
+            self._notify_revision = snapshot["revision"]
 
             messages = []
             needs_attention = set()
@@ -392,6 +474,24 @@ class Watcher:
         except Exception as e:
             log(f"Failed to notify conductor: {e}", "⚠️")
 
+    def _maybe_gc(self):
+        now = time.time()
+        if now - self._last_gc < GC_INTERVAL:
+            return
+        self._last_gc = now
+        days = get_config().get("log_retention_days", 30)
+        # gc may VACUUM: keep it off the main thread.
+        workers.submit("takt-gc", _run_gc, days)
+
+    def _checkpoint_wal(self):
+        workers.submit("wal-checkpoint", _checkpoint_wal, self._root)
+
+    def _wake_timeout(self) -> float:
+        # Agents in tmux windows have no process to watch: keep polling them.
+        if any(a.proc is None for a in self.running.values()):
+            return POLL_INTERVAL
+        return WAKE_TIMEOUT
+
     def _log_heartbeat(self):
         active = [(a.name, a.task) for a in self._alive_agents()]
         if active:
@@ -403,6 +503,8 @@ class Watcher:
 
     def _shutdown(self):
         log("Stopping agents...", "🛑")
+        # Let running git/tmux jobs finish; spawns they complete are not started.
+        workers.stop()
         for agent in list(self.running.values()):
             agent.stop()
             if agent.worktree_path:
@@ -429,44 +531,66 @@ class Watcher:
             log("Another watcher is already running", "🔒")
             return
 
-        log(f"Watcher started (poll every {POLL_INTERVAL}s)", "👀")
+        log(f"Watcher started (wakes on takt/config changes, at most {WAKE_TIMEOUT}s idle)", "👀")
         self._kill_orphan_windows()
 
         info = tmux_window_id_names()
         remaining = len(info) if info else 0
         log(f"Startup: {remaining} tmux window(s) after orphan cleanup", "📊")
 
-        tick = 0
+        cache_git_refs()
+        workers.start()
+        last_heartbeat = time.monotonic()
         while not self.should_exit:
+            self.waker.mark()
+            # Refs move outside the watcher too (agents push, users fetch).
+            invalidate_git_refs()
             try:
+                # Start agents whose worktrees are ready, release finished names.
+                workers.collect()
                 self._refresh_tmux_cache()
-                self._check_timeouts()
-                quota_hit, quota_ts = self.cleanup_finished()
-                self._kill_orphan_windows()
-                reset_orphaned(self)
-
-                if quota_hit:
-                    self._enter_quota_pause(quota_ts, "wall-hit")
-
-                self._maybe_auto_resume()
-                if not get_config().get("paused", False):
-                    self._refresh_tmux_cache()
-                    status = self._quota_gate()
-                    if status is not None:
-                        self._enter_quota_pause(status.reset_at, "quota", status)
-                    else:
-                        release_ready(self)
-                        check_pipeline(self)
+                with TickSnapshot.load() as tick:
+                    self._check_timeouts(tick)
+                    quota_hit, quota_ts = self.cleanup_finished(tick)
+                    self._kill_orphan_windows()
+                    reset_orphaned(self, tick)
+
+                    if quota_hit:
+                        self._enter_quota_pause(quota_ts, "wall-hit")
+
+                    self._maybe_auto_resume()
+                    if not get_config().get("paused", False):
+                        self._refresh_tmux_cache()
+                        status = self._quota_gate()
+                        if status is not None:
+                            self._enter_quota_pause(status.reset_at, "quota", status)
+                        else:
+                            release_ready(self, tick)
+                            # Spawned agents claim through takt, so they must
+                            # see this tick's releases.
+                            with self.waker.own_writes():
+                                tick.flush()
+                            check_pipeline(self, tick)
+                    with self.waker.own_writes():
+                        tick.flush()
 
                 self.save_state()
+                self.snapshot.refresh()
 
-                tick += 1
-                if tick % HEARTBEAT_TICKS == 0:
+                if time.monotonic() - last_heartbeat >= HEARTBEAT_INTERVAL:
+                    last_heartbeat = time.monotonic()
                     self._notify_conductor()
                     self._log_heartbeat()
-                    cleanup_orphaned_branches()
+                    workers.submit("cleanup-branches", cleanup_orphaned_branches)
+                    self._maybe_gc()
+                    self._checkpoint_wal()
             except Exception:
                 log(f"Error in watcher loop:\n{traceback.format_exc()}", "⚠️")
-            time.sleep(POLL_INTERVAL)
+            self.waker.wait(
+                self._wake_timeout(),
+                procs=[a.proc for a in self.running.values() if a.proc],
+                should_exit=lambda: self.should_exit,
+                jobs_done=workers.has_finished,
+            )
 
         self._shutdown()
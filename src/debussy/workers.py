@@ -0,0 +1,124 @@
+"""Slow git and tmux commands on a bounded thread pool.
+
+Spawn preflight, worktree add/remove, branch deletion (which pushes to
+origin), tmux kill-window and branch cleanup can each take seconds
+against a slow remote; the hourly takt gc may VACUUM. The watcher starts a pool of WORKER_THREADS and submits these as
+keyed jobs; a job's on_done callback runs on the main thread when the
+next tick calls collect(), so watcher state is only touched there. While
+a key is pending, submitting it again returns the running job.
+
+Without a started pool (CLI commands, tests) submit() runs the job inline
+and calls on_done at once, so callers need no second code path.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from .config import log
+
+WORKER_THREADS = 4
+
+
+class WorkerPool:
+    def __init__(self, max_workers: int = WORKER_THREADS):
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="debussy-io")
+        self._jobs: dict[str, tuple[Future, Callable[[Future], None] | None]] = {}
+        self._finished = threading.Event()
+
+    def submit(self, key: str, fn: Callable, *args,
+               on_done: Callable[[Future], None] | None = None) -> Future:
+        job = self._jobs.get(key)
+        if job is not None:
+            return job[0]
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(lambda _: self._finished.set())
+        self._jobs[key] = (future, on_done)
+        return future
+
+    def busy(self, key: str) -> bool:
+        return key in self._jobs
+
+    def busy_prefix(self, prefix: str) -> bool:
+        return any(key.startswith(prefix) for key in self._jobs)
+
+    def has_finished(self) -> bool:
+        """True once a job finished that collect() has not handled yet."""
+        return self._finished.is_set()
+
+    def collect(self) -> int:
+        """Run on_done for finished jobs on the calling thread. Returns how many."""
+        self._finished.clear()
+        done = [(k, f, cb) for k, (f, cb) in self._jobs.items() if f.done()]
+        for key, future, on_done in done:
+            del self._jobs[key]
+            _finish(key, future, on_done)
+        return len(done)
+
+    def shutdown(self) -> None:
+        """Wait for running jobs, then handle their results."""
+        self._executor.shutdown(wait=True)
+        self.collect()
+
+
+def _finish(key: str, future: Future, on_done: Callable[[Future], None] | None) -> None:
+    try:
+        if on_done is not None:
+            on_done(future)
+        elif future.exception() is not None:
+            log(f"Background job {key} failed: {future.exception()}", "⚠️")
+    except Exception as e:
+        log(f"Handling background job {key} failed: {e}", "⚠️")
+
+
+_pool: WorkerPool | None = None
+
+
+def start(max_workers: int = WORKER_THREADS) -> WorkerPool:
+    global _pool
+    _pool = WorkerPool(max_workers)
+    return _pool
+
+
+def stop() -> None:
+    global _pool
+    pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+def active() -> bool:
+    return _pool is not None
+
+
+def submit(key: str, fn: Callable, *args,
+           on_done: Callable[[Future], None] | None = None) -> Future:
+    """Run fn(*args) on the pool, or right here when none is started."""
+    if _pool is not None:
+        return _pool.submit(key, fn, *args, on_done=on_done)
+    future: Future = Future()
+    try:
+        future.set_result(fn(*args))
+    except Exception as e:
+        future.set_exception(e)
+    _finish(key, future, on_done)
+    return future
+
+
+def busy(key: str) -> bool:
+    return _pool is not None and _pool.busy(key)
+
+
+def busy_prefix(prefix: str) -> bool:
+    """True while any pending job's key starts with prefix."""
+    return _pool is not None and _pool.busy_prefix(prefix)
+
+
+def collect() -> int:
+    return _pool.collect() if _pool is not None else 0
+
+
+def has_finished() -> bool:
+    return _pool is not None and _pool.has_finished()
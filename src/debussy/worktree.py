@@ -1,12 +1,16 @@
 """Git worktree lifecycle management for parallel agent isolation."""
 
+import json
 import shutil
 import subprocess
 from pathlib import Path
 
 from .agent import repo_root
 from .config import STAGE_DONE, get_config, log
-from .takt import get_db, list_tasks
+from .fetcher import fetch_origin
+from .gitrefs import invalidate, ref_snapshot
+from .takt import get_db
+from .takt.archive import list_archived_tasks
 
 WORKTREES_DIR = ".debussy-worktrees"
 
@@ -36,14 +40,18 @@ def _symlink_dirs(worktree: Path, repo: Path):
 
 
 def _branch_exists(branch: str) -> bool:
-    for ref in (branch, f"refs/remotes/origin/{branch}"):
-        result = subprocess.run(
-            ["git", "rev-parse", "--verify", ref],
-            capture_output=True, timeout=5,
+    refs = ref_snapshot()
+    return refs.exists(branch) or refs.exists(f"refs/remotes/origin/{branch}")
+
+
+def _delete_local_branch(branch: str, check: bool = False):
+    try:
+        subprocess.run(
+            ["git", "branch", "-D", branch],
+            capture_output=True, text=True, timeout=10, check=check,
         )
-        if result.returncode == 0:
-            return True
-    return False
+    finally:
+        invalidate()
 
 
 def _remove_worktree_for_branch(branch: str):
@@ -91,6 +99,7 @@ def create_worktree(agent_name: str, branch: str, start_point: str | None = None
         cmd = ["git", "worktree", "add", str(wt_path), branch]
 
     result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+    invalidate()
     if result.returncode != 0 and new_branch and "already exists" in result.stderr:
         if wt_path.exists():
             shutil.rmtree(wt_path, ignore_errors=True)
@@ -99,13 +108,14 @@ def create_worktree(agent_name: str, branch: str, start_point: str | None = None
     if result.returncode != 0 and new_branch:
         subprocess.run(["git", "worktree", "prune"], capture_output=True, timeout=10)
         if _branch_exists(branch):
-            subprocess.run(["git", "branch", "-D", branch], capture_output=True, timeout=10)
+            _delete_local_branch(branch)
         if wt_path.exists():
             shutil.rmtree(wt_path, ignore_errors=True)
         cmd = ["git", "worktree", "add", "-b", branch, str(wt_path)]
         if start_point:
             cmd.append(start_point)
         result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        invalidate()
     if result.returncode != 0:
         raise subprocess.CalledProcessError(result.returncode, cmd, result.stdout, result.stderr)
     _symlink_dirs(wt_path, repo)
@@ -128,11 +138,18 @@ def remove_worktree(agent_name: str):
         subprocess.run(["git", "worktree", "prune"], capture_output=True, timeout=10)
 
 
-def _get_done_task_ids() -> set[str]:
+def _get_done_task_ids(task_ids: list[str]) -> set[str]:
+    """Return which of task_ids are done, including tasks archived by gc."""
     try:
         with get_db() as db:
-            tasks = list_tasks(db, stage=STAGE_DONE)
-        return {t["id"] for t in tasks}
+            done = {r["id"] for r in db.execute(
+                "SELECT id FROM tasks WHERE stage = ? AND id IN (SELECT value FROM json_each(?))",
+                (STAGE_DONE, json.dumps(task_ids)),
+            ).fetchall()}
+            rest = [t for t in task_ids if t not in done]
+            if rest:
+                done |= {t["id"] for t in list_archived_tasks(db, stage=STAGE_DONE, ids=rest)}
+        return done
     except Exception:
         return set()
 
@@ -164,63 +181,33 @@ def _worktree_branches() -> set[str]:
 
 
 def cleanup_orphaned_branches():
-    import os
-    env = os.environ.copy()
-    env["GIT_TERMINAL_PROMPT"] = "0"
-    try:
-        subprocess.run(["git", "fetch", "--prune"], capture_output=True, timeout=30, env=env)
-    except (subprocess.SubprocessError, OSError):
-        pass
+    fetch_origin()
 
     base_branch = get_config().get("base_branch", "")
-    closed = _get_done_task_ids()
     active = _get_active_task_ids()
     in_use = _worktree_branches()
 
-    result = subprocess.run(
-        ["git", "branch", "--list", "feature/*"],
-        capture_output=True, text=True, timeout=10,
-    )
-    if result.returncode == 0:
-        for line in result.stdout.strip().splitlines():
-            branch = line.strip().lstrip("+* ")
-            if not branch or branch == base_branch or branch in in_use:
-                continue
-            task_id = branch.removeprefix("feature/")
-            if task_id in active:
-                continue
-            remote_check = subprocess.run(
-                ["git", "rev-parse", "--verify", f"origin/{branch}"],
-                capture_output=True, timeout=5,
-            )
-            if remote_check.returncode != 0:
-                subprocess.run(
-                    ["git", "branch", "-D", branch],
-                    capture_output=True, timeout=10,
-                )
-                log(f"Deleted orphaned local branch: {branch}", "🧹")
-
-    result = subprocess.run(
-        ["git", "branch", "-r", "--list", "origin/feature/*"],
-        capture_output=True, text=True, timeout=10,
-    )
-    if result.returncode != 0:
+    refs = ref_snapshot()
+    if not refs.ok:
         return
-    for line in result.stdout.strip().splitlines():
-        ref = line.strip()
-        if not ref:
+    for branch in refs.branches("feature/"):
+        if branch == base_branch or branch in in_use:
             continue
-        branch = ref.removeprefix("origin/")
-        if branch == base_branch:
+        task_id = branch.removeprefix("feature/")
+        if task_id in active:
             continue
+        if not refs.exists(f"refs/remotes/origin/{branch}"):
+            _delete_local_branch(branch)
+            log(f"Deleted orphaned local branch: {branch}", "🧹")
+
+    branches = [b for b in refs.remote_branches("feature/") if b != base_branch]
+    closed = _get_done_task_ids([b.removeprefix("feature/") for b in branches])
+    for branch in branches:
         task_id = branch.removeprefix("feature/")
         if task_id in closed:
             if _delete_remote_branch(branch):
                 _delete_tracking_ref(branch)
-                subprocess.run(
-                    ["git", "branch", "-D", branch],
-                    capture_output=True, timeout=10,
-                )
+                _delete_local_branch(branch)
                 log(f"Deleted stale remote branch: {branch}", "🧹")
 
 
@@ -252,9 +239,8 @@ def _delete_remote_branch(branch: str) -> bool:
         ["git", "push", "--no-verify", "origin", "--delete", branch],
         capture_output=True, text=True, timeout=15,
     )
-    if result.returncode == 0:
-        return True
-    if "remote ref does not exist" in result.stderr:
+    if result.returncode == 0 or "remote ref does not exist" in result.stderr:
+        invalidate()
         return True
     log(f"Failed to delete remote branch {branch}: {result.stderr.strip()}", "⚠️")
     return False
@@ -265,25 +251,24 @@ def _delete_tracking_ref(branch: str):
         ["git", "update-ref", "-d", f"refs/remotes/origin/{branch}"],
         capture_output=True, timeout=5,
     )
+    invalidate()
 
 
 def delete_task_branch(task_id: str) -> None:
-    """Delete a developer's feature branch locally if it exists."""
+    """Delete a developer's feature branch locally if it exists.
+
+    Raises CalledProcessError if git refuses, e.g. while the branch is
+    still checked out in a worktree.
+    """
     branch = f"feature/{task_id}"
     if _branch_exists(branch):
         _remove_worktree_for_branch(branch)
-        subprocess.run(
-            ["git", "branch", "-D", branch],
-            capture_output=True, timeout=10,
-        )
+        _delete_local_branch(branch, check=True)
         log(f"Deleted task branch: {branch}", "🧹")
 
 
 def delete_branch(branch: str):
-    subprocess.run(
-        ["git", "branch", "-D", branch],
-        capture_output=True, timeout=10,
-    )
+    _delete_local_branch(branch)
     _delete_remote_branch(branch)
     _delete_tracking_ref(branch)
 
@@ -0,0 +1,115 @@
+"""Tests for fetcher.py — coalesced, debounced git fetches."""
+
+import threading
+import time
+
+import pytest
+
+from debussy import fetcher
+from debussy.fetcher import FetchCoordinator, FetchResult
+
+
+@pytest.fixture
+def runs(monkeypatch):
+    """Record fetches instead of running git; each succeeds unless told otherwise."""
+    calls = []
+    outcome = {"ok": True, "gate": None}
+
+    def fake_run(branches, timeout):
+        calls.append(branches)
+        if outcome["gate"] is not None:
+            outcome["gate"].wait(5)
+        return FetchResult(outcome["ok"] if branches is not None else True)
+
+    monkeypatch.setattr(fetcher, "_run_fetch", fake_run)
+    return calls, outcome
+
+
+def test_recent_fetch_is_reused(runs):
+    calls, _ = runs
+    coord = FetchCoordinator(fresh_for=60)
+    assert coord.fetch().ok
+    second = coord.fetch(["feature/TST-1"])
+    assert second.ok and second.cached
+    assert calls == [None]
+
+
+def test_branch_fetch_does_not_cover_full(runs):
+    calls, _ = runs
+    coord = FetchCoordinator(fresh_for=60)
+    coord.fetch(["master"])
+    assert coord.fetch(["master"]).cached
+    coord.fetch()
+    assert calls == [frozenset({"master"}), None]
+
+
+def test_stale_after_window(runs):
+    calls, _ = runs
+    coord = FetchCoordinator(fresh_for=0)
+    coord.fetch()
+    coord.fetch()
+    assert calls == [None, None]
+
+
+def test_failed_branch_fetch_falls_back_to_full(runs):
+    calls, outcome = runs
+    outcome["ok"] = False
+    coord = FetchCoordinator(fresh_for=60)
+    assert coord.fetch(["feature/gone"]).ok
+    assert calls == [frozenset({"feature/gone"}), None]
+    # The full fetch that ran instead counts for everything.
+    assert coord.fetch(["master"]).cached
+
+
+def test_concurrent_callers_share_one_fetch(runs):
+    calls, outcome = runs
+    gate = outcome["gate"] = threading.Event()
+    coord = FetchCoordinator(fresh_for=60)
+    results = []
+
+    def worker():
+        results.append(coord.fetch(["master"]))
+
+    first = threading.Thread(target=worker)
+    first.start()
+    while not calls:
+        time.sleep(0.01)
+    others = [threading.Thread(target=worker) for _ in range(3)]
+    for t in others:
+        t.start()
+    time.sleep(0.05)
+    gate.set()
+    for t in [first, *others]:
+        t.join(5)
+
+    assert calls == [frozenset({"master"})]
+    assert len(results) == 4 and all(r.ok for r in results)
+
+
+def test_forced_fetch_ignores_recent_result(runs):
+    calls, _ = runs
+    coord = FetchCoordinator(fresh_for=60)
+    coord.fetch()
+    assert not coord.fetch(["master"], force=True).cached
+    assert calls == [None, frozenset({"master"})]
+
+
+def test_forced_fetch_does_not_join_earlier_inflight(runs):
+    calls, outcome = runs
+    gate = outcome["gate"] = threading.Event()
+    coord = FetchCoordinator(fresh_for=60)
+    results = []
+    first = threading.Thread(target=lambda: coord.fetch())
+    first.start()
+    while not calls:
+        time.sleep(0.01)
+    forced = threading.Thread(target=lambda: results.append(coord.fetch(force=True)))
+    forced.start()
+    time.sleep(0.05)
+    gate.set()
+    for t in (first, forced):
+        t.join(5)
+
+    # The forced caller waited for the fetch already running, then ran its own.
+    assert calls == [None, None]
+    assert results[0].ok and not results[0].cached
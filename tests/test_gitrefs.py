@@ -0,0 +1,86 @@
+"""Tests for gitrefs.py — one for-each-ref snapshot of branches."""
+
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from debussy import gitrefs
+from debussy.gitrefs import GitRefSnapshot, invalidate, ref_snapshot
+
+
+def _git(repo: Path, *args):
+    return subprocess.run(["git", *args], capture_output=True, text=True, timeout=10, cwd=str(repo))
+
+
+def _commit(repo: Path, name: str):
+    (repo / name).write_text(name)
+    _git(repo, "add", name)
+    _git(repo, "commit", "-m", name)
+
+
+@pytest.fixture
+def git_repo(tmp_path, monkeypatch):
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _git(repo, "init", "-b", "master")
+    _git(repo, "config", "user.email", "test@test.com")
+    _git(repo, "config", "user.name", "Test")
+    _commit(repo, "README.md")
+    origin = tmp_path / "origin.git"
+    _git(tmp_path, "clone", "--bare", str(repo), str(origin))
+    _git(repo, "remote", "add", "origin", str(origin))
+    _git(repo, "checkout", "-b", "feature/TST-1")
+    _commit(repo, "a.txt")
+    _commit(repo, "b.txt")
+    _git(repo, "push", "origin", "feature/TST-1")
+    _git(repo, "checkout", "master")
+    _git(repo, "branch", "feature/TST-2")
+    _git(repo, "fetch", "origin")
+    monkeypatch.chdir(repo)
+    monkeypatch.setattr(gitrefs, "_cache_enabled", False)
+    invalidate()
+    return repo
+
+
+def test_load_reads_local_and_origin_refs(git_repo):
+    refs = GitRefSnapshot.load()
+    assert refs.ok
+    assert refs.exists("feature/TST-2")
+    assert refs.exists("origin/feature/TST-1")
+    assert refs.resolve("origin/master") == "refs/remotes/origin/master"
+    assert refs.sha("master") == _git(git_repo, "rev-parse", "master").stdout.strip()
+    assert not refs.exists("origin/feature/TST-2")
+    assert sorted(refs.branches("feature/")) == ["feature/TST-1", "feature/TST-2"]
+    assert refs.remote_branches("feature/") == ["feature/TST-1"]
+
+
+def test_ahead_behind_against_base(git_repo):
+    refs = GitRefSnapshot.load("origin/master")
+    assert refs.ahead_behind("origin/feature/TST-1") == (2, 0)
+    assert refs.ahead_behind("origin/master", "origin/feature/TST-1") == (0, 2)
+    assert refs.ahead_behind("origin/feature/TST-9") is None
+
+
+def test_unsupported_ahead_behind_atom_falls_back(git_repo, monkeypatch):
+    monkeypatch.setattr(gitrefs, "_has_ahead_behind", lambda: True)
+    refs = GitRefSnapshot.load("origin/no-such-base")
+    assert refs.ok and refs.exists("master")
+
+
+def test_outside_repo_is_not_ok(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    refs = GitRefSnapshot.load()
+    assert not refs.ok
+    assert not refs.exists("master")
+
+
+def test_cache_holds_until_invalidated(git_repo, monkeypatch):
+    assert ref_snapshot() is not ref_snapshot()
+    monkeypatch.setattr(gitrefs, "_cache_enabled", True)
+    first = ref_snapshot()
+    _git(git_repo, "branch", "feature/TST-3")
+    assert ref_snapshot() is first
+    assert not first.exists("feature/TST-3")
+    invalidate()
+    assert ref_snapshot().exists("feature/TST-3")
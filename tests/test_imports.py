@@ -0,0 +1,50 @@
+"""Entry points must not pull in modules they do not need at import time."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+SRC = str(Path(__file__).resolve().parent.parent / "src")
+
+
+def _loaded_modules(module: str) -> set[str]:
+    code = f"import sys; import {module}; print('\\n'.join(sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True,
+        env={"PYTHONPATH": SRC, "PATH": ""},
+    )
+    return set(result.stdout.split())
+
+
+def test_takt_cli_skips_debussy_config_and_server():
+    loaded = _loaded_modules("debussy.takt.cli")
+    assert "debussy.config" not in loaded
+    assert "debussy.takt.server" not in loaded
+    assert "socketserver" not in loaded
+
+
+def test_takt_show_skips_search_history_wait_and_archive(tmp_path):
+    from debussy.takt import create_task, get_db, init_db
+
+    (tmp_path / ".git").mkdir()
+    init_db(tmp_path)
+    with get_db(tmp_path) as db:
+        task_id = create_task(db, "Task")["id"]
+    code = ("import sys; from debussy.takt.cli import main; "
+            f"main(['show', {task_id!r}]); print('\\n'.join(sys.modules))")
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True,
+        cwd=tmp_path, env={"PYTHONPATH": SRC, "PATH": ""},
+    )
+    loaded = set(result.stdout.split())
+    assert "debussy.takt.models" in loaded
+    for module in ("debussy.takt.search", "debussy.takt.history",
+                   "debussy.takt.wait", "debussy.takt.archive"):
+        assert module not in loaded
+
+
+def test_debussy_main_defers_command_modules():
+    loaded = _loaded_modules("debussy.__main__")
+    for module in ("debussy.cli", "debussy.board", "debussy.tmux", "debussy.hooks",
+                   "debussy.worktree", "debussy.prompts", "debussy.takt"):
+        assert module not in loaded
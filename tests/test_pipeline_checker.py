@@ -5,7 +5,7 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 from debussy.takt import get_db, init_db, create_task, advance_task, update_task, get_task
-from debussy.pipeline_checker import reset_orphaned, release_ready, _should_skip_task
+from debussy.pipeline_checker import check_pipeline, reset_orphaned, release_ready, _should_skip_task
 from debussy.config import (
     STAGE_DEVELOPMENT, STAGE_BACKLOG, STAGE_ACCEPTANCE, STAGE_PARKED,
     STATUS_ACTIVE, STATUS_BLOCKED, STATUS_PENDING,
@@ -224,6 +224,16 @@ class TestShouldSkipTask:
         result = _should_skip_task(watcher, task_id, task_dict, "developer")
         assert result == "already running"
 
+    def test_cheap_skips_load_no_snapshot(self):
+        """'no id' and 'already running' are decided without reading the database."""
+        watcher = _make_watcher()
+        watcher.is_task_running.return_value = True
+
+        with patch("debussy.pipeline_checker.tick_or_load") as load:
+            assert _should_skip_task(watcher, None, {}, "developer") == "no id"
+            assert _should_skip_task(watcher, "TST-1", {}, "developer") == "already running"
+        load.assert_not_called()
+
     def test_returns_blocked_if_task_status_is_blocked(self, project):
         """Should skip with 'blocked' when task status is blocked."""
         with get_db() as db:
@@ -255,6 +265,25 @@ class TestShouldSkipTask:
         result = _should_skip_task(watcher, task_id, task_dict, "developer")
         assert result == "unresolved deps"
 
+    def test_caps_apply_to_tasks_waiting_on_deps(self, project):
+        """A task over its failure cap is blocked even while its deps are unresolved."""
+        with get_db() as db:
+            dep = create_task(db, "Pending dep")
+            advance_task(db, dep["id"])
+            task = create_task(db, "Task with dep", deps=[dep["id"]])
+            advance_task(db, task["id"])
+            task_id = task["id"]
+
+        watcher = _make_watcher()
+        watcher.failures = {task_id: 99}
+
+        with patch("debussy.pipeline_checker.spawn_agent", return_value=False):
+            check_pipeline(watcher)
+
+        with get_db() as db:
+            assert get_task(db, task_id)["status"] == STATUS_BLOCKED
+        assert task_id in watcher.blocked_failures
+
     def test_returns_none_if_all_checks_pass(self, project):
         """Should return None (no skip) when all conditions are satisfied."""
         with get_db() as db:
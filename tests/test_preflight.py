@@ -1,15 +1,20 @@
 import subprocess
 from unittest.mock import MagicMock, patch
 
+from debussy.gitrefs import GitRefSnapshot
 from debussy.preflight import check_base_branch, check_remote_ref
 
+EMPTY = GitRefSnapshot({})
+
 
 class TestCheckBaseBranch:
     def test_returns_none_when_base_branch_set_and_exists(self):
+        refs = GitRefSnapshot({"refs/remotes/origin/feature/foo": "abc"})
         with patch("debussy.preflight.get_config", return_value={"base_branch": "feature/foo"}):
-            with patch("debussy.preflight.subprocess.run") as mock_run:
-                mock_run.return_value = MagicMock(returncode=0)
-                assert check_base_branch() is None
+            with patch("debussy.preflight.ref_snapshot", return_value=refs):
+                with patch("debussy.preflight.subprocess.run") as mock_run:
+                    assert check_base_branch() is None
+                    mock_run.assert_not_called()
 
     def test_returns_error_when_base_branch_not_set(self):
         with patch("debussy.preflight.get_config", return_value={}):
@@ -19,25 +24,39 @@ class TestCheckBaseBranch:
 
     def test_returns_error_when_remote_ref_missing(self):
         with patch("debussy.preflight.get_config", return_value={"base_branch": "feature/foo"}):
-            with patch("debussy.preflight.subprocess.run") as mock_run:
-                mock_run.return_value = MagicMock(returncode=128)
-                result = check_base_branch()
-                assert result is not None
-                assert "not found" in result
+            with patch("debussy.preflight.ref_snapshot", return_value=EMPTY):
+                with patch("debussy.preflight.subprocess.run") as mock_run:
+                    mock_run.return_value = MagicMock(returncode=128)
+                    result = check_base_branch()
+                    assert result is not None
+                    assert "not found" in result
 
 
 class TestCheckRemoteRef:
     def test_returns_none_when_ref_exists(self):
-        with patch("debussy.preflight.subprocess.run") as mock_run:
-            mock_run.return_value = MagicMock(returncode=0)
-            assert check_remote_ref("origin/feature/bd-001") is None
+        refs = GitRefSnapshot({"refs/remotes/origin/feature/bd-001": "abc"})
+        with patch("debussy.preflight.ref_snapshot", return_value=refs):
+            with patch("debussy.preflight.subprocess.run") as mock_run:
+                assert check_remote_ref("origin/feature/bd-001") is None
+                mock_run.assert_not_called()
 
     def test_returns_error_when_ref_missing(self):
-        with patch("debussy.preflight.subprocess.run") as mock_run:
-            mock_run.return_value = MagicMock(returncode=128)
-            result = check_remote_ref("origin/feature/bd-001")
-            assert result is not None
-            assert "bd-001" in result
+        with patch("debussy.preflight.ref_snapshot", return_value=EMPTY):
+            with patch("debussy.preflight.subprocess.run") as mock_run:
+                mock_run.return_value = MagicMock(returncode=128)
+                result = check_remote_ref("origin/feature/bd-001")
+                assert result is not None
+                assert "bd-001" in result
+
+    def test_fetches_when_only_remote_has_ref(self):
+        with patch("debussy.preflight.ref_snapshot", return_value=EMPTY):
+            with patch("debussy.preflight.subprocess.run") as mock_run:
+                mock_run.return_value = MagicMock(returncode=0, stdout="abc\trefs/heads/feature/bd-001\n")
+                assert check_remote_ref("origin/feature/bd-001") is None
+                assert mock_run.call_args_list[-1].args[0] == [
+                    "git", "fetch", "origin",
+                    "+refs/heads/feature/bd-001:refs/remotes/origin/feature/bd-001",
+                ]
 
 
 class TestPreflightSpawn:
@@ -1,5 +1,7 @@
 """Tests for conductor prompt assembly."""
 
+from pathlib import Path
+
 import pytest
 
 from debussy.config import set_config
@@ -73,3 +75,10 @@ def test_parking_uses_parked_stage(project_dir):
     text = get_conductor_system_prompt()
     assert "takt advance <id> --to parked" in text
     assert "Never park an acceptance task" in text
+
+
+@pytest.mark.parametrize("role", ["developer", "reviewer", "tester", "integrator", "security-reviewer"])
+def test_agents_claim_conditionally(role):
+    text = (Path(__file__).resolve().parents[1] / "src" / "debussy" / "prompts" / f"{role}.md").read_text()
+    assert "--expect-status pending" in text
+    assert "exits with code 3" in text
@@ -0,0 +1,77 @@
+"""Tests for the watcher's takt snapshot."""
+
+import os
+
+import pytest
+
+from debussy import board
+from debussy.snapshot import SnapshotWriter, read_snapshot, snapshot_path
+from debussy.takt import create_task, get_db, init_db
+from debussy.takt.log import block_task
+
+
+@pytest.fixture
+def project_dir(tmp_path, monkeypatch):
+    (tmp_path / ".git").mkdir()
+    init_db(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def _age(path, seconds):
+    st = path.stat()
+    os.utime(path, (st.st_atime - seconds, st.st_mtime - seconds))
+
+
+class TestSnapshotWriter:
+    def test_writes_tasks_and_unresolved(self, project_dir):
+        with get_db() as db:
+            dep = create_task(db, "Dep")
+            task = create_task(db, "Main", deps=[dep["id"]])
+        data = SnapshotWriter(project_dir).refresh()
+        assert [t["id"] for t in data["tasks"]] == [dep["id"], task["id"]]
+        assert "description" not in data["tasks"][0]
+        assert data["unresolved"] == {task["id"]: [dep["id"]]}
+        assert read_snapshot(project_dir) == data
+
+    def test_rebuilds_only_on_revision_change(self, project_dir):
+        with get_db() as db:
+            task = create_task(db, "A")
+        writer = SnapshotWriter(project_dir)
+        first = writer.refresh()
+        assert writer.refresh() is first
+        with get_db() as db:
+            block_task(db, task["id"])
+        second = writer.refresh()
+        assert second is not first
+        assert second["tasks"][0]["status"] == "blocked"
+
+    def test_unchanged_refresh_marks_fresh(self, project_dir):
+        writer = SnapshotWriter(project_dir)
+        writer.refresh()
+        path = snapshot_path(project_dir)
+        _age(path, 3600)
+        assert read_snapshot(project_dir) is None
+        writer.refresh()
+        assert read_snapshot(project_dir) is not None
+
+
+class TestBoard:
+    def test_reads_fresh_snapshot(self, project_dir, monkeypatch):
+        monkeypatch.setattr(board, "repo_root", lambda: project_dir)
+        with get_db() as db:
+            task = create_task(db, "A")
+        SnapshotWriter(project_dir).refresh()
+        monkeypatch.setattr(board, "get_db", None)  # must not be needed
+        tasks, unresolved = board._load_board_tasks(None)
+        assert [t["id"] for t in tasks] == [task["id"]]
+        assert board._load_board_tasks("ZZ")[0] == []
+
+    def test_falls_back_to_database_when_stale(self, project_dir, monkeypatch):
+        monkeypatch.setattr(board, "repo_root", lambda: project_dir)
+        SnapshotWriter(project_dir).refresh()
+        _age(snapshot_path(project_dir), 3600)
+        with get_db() as db:
+            task = create_task(db, "A")
+        tasks, _ = board._load_board_tasks(None)
+        assert [t["id"] for t in tasks] == [task["id"]]
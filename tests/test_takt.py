@@ -17,6 +17,7 @@ from debussy.takt import (
     claim_task,
     get_log,
     get_unresolved_deps,
+    get_unresolved_deps_map,
     reject_task,
     release_task,
 )
@@ -122,6 +123,17 @@ class TestFullLifecycle:
 
         assert get_unresolved_deps(db, t2["id"]) == []
 
+    def test_unresolved_deps_map(self, db):
+        t1 = create_task(db, "Foundation")
+        t2 = create_task(db, "Walls", deps=[t1["id"]])
+        t3 = create_task(db, "Roof", deps=[t1["id"], t2["id"]])
+        assert get_unresolved_deps_map(db) == {
+            t2["id"]: [t1["id"]],
+            t3["id"]: [t1["id"], t2["id"]],
+        }
+        update_task(db, t1["id"], stage="done")
+        assert get_unresolved_deps_map(db, [t2["id"], t3["id"]]) == {t3["id"]: [t2["id"]]}
+
     def test_comments_and_log(self, db):
         """Add comments, read log entries."""
         task = create_task(db, "Task")
@@ -0,0 +1,245 @@
+"""Tests for takt log retention and archival."""
+
+import pytest
+
+from debussy.takt.archive import (
+    ARCHIVE_VERSION, archive_logs, archive_path, archive_tasks, gc, open_archive, prune_changes,
+)
+from debussy.takt.changes import current_revision
+from debussy.takt.db import get_db
+from debussy.takt.log import add_comment, get_log
+from debussy.takt.models import create_task, get_task, list_tasks, update_task
+
+
+@pytest.fixture
+def db(tmp_path):
+    with get_db(tmp_path) as conn:
+        yield conn
+
+
+def _age_log(db, task_id, days=60):
+    db.execute(
+        "UPDATE log SET timestamp = timestamp - ? WHERE task_id = ?",
+        (days * 86_400_000, task_id),
+    )
+
+
+def _done_task_with_log(db, title="Old", messages=("one", "two")):
+    task = create_task(db, title)
+    for m in messages:
+        add_comment(db, task["id"], "dev", m)
+    update_task(db, task["id"], stage="done")
+    return task
+
+
+class TestArchiveLogs:
+    def test_moves_old_done_logs(self, db):
+        task = _done_task_with_log(db)
+        _age_log(db, task["id"])
+        assert archive_logs(db, older_than_days=30) == 2
+        assert get_log(db, task["id"]) == []
+        assert archive_path(db).is_file()
+
+    def test_keeps_recent_logs(self, db):
+        task = _done_task_with_log(db)
+        assert archive_logs(db, older_than_days=30) == 0
+        assert len(get_log(db, task["id"])) == 2
+
+    def test_keeps_logs_of_unfinished_tasks(self, db):
+        task = create_task(db, "Active")
+        add_comment(db, task["id"], "dev", "wip")
+        _age_log(db, task["id"])
+        assert archive_logs(db, older_than_days=30) == 0
+        assert len(get_log(db, task["id"])) == 1
+
+    def test_no_archive_created_when_nothing_to_move(self, db):
+        archive_logs(db)
+        assert open_archive(db) is None
+
+    def test_idempotent_copy(self, db):
+        task = _done_task_with_log(db)
+        _age_log(db, task["id"])
+        archive_logs(db, older_than_days=30)
+        archive_logs(db, older_than_days=30)
+        archive = open_archive(db)
+        try:
+            count = archive.execute("SELECT COUNT(*) FROM log").fetchone()[0]
+        finally:
+            archive.close()
+        assert count == 2
+
+
+class TestGetLogArchived:
+    def test_include_archived(self, db):
+        task = _done_task_with_log(db)
+        _age_log(db, task["id"])
+        archive_logs(db, older_than_days=30)
+        add_comment(db, task["id"], "dev", "three")
+        entries = get_log(db, task["id"], include_archived=True)
+        assert [e["message"] for e in entries] == ["one", "two", "three"]
+
+    def test_include_archived_filters_type(self, db):
+        task = _done_task_with_log(db)
+        _age_log(db, task["id"])
+        archive_logs(db, older_than_days=30)
+        assert get_log(db, task["id"], type="transition", include_archived=True) == []
+        assert len(get_log(db, task["id"], type="comment", include_archived=True)) == 2
+
+    def test_without_archive_file(self, db):
+        task = _done_task_with_log(db)
+        assert len(get_log(db, task["id"], include_archived=True)) == 2
+
+
+def _age_task(db, task_id, days=30):
+    db.execute(
+        "UPDATE tasks SET updated_at = updated_at - ? WHERE id = ?",
+        (days * 86_400_000, task_id),
+    )
+
+
+class TestArchiveTasks:
+    def test_moves_old_done_task_with_log(self, db):
+        dep = create_task(db, "Dep")
+        update_task(db, dep["id"], stage="done")
+        task = _done_task_with_log(db)
+        db.execute("INSERT INTO dependencies VALUES (?, ?)", (task["id"], dep["id"]))
+        _age_task(db, dep["id"])
+        _age_task(db, task["id"])
+        assert archive_tasks(db) == 2
+        assert db.execute("SELECT COUNT(*) FROM tasks").fetchone()[0] == 0
+        assert db.execute("SELECT COUNT(*) FROM log").fetchone()[0] == 0
+
+        archived = get_task(db, task["id"])
+        assert archived["stage"] == "done"
+        assert archived["dependencies"] == [dep["id"]]
+        assert archived["archived_at"] is not None
+        assert get_task(db, task["id"], include_archived=False) is None
+        assert [e["message"] for e in get_log(db, task["id"], include_archived=True)] == [
+            "one", "two",
+        ]
+
+    def test_keeps_recent_and_unfinished(self, db):
+        recent = _done_task_with_log(db)
+        open_task = create_task(db, "Open")
+        _age_task(db, open_task["id"])
+        assert archive_tasks(db) == 0
+        assert get_task(db, recent["id"], include_archived=False) is not None
+        assert open_archive(db) is None
+
+    def test_keeps_dependency_chain_of_live_task(self, db):
+        a = create_task(db, "A")
+        b = create_task(db, "B", deps=[a["id"]])
+        create_task(db, "C", deps=[b["id"]])
+        for t in (a, b):
+            update_task(db, t["id"], stage="done")
+            _age_task(db, t["id"])
+        assert archive_tasks(db) == 0
+        assert len(list_tasks(db)) == 3
+
+    def test_list_include_archived(self, db):
+        old = _done_task_with_log(db, title="Old")
+        _age_task(db, old["id"])
+        live = create_task(db, "Live", tags=["bug"])
+        archive_tasks(db)
+        assert [t["id"] for t in list_tasks(db)] == [live["id"]]
+        listed = list_tasks(db, include_archived=True)
+        assert [t["id"] for t in listed] == [live["id"], old["id"]]
+        assert list_tasks(db, stage="done", include_archived=True, fields=["id"]) == [
+            {"id": old["id"]},
+        ]
+        assert list_tasks(db, tag="bug", include_archived=True) == listed[:1]
+        assert len(list_tasks(db, include_archived=True, limit=1)) == 1
+
+    def test_writers_refuse_archived_task(self, db):
+        task = _done_task_with_log(db)
+        _age_task(db, task["id"])
+        archive_tasks(db)
+        with pytest.raises(ValueError, match="archived"):
+            add_comment(db, task["id"], "user", "late")
+        with pytest.raises(ValueError, match="already done and archived"):
+            create_task(db, "Next", deps=[task["id"]])
+        with pytest.raises(ValueError, match="Unknown dependency"):
+            create_task(db, "Next", deps=["TST-404"])
+
+    def test_gc_reports_tasks(self, db):
+        task = _done_task_with_log(db)
+        _age_task(db, task["id"])
+        assert gc(db)["tasks_archived"] == 1
+
+
+class TestGc:
+    def test_prune_changes_keeps_revision(self, db):
+        create_task(db, "A")
+        rev = current_revision(db)
+        db.execute("UPDATE changes SET changed_at = changed_at - 2 * 86400000")
+        assert prune_changes(db) > 0
+        assert current_revision(db) == rev
+
+    def test_report(self, db):
+        task = _done_task_with_log(db, messages=["x" * 2000] * 200)
+        _age_log(db, task["id"])
+        report = gc(db, older_than_days=30)
+        assert report["archived"] == 200
+        assert report["reclaimed_bytes"] > 0
+        assert db.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        assert not report["needs_full_vacuum"]
+
+    def test_full_vacuum_only_when_asked(self, db):
+        db.commit()
+        db.execute("PRAGMA auto_vacuum=NONE")
+        db.execute("VACUUM")
+        task = _done_task_with_log(db, messages=["x" * 2000] * 200)
+        _age_log(db, task["id"])
+        report = gc(db, older_than_days=30)
+        assert report["needs_full_vacuum"]
+        assert report["reclaimed_bytes"] == 0
+        assert db.execute("PRAGMA auto_vacuum").fetchone()[0] == 0
+        report = gc(db, full=True)
+        assert not report["needs_full_vacuum"]
+        assert report["reclaimed_bytes"] > 0
+
+
+class TestArchiveUpgrade:
+    def test_converts_text_timestamps(self, db):
+        import sqlite3
+        path = archive_path(db)
+        old = sqlite3.connect(str(path))
+        old.execute(
+            "CREATE TABLE log (id INTEGER PRIMARY KEY, task_id TEXT, timestamp TEXT, "
+            "type TEXT, author TEXT, message TEXT, archived_at TEXT DEFAULT (datetime('now')))"
+        )
+        old.execute(
+            "INSERT INTO log VALUES (1, 'T-1', '2026-01-01 00:00:00', 'comment', 'dev', 'x', "
+            "'2026-02-01 00:00:00')"
+        )
+        old.commit()
+        old.close()
+
+        archive = open_archive(db)
+        try:
+            row = archive.execute("SELECT timestamp, archived_at FROM log").fetchone()
+            assert tuple(row) == (1767225600000, 1769904000000)
+            assert archive.execute("PRAGMA user_version").fetchone()[0] == ARCHIVE_VERSION
+            assert archive.execute("SELECT COUNT(*) FROM tasks").fetchone()[0] == 0
+        finally:
+            archive.close()
+
+    def test_adds_tasks_table_to_version_1(self, db):
+        import sqlite3
+        path = archive_path(db)
+        old = sqlite3.connect(str(path))
+        old.execute(
+            "CREATE TABLE log (id INTEGER PRIMARY KEY, task_id TEXT, timestamp INTEGER, "
+            "type TEXT, author TEXT, message TEXT, archived_at INTEGER)"
+        )
+        old.execute("INSERT INTO log VALUES (1, 'T-1', 5, 'comment', 'dev', 'x', 6)")
+        old.execute("PRAGMA user_version = 1")
+        old.commit()
+        old.close()
+
+        archive = open_archive(db)
+        try:
+            assert tuple(archive.execute("SELECT timestamp, archived_at FROM log").fetchone()) == (5, 6)
+            assert archive.execute("SELECT COUNT(*) FROM tasks").fetchone()[0] == 0
+        finally:
+            archive.close()
@@ -0,0 +1,110 @@
+"""Tests for the takt change feed."""
+
+import pytest
+
+from debussy.takt.archive import prune_changes
+from debussy.takt.changes import (
+    ChangesPruned, changed_task_ids, changes_since, current_revision, pruned_revision,
+)
+from debussy.takt.db import get_db
+from debussy.takt.log import add_comment, claim_task
+from debussy.takt.models import create_task, update_task
+
+
+@pytest.fixture
+def db(tmp_path):
+    with get_db(tmp_path) as conn:
+        yield conn
+
+
+class TestRevision:
+    def test_starts_at_zero(self, db):
+        assert current_revision(db) == 0
+
+    def test_bumped_by_task_writes(self, db):
+        task = create_task(db, "A")
+        after_create = current_revision(db)
+        assert after_create > 0
+        update_task(db, task["id"], title="B")
+        assert current_revision(db) > after_create
+
+    def test_unchanged_by_reads(self, db):
+        create_task(db, "A")
+        rev = current_revision(db)
+        db.execute("SELECT * FROM tasks").fetchall()
+        assert current_revision(db) == rev
+
+
+class TestChangesSince:
+    def test_records_task_dependency_and_log(self, db):
+        t1 = create_task(db, "A")
+        rev = current_revision(db)
+        t2 = create_task(db, "B", deps=[t1["id"]])
+        add_comment(db, t2["id"], "dev", "hello")
+        kinds = [(c["task_id"], c["kind"], c["op"]) for c in changes_since(db, rev)]
+        assert kinds == [
+            (t2["id"], "task", "insert"),
+            (t2["id"], "dependency", "insert"),
+            (t2["id"], "log", "insert"),
+        ]
+
+    def test_log_change_references_row(self, db):
+        task = create_task(db, "A")
+        rev = current_revision(db)
+        add_comment(db, task["id"], "dev", "hello")
+        log_id = db.execute("SELECT id FROM log").fetchone()[0]
+        assert changes_since(db, rev)[0]["row_id"] == log_id
+
+    def test_empty_when_idle(self, db):
+        create_task(db, "A")
+        assert changes_since(db, current_revision(db)) == []
+
+    def test_limit(self, db):
+        for i in range(5):
+            create_task(db, f"T{i}")
+        assert len(changes_since(db, 0, limit=2)) == 2
+
+
+class TestChangedTaskIds:
+    def test_returns_cursor_and_ids(self, db):
+        t1 = create_task(db, "A")
+        t2 = create_task(db, "B")
+        rev = current_revision(db)
+        claim_task(db, t1["id"], "dev")
+        new_rev, ids = changed_task_ids(db, rev)
+        assert ids == {t1["id"]}
+        assert new_rev == current_revision(db)
+        assert t2["id"] not in ids
+
+    def test_idle_keeps_cursor(self, db):
+        create_task(db, "A")
+        rev = current_revision(db)
+        assert changed_task_ids(db, rev) == (rev, set())
+
+
+class TestPruned:
+    def _prune(self, db):
+        create_task(db, "A")
+        create_task(db, "B")
+        db.execute("UPDATE changes SET changed_at = changed_at - 2 * 86400000")
+        rev = current_revision(db)
+        assert prune_changes(db) == 2
+        return rev
+
+    def test_low_water_mark_recorded(self, db):
+        assert pruned_revision(db) == 0
+        rev = self._prune(db)
+        assert pruned_revision(db) == rev
+
+    def test_old_revision_raises(self, db):
+        rev = self._prune(db)
+        with pytest.raises(ChangesPruned) as exc:
+            changes_since(db, rev - 1)
+        assert exc.value.pruned_rev == rev
+        with pytest.raises(ChangesPruned):
+            changed_task_ids(db, 0)
+
+    def test_revision_at_mark_is_complete(self, db):
+        rev = self._prune(db)
+        task = create_task(db, "C")
+        assert [c["task_id"] for c in changes_since(db, rev)] == [task["id"]]
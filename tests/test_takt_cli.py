@@ -1,11 +1,13 @@
 """Tests for takt CLI."""
 
+import io
 import json
 import os
+import re
 
 import pytest
 
-from debussy.takt.cli import main
+from debussy.takt.cli import EXIT_RESYNC, main
 from debussy.takt.db import init_db
 
 
@@ -96,6 +98,7 @@ class TestShow:
         data = json.loads(capsys.readouterr().out)
         assert data["id"] == task_id
         assert data["title"] == "Test task"
+        assert re.fullmatch(r"\d{4}-\d\d-\d\d \d\d:\d\d:\d\d", data["created_at"])
 
     def test_not_found(self, project_dir):
         assert main(["show", "XXX-999"]) == 1
@@ -133,6 +136,24 @@ class TestList:
         data = json.loads(capsys.readouterr().out)
         assert len(data) == 1
 
+    def test_ndjson_page_with_fields(self, project_dir, capsys):
+        ids = []
+        for title in ("A", "B", "C"):
+            main(["create", title])
+            ids.append(capsys.readouterr().out.strip())
+        assert main(["list", "--ndjson", "--fields", "id,title,created_at",
+                     "--after", ids[0], "--limit", "1"]) == 0
+        lines = capsys.readouterr().out.splitlines()
+        assert len(lines) == 1
+        row = json.loads(lines[0])
+        assert row.keys() == {"id", "title", "created_at"}
+        assert row["id"] == ids[1]
+        assert re.match(r"\d{4}-\d{2}-\d{2} ", row["created_at"])
+
+    def test_fields_requires_json(self, project_dir, capsys):
+        assert main(["list", "--fields", "id"]) == 1
+        assert "--json" in capsys.readouterr().err
+
     def test_filter_project(self, project_dir, capsys):
         main(["create", "Default task"])
         capsys.readouterr()
@@ -181,6 +202,14 @@ class TestWorkflow:
         assert main(["block", task_id]) == 0
         assert "blocked" in capsys.readouterr().out
 
+    def test_claim_conflict_exit_code(self, project_dir, capsys):
+        main(["create", "Task"])
+        task_id = capsys.readouterr().out.strip()
+        assert main(["claim", task_id, "--agent", "dev-1", "--expect-status", "pending"]) == 0
+        capsys.readouterr()
+        assert main(["claim", task_id, "--agent", "dev-2", "--expect-status", "pending"]) == 3
+        assert "Conflict" in capsys.readouterr().err
+
 
 class TestUpdate:
     def test_update_description(self, project_dir, capsys):
@@ -255,6 +284,42 @@ class TestLog:
         assert main(["log", task_id]) == 0
         assert "No log" in capsys.readouterr().out
 
+    def test_since_id_all_tasks(self, project_dir, capsys):
+        ids = []
+        for title in ("A", "B"):
+            main(["create", title])
+            ids.append(capsys.readouterr().out.strip())
+        main(["comment", ids[0], "first"])
+        main(["comment", ids[1], "second"])
+        capsys.readouterr()
+        assert main(["log", "--all", "--since-id", "1"]) == 0
+        out = capsys.readouterr().out
+        assert "first" not in out
+        assert f"{ids[1]} (comment)" in out
+
+    def test_all_tasks(self, project_dir, capsys):
+        ids = []
+        for title in ("A", "B"):
+            main(["create", title])
+            ids.append(capsys.readouterr().out.strip())
+        main(["comment", ids[0], "first"])
+        main(["comment", ids[1], "second"])
+        capsys.readouterr()
+        assert main(["log", "--all", "--type", "comment"]) == 0
+        out = capsys.readouterr().out
+        assert f"{ids[0]} (comment)" in out
+        assert f"{ids[1]} (comment)" in out
+        assert "No log" not in out
+
+    def test_requires_id_or_all(self, project_dir, capsys):
+        assert main(["log"]) == 1
+        assert "--all" in capsys.readouterr().err
+
+    def test_follow_stays_local(self, project_dir):
+        from debussy.takt.client import forward
+        (project_dir / ".takt" / "takt.sock").touch()
+        assert forward(["log", "X-1", "--follow"], project_dir) is None
+
 
 class TestProject:
     def test_add(self, project_dir, capsys):
@@ -310,6 +375,23 @@ class TestProject:
         capsys.readouterr()
         assert main(["project", "rm", "FIX"]) == 1
 
+    def test_rm_and_readd_keep_archived_ids(self, project_dir, capsys):
+        from debussy.takt.db import get_db
+        main(["project", "add", "FIX", "Hotfixes"])
+        main(["create", "A task", "-p", "FIX"])
+        main(["advance", "FIX-1", "--to", "done"])
+        with get_db(project_dir) as db:
+            db.execute("UPDATE tasks SET updated_at = updated_at - 30 * 86400000")
+        main(["gc"])
+        capsys.readouterr()
+        assert main(["project", "rm", "FIX"]) == 1
+        with get_db(project_dir) as db:
+            db.execute("DELETE FROM projects WHERE prefix = 'FIX'")
+        main(["project", "add", "FIX", "Hotfixes"])
+        capsys.readouterr()
+        main(["create", "Another", "-p", "FIX"])
+        assert capsys.readouterr().out.strip() == "FIX-2"
+
     def test_rm_default_fails(self, project_dir, capsys):
         main(["project", "default"])
         prefix = capsys.readouterr().out.strip()
@@ -337,3 +419,130 @@ class TestPrefixDeprecated:
 class TestNoCommand:
     def test_no_args(self, project_dir):
         assert main([]) == 1
+
+
+class TestHistory:
+    def test_history_json(self, project_dir, capsys):
+        main(["create", "Task"])
+        task_id = capsys.readouterr().out.strip()
+        main(["advance", task_id])
+        capsys.readouterr()
+        assert main(["history", task_id, "--json"]) == 0
+        visits = json.loads(capsys.readouterr().out)
+        assert [v["stage"] for v in visits] == ["backlog", "development"]
+
+    def test_stats_text(self, project_dir, capsys):
+        main(["create", "Task"])
+        task_id = capsys.readouterr().out.strip()
+        main(["advance", task_id])
+        capsys.readouterr()
+        assert main(["stats"]) == 0
+        assert "backlog" in capsys.readouterr().out
+
+
+class TestChanges:
+    def test_json_since(self, project_dir, capsys):
+        main(["changes", "--json"])
+        rev = json.loads(capsys.readouterr().out)["revision"]
+        main(["create", "Task"])
+        task_id = capsys.readouterr().out.strip()
+        assert main(["changes", "--since", str(rev), "--json"]) == 0
+        data = json.loads(capsys.readouterr().out)
+        assert data["revision"] > rev
+        assert [c["task_id"] for c in data["changes"]] == [task_id]
+
+    def test_text_output(self, project_dir, capsys):
+        main(["create", "Task"])
+        task_id = capsys.readouterr().out.strip()
+        assert main(["changes"]) == 0
+        out = capsys.readouterr().out
+        assert f"{task_id}  task insert" in out
+        assert "revision:" in out
+
+    def test_pruned_range_asks_for_resync(self, project_dir, capsys):
+        from debussy.takt.archive import prune_changes
+        from debussy.takt.db import get_db
+        main(["create", "Task"])
+        with get_db(project_dir) as db:
+            db.execute("UPDATE changes SET changed_at = changed_at - 2 * 86400000")
+            prune_changes(db)
+        capsys.readouterr()
+        assert main(["changes", "--since", "0"]) == EXIT_RESYNC
+        assert "resync" in capsys.readouterr().err
+
+
+class TestGc:
+    def test_reports_and_archives(self, project_dir, capsys):
+        from debussy.takt.db import get_db
+        main(["create", "Task"])
+        task_id = capsys.readouterr().out.strip()
+        main(["comment", task_id, "old note"])
+        with get_db(project_dir) as db:
+            db.execute("UPDATE tasks SET stage = 'done'")
+            db.execute("UPDATE log SET timestamp = timestamp - 90 * 86400000")
+        capsys.readouterr()
+        assert main(["gc", "--older-than", "30"]) == 0
+        out = capsys.readouterr().out
+        assert "Archived 1 log entries" in out
+        assert "Reclaimed" in out
+        main(["log", task_id])
+        assert "No log entries." in capsys.readouterr().out
+        main(["log", task_id, "--archived"])
+        assert "old note" in capsys.readouterr().out
+
+
+class TestSearch:
+    def test_text_output(self, project_dir, capsys):
+        main(["create", "Rotate API keys", "-d", "Use the vault"])
+        task_id = capsys.readouterr().out.strip()
+        assert main(["search", "vault"]) == 0
+        out = capsys.readouterr().out
+        assert task_id in out
+        assert "[vault]" in out
+
+    def test_json_output(self, project_dir, capsys):
+        main(["create", "Rotate API keys"])
+        task_id = capsys.readouterr().out.strip()
+        main(["search", "rotate", "--json"])
+        data = json.loads(capsys.readouterr().out)
+        assert data[0]["task_id"] == task_id
+
+    def test_no_matches(self, project_dir, capsys):
+        assert main(["search", "nothing"]) == 0
+        assert "No matches." in capsys.readouterr().out
+
+
+class TestImport:
+    def test_jsonl_from_stdin(self, project_dir, capsys, monkeypatch):
+        lines = [
+            {"key": "a", "title": "Task A", "tags": "backend,bug"},
+            {"key": "b", "title": "Task B", "deps": ["a"]},
+        ]
+        monkeypatch.setattr("sys.stdin", io.StringIO("\n".join(json.dumps(l) for l in lines)))
+        assert main(["import"]) == 0
+        a_id, b_id = capsys.readouterr().out.split()
+        main(["show", b_id, "--json"])
+        data = json.loads(capsys.readouterr().out)
+        assert data["dependencies"] == [a_id]
+        main(["show", a_id, "--json"])
+        assert json.loads(capsys.readouterr().out)["tags"] == ["backend", "bug"]
+
+    def test_json_array_file(self, project_dir, capsys):
+        path = project_dir / "plan.json"
+        path.write_text(json.dumps([{"title": "One"}, {"title": "Two"}]))
+        assert main(["import", str(path), "--json"]) == 0
+        data = json.loads(capsys.readouterr().out)
+        assert [t["title"] for t in data] == ["One", "Two"]
+
+    def test_failure_creates_nothing(self, project_dir, capsys, monkeypatch):
+        bad = json.dumps([{"title": "Fine"}, {"title": "Bad", "deps": ["missing"]}])
+        monkeypatch.setattr("sys.stdin", io.StringIO(bad))
+        assert main(["import"]) == 1
+        assert "Unknown dependency" in capsys.readouterr().err
+        main(["list", "--json"])
+        assert json.loads(capsys.readouterr().out) == []
+
+    def test_invalid_jsonl_line(self, project_dir, capsys, monkeypatch):
+        monkeypatch.setattr("sys.stdin", io.StringIO('{"title": "A"}\nnot json\n'))
+        assert main(["import"]) == 1
+        assert "line 2" in capsys.readouterr().err
@@ -5,6 +5,7 @@ import threading
 
 import pytest
 
+from debussy.takt import db as db_mod
 from debussy.takt.db import get_db, get_prefix, init_db, SCHEMA_VERSION
 
 
@@ -172,6 +173,113 @@ class TestConcurrency:
         assert all(r == "test" for r in results)
 
 
+class TestConnectionCache:
+    def test_reuses_connection_on_same_thread(self, db_dir):
+        with get_db(db_dir) as conn1:
+            pass
+        with get_db(db_dir) as conn2:
+            pass
+        assert conn1 is conn2
+
+    def test_separate_connection_per_thread(self, db_dir):
+        with get_db(db_dir) as main_conn:
+            pass
+        seen = []
+
+        def worker():
+            with get_db(db_dir) as conn:
+                seen.append(conn)
+
+        t = threading.Thread(target=worker)
+        t.start()
+        t.join(timeout=10)
+        assert seen and seen[0] is not main_conn
+
+    def test_skips_schema_when_version_current(self, db_dir, monkeypatch):
+        with get_db(db_dir):
+            pass
+        db_mod.clear_connection_cache()
+        calls = []
+        monkeypatch.setattr(db_mod, "_apply_schema", calls.append)
+        with get_db(db_dir):
+            pass
+        assert calls == []
+
+    def test_recreated_after_file_removed(self, db_dir):
+        import shutil
+        with get_db(db_dir) as conn:
+            conn.execute("INSERT INTO tasks (id, seq, title) VALUES ('t1', 1, 'test')")
+        shutil.rmtree(db_dir / ".takt")
+        with get_db(db_dir) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0] == 0
+            assert get_prefix(conn)
+
+    def test_rollback_on_error(self, db_dir):
+        with pytest.raises(RuntimeError):
+            with get_db(db_dir) as conn:
+                conn.execute("INSERT INTO tasks (id, seq, title) VALUES ('t1', 1, 'test')")
+                raise RuntimeError("boom")
+        with get_db(db_dir) as conn:
+            assert conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0] == 0
+
+    def test_nested_error_rolls_back_inner_only(self, db_dir):
+        with get_db(db_dir) as outer:
+            outer.execute("INSERT INTO tasks (id, seq, title) VALUES ('t1', 1, 'outer')")
+            with pytest.raises(RuntimeError):
+                with get_db(db_dir) as inner:
+                    assert inner is outer
+                    inner.execute("INSERT INTO tasks (id, seq, title) VALUES ('t2', 2, 'inner')")
+                    raise RuntimeError("boom")
+        with get_db(db_dir) as conn:
+            ids = [r[0] for r in conn.execute("SELECT id FROM tasks").fetchall()]
+            assert ids == ["t1"]
+
+
+class TestPerfProfile:
+    def test_default_keeps_sqlite_settings(self, db_dir, monkeypatch):
+        monkeypatch.delenv(db_mod.PERF_PROFILE_ENV, raising=False)
+        with get_db(db_dir) as conn:
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 2  # FULL
+
+    def test_profile_from_debussy_config(self, db_dir, monkeypatch):
+        monkeypatch.delenv(db_mod.PERF_PROFILE_ENV, raising=False)
+        (db_dir / ".debussy").mkdir()
+        (db_dir / ".debussy" / "config.json").write_text('{"sqlite_profile": "balanced"}')
+        with get_db(db_dir) as conn:
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+            assert conn.execute("PRAGMA cache_size").fetchone()[0] == -16_000
+            assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+
+    def test_env_overrides_config(self, db_dir, monkeypatch):
+        monkeypatch.setenv(db_mod.PERF_PROFILE_ENV, "throughput")
+        with get_db(db_dir) as conn:
+            assert conn.execute("PRAGMA wal_autocheckpoint").fetchone()[0] == 4000
+
+    def test_unknown_profile_falls_back(self, db_dir, monkeypatch):
+        monkeypatch.setenv(db_mod.PERF_PROFILE_ENV, "warp")
+        with get_db(db_dir) as conn:
+            assert conn.execute("PRAGMA synchronous").fetchone()[0] == 2
+
+
+class TestCheckpoint:
+    def test_truncate_empties_wal(self, db_dir):
+        with get_db(db_dir) as conn:
+            conn.execute("INSERT INTO metadata VALUES ('k', 'v')")
+        assert db_mod.wal_size(db_dir) > 0
+        with get_db(db_dir) as conn:
+            busy, _, _ = db_mod.checkpoint(conn, "TRUNCATE")
+        assert busy == 0
+        assert db_mod.wal_size(db_dir) == 0
+
+    def test_rejects_unknown_mode(self, db_dir):
+        with get_db(db_dir) as conn:
+            with pytest.raises(ValueError):
+                db_mod.checkpoint(conn, "NOW")
+
+    def test_wal_size_without_database(self, tmp_path):
+        assert db_mod.wal_size(tmp_path) == 0
+
+
 class TestMigrationV2ToV3:
     def test_migrates_prefix_to_projects(self, db_dir):
         """A v2 database with prefix in metadata gets migrated to projects table."""
@@ -292,6 +400,139 @@ class TestMigrationV4ToV5:
             conn.execute("INSERT INTO dependencies VALUES ('T-3', 'T-1')")
 
 
+class TestMigrationV6ToV7:
+    def test_backfills_task_tags(self, db_dir):
+        with get_db(db_dir) as conn:
+            conn.execute(
+                "INSERT INTO tasks (id, seq, title, tags) VALUES ('T-1', 1, 'A', '[\"bug\",\"ui\"]')"
+            )
+            conn.execute("DROP TABLE task_tags")
+            conn.execute("PRAGMA user_version = 6")
+        db_mod.clear_connection_cache()
+
+        with get_db(db_dir) as conn:
+            rows = conn.execute(
+                "SELECT tag FROM task_tags WHERE task_id = 'T-1' ORDER BY position"
+            ).fetchall()
+            assert [r["tag"] for r in rows] == ["bug", "ui"]
+
+
+class TestMigrationV7ToV8:
+    def test_backfills_search_index(self, db_dir):
+        with get_db(db_dir) as conn:
+            conn.execute("INSERT INTO tasks (id, seq, title) VALUES ('T-1', 1, 'Quartz clock')")
+            conn.execute(
+                "INSERT INTO log (task_id, type, author, message) "
+                "VALUES ('T-1', 'comment', 'dev', 'needs a new battery')"
+            )
+            conn.execute("DROP TABLE search_index")
+            conn.execute("PRAGMA user_version = 7")
+        db_mod.clear_connection_cache()
+
+        with get_db(db_dir) as conn:
+            hits = conn.execute(
+                "SELECT kind FROM search_index WHERE search_index MATCH 'quartz OR battery' "
+                "ORDER BY kind"
+            ).fetchall()
+            assert [h["kind"] for h in hits] == ["comment", "task"]
+
+
+class TestMigrationV8ToV9:
+    def test_backfills_unresolved_count(self, db_dir):
+        with get_db(db_dir) as conn:
+            conn.execute("INSERT INTO tasks (id, seq, title) VALUES ('T-1', 1, 'A')")
+            conn.execute("INSERT INTO tasks (id, seq, title, stage) VALUES ('T-2', 2, 'B', 'done')")
+            conn.execute("INSERT INTO tasks (id, seq, title) VALUES ('T-3', 3, 'C')")
+            conn.execute("INSERT INTO dependencies VALUES ('T-3', 'T-1')")
+            conn.execute("INSERT INTO dependencies VALUES ('T-3', 'T-2')")
+            conn.execute("UPDATE tasks SET unresolved_count = 0")
+            conn.execute("PRAGMA user_version = 8")
+        db_mod.clear_connection_cache()
+
+        with get_db(db_dir) as conn:
+            row = conn.execute("SELECT unresolved_count FROM tasks WHERE id = 'T-3'").fetchone()
+            assert row[0] == 1
+
+
+class TestMigrationV9ToV10:
+    def test_backfills_open_stage_visits(self, db_dir):
+        with get_db(db_dir) as conn:
+            conn.execute(
+                "INSERT INTO tasks (id, seq, title, stage, created_at) "
+                "VALUES ('T-1', 1, 'A', 'reviewing', '2026-01-01 00:00:00')"
+            )
+            conn.execute(
+                "INSERT INTO log (task_id, timestamp, type, author, message) VALUES "
+                "('T-1', '2026-01-02 00:00:00', 'transition', 'system', 'development -> reviewing')"
+            )
+            conn.execute("DROP TABLE stage_history")
+            conn.execute("PRAGMA user_version = 9")
+        db_mod.clear_connection_cache()
+
+        with get_db(db_dir) as conn:
+            rows = conn.execute("SELECT stage, entered_at, exited_at FROM stage_history").fetchall()
+            # Converted to epoch ms by the v11 migration that follows.
+            assert [tuple(r) for r in rows] == [("reviewing", 1767312000000, None)]
+
+
+class TestMigrationV10ToV11:
+    def test_converts_text_timestamps_to_epoch_ms(self, db_dir):
+        with get_db(db_dir) as conn:
+            conn.execute(
+                "INSERT INTO tasks (id, seq, title, created_at, updated_at) "
+                "VALUES ('T-1', 1, 'Quartz clock', '2026-01-01 00:00:00', '2026-01-01 00:00:01')"
+            )
+            conn.execute(
+                "INSERT INTO log (id, task_id, timestamp, type, author, message) "
+                "VALUES (7, 'T-1', '2026-01-01 00:00:02', 'comment', 'dev', 'hi')"
+            )
+            conn.execute("UPDATE sqlite_sequence SET seq = 40 WHERE name = 'log'")
+            conn.execute("DELETE FROM stage_history")
+            conn.execute(
+                "INSERT INTO stage_history (task_id, stage, entered_at, exited_at, duration_s) "
+                "VALUES ('T-1', 'backlog', '2026-01-01 00:00:00', '2026-01-01 00:01:00', 60)"
+            )
+            conn.execute("DELETE FROM changes")
+            conn.execute(
+                "INSERT INTO changes (rev, task_id, kind, op, changed_at) "
+                "VALUES (90, 'T-1', 'task', 'insert', '2026-01-01 00:00:03')"
+            )
+            conn.execute("PRAGMA user_version = 10")
+        db_mod.clear_connection_cache()
+
+        with get_db(db_dir) as conn:
+            task = conn.execute("SELECT created_at, updated_at FROM tasks").fetchone()
+            assert tuple(task) == (1767225600000, 1767225601000)
+            entry = conn.execute("SELECT id, timestamp FROM log").fetchone()
+            assert tuple(entry) == (7, 1767225602000)
+            seq = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'log'").fetchone()
+            assert seq[0] == 40
+            visit = conn.execute("SELECT entered_at, exited_at FROM stage_history").fetchone()
+            assert tuple(visit) == (1767225600000, 1767225660000)
+            change = conn.execute("SELECT rev, changed_at FROM changes").fetchone()
+            assert tuple(change) == (90, 1767225603000)
+            hits = conn.execute(
+                "SELECT task_id FROM search_index WHERE search_index MATCH 'quartz'"
+            ).fetchall()
+            assert [h[0] for h in hits] == ["T-1"]
+            # Triggers were recreated against the rebuilt tables.
+            conn.execute("UPDATE tasks SET stage = 'development' WHERE id = 'T-1'")
+            stages = conn.execute(
+                "SELECT stage FROM stage_history WHERE task_id = 'T-1' ORDER BY id"
+            ).fetchall()
+            assert [r[0] for r in stages][-1] == "development"
+
+    def test_ordering_indexes(self, db_dir):
+        with get_db(db_dir) as conn:
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM tasks WHERE stage = 'a' AND status = 'b' "
+                "ORDER BY created_at, rowid"
+            ).fetchall()
+            assert [r["detail"] for r in plan] == [
+                "SEARCH tasks USING INDEX idx_tasks_stage_status (stage=? AND status=?)"
+            ]
+
+
 class TestGetPrefix:
     def test_returns_default_project_prefix(self, db_dir):
         with get_db(db_dir) as conn:
@@ -0,0 +1,80 @@
+"""Tests for takt stage history."""
+
+import pytest
+
+from debussy.takt.db import get_db
+from debussy.takt.history import get_stage_history, stage_stats
+from debussy.takt.log import advance_task, claim_task, reject_task
+from debussy.takt.models import create_task
+
+
+@pytest.fixture
+def db(tmp_path):
+    with get_db(tmp_path) as conn:
+        yield conn
+
+
+class TestStageHistory:
+    def test_create_opens_visit(self, db):
+        task = create_task(db, "A")
+        [visit] = get_stage_history(db, task["id"])
+        assert visit["stage"] == "backlog"
+        assert visit["exited_at"] is None
+
+    def test_advance_closes_visit(self, db):
+        task = create_task(db, "A")
+        advance_task(db, task["id"])
+        first, second = get_stage_history(db, task["id"])
+        assert first["outcome"] == "advanced"
+        assert first["next_stage"] == "development"
+        assert first["exited_at"] is not None
+        assert first["duration_s"] >= 0
+        assert second["stage"] == "development"
+        assert second["exited_at"] is None
+
+    def test_reject_outcome(self, db):
+        task = create_task(db, "A")
+        advance_task(db, task["id"])
+        advance_task(db, task["id"])
+        reject_task(db, task["id"])
+        visits = get_stage_history(db, task["id"])
+        assert [v["stage"] for v in visits] == ["backlog", "development", "reviewing", "development"]
+        assert visits[2]["outcome"] == "rejected"
+
+    def test_claim_records_agent(self, db):
+        task = create_task(db, "A")
+        advance_task(db, task["id"])
+        claim_task(db, task["id"], "dev-1")
+        visits = get_stage_history(db, task["id"])
+        assert visits[0]["agent"] is None
+        assert visits[1]["agent"] == "dev-1"
+
+    def test_status_change_is_not_a_visit(self, db):
+        task = create_task(db, "A")
+        claim_task(db, task["id"], "dev-1")
+        assert len(get_stage_history(db, task["id"])) == 1
+
+
+class TestStageStats:
+    def test_counts_completed_visits(self, db):
+        for title in ("A", "B"):
+            task = create_task(db, title)
+            advance_task(db, task["id"])
+        stats = stage_stats(db)
+        assert set(stats) == {"backlog"}
+        assert stats["backlog"]["visits"] == 2
+        assert stats["backlog"]["rejected"] == 0
+
+    def test_since_filter(self, db):
+        task = create_task(db, "A")
+        advance_task(db, task["id"])
+        db.execute("UPDATE stage_history SET exited_at = exited_at - 3 * 3600000 "
+                   "WHERE exited_at IS NOT NULL")
+        assert stage_stats(db, since_hours=1) == {}
+        assert stage_stats(db, since_hours=5)["backlog"]["visits"] == 1
+
+    def test_range_query_uses_index(self, db):
+        plan = db.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM stage_history WHERE exited_at >= ?", (0,)
+        ).fetchall()
+        assert any("idx_stage_history_exited" in r["detail"] for r in plan)
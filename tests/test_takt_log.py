@@ -1,5 +1,9 @@
 """Tests for takt log and workflow operations."""
 
+import threading
+import time
+from itertools import islice
+
 import pytest
 
 from debussy.takt.db import get_db
@@ -7,13 +11,16 @@ from debussy.takt.models import create_task, get_task, update_task
 from debussy.takt.log import (
     add_comment,
     add_log,
+    follow_log,
     get_log,
+    get_log_since,
     advance_task,
     reject_task,
     claim_task,
     release_task,
     block_task,
     get_unresolved_deps,
+    TransitionConflict,
 )
 
 
@@ -65,6 +72,44 @@ class TestLogOperations:
         assert entries[1]["message"] == "second"
 
 
+class TestFollowLog:
+    def test_get_log_since(self, db):
+        a, b = _make_task(db, "A"), _make_task(db, "B")
+        add_comment(db, a["id"], "dev", "one")
+        add_comment(db, b["id"], "dev", "two")
+        add_comment(db, a["id"], "dev", "three")
+        first = get_log_since(db, 0)[0]["id"]
+        assert [e["message"] for e in get_log_since(db, first)] == ["two", "three"]
+        assert [e["message"] for e in get_log_since(db, 0, task_id=a["id"])] == ["one", "three"]
+        assert [e["message"] for e in get_log_since(db, 0, limit=1)] == ["one"]
+
+    def test_follow_drains_in_batches(self, db, tmp_path, monkeypatch):
+        monkeypatch.setattr("debussy.takt.log.FOLLOW_BATCH", 2)
+        task = _make_task(db)
+        for i in range(5):
+            add_comment(db, task["id"], "dev", f"c{i}")
+        db.commit()
+        entries = list(islice(follow_log(db, task_id=task["id"]), 5))
+        assert [e["message"] for e in entries] == [f"c{i}" for i in range(5)]
+
+    def test_follow_wakes_on_other_connection_commit(self, db, tmp_path):
+        task = _make_task(db)
+        add_comment(db, task["id"], "dev", "old")
+        db.commit()
+        after = get_log(db, task["id"])[-1]["id"]
+
+        def write():
+            time.sleep(0.05)
+            with get_db(tmp_path) as other:
+                add_comment(other, task["id"], "dev", "new")
+
+        writer = threading.Thread(target=write)
+        writer.start()
+        entry = next(follow_log(db, after, poll_interval=0.01))
+        writer.join()
+        assert entry["message"] == "new"
+
+
 class TestAdvanceTask:
     def test_backlog_to_development(self, db):
         task = _make_task(db)
@@ -223,6 +268,50 @@ class TestBlockTask:
         assert any("blocked" in e["message"] for e in entries)
 
 
+class TestConditionalTransitions:
+    def test_claim_if_pending(self, db):
+        task = _make_task(db)
+        claimed = claim_task(db, task["id"], "dev-1", expect_status="pending")
+        assert claimed["status"] == "active"
+        with pytest.raises(TransitionConflict) as exc:
+            claim_task(db, task["id"], "dev-2", expect_status="pending")
+        assert exc.value.status == "active"
+        assert [e["author"] for e in get_log(db, task["id"], type="assignment")] == ["dev-1"]
+
+    def test_claim_wrong_stage(self, db):
+        task = _make_task(db)
+        with pytest.raises(TransitionConflict):
+            claim_task(db, task["id"], "dev-1", expect_stage="development")
+        assert get_task(db, task["id"])["status"] == "pending"
+
+    def test_advance_wrong_stage_logs_nothing(self, db):
+        task = _make_task(db)
+        with pytest.raises(TransitionConflict):
+            advance_task(db, task["id"], expect_stage="reviewing")
+        assert get_log(db, task["id"]) == []
+        assert get_task(db, task["id"])["stage"] == "backlog"
+
+    def test_missing_task_is_not_a_conflict(self, db):
+        with pytest.raises(ValueError, match="Task not found"):
+            release_task(db, "NOPE-1", expect_status="active")
+
+    def test_returns_dependencies(self, db):
+        dep = _make_task(db, "Dep")
+        task = _make_task(db, deps=[dep["id"]])
+        assert block_task(db, task["id"])["dependencies"] == [dep["id"]]
+
+    def test_claim_is_two_statements(self, db):
+        task = _make_task(db)
+        statements = []
+        db.set_trace_callback(statements.append)
+        try:
+            claim_task(db, task["id"], "dev-1", expect_status="pending")
+        finally:
+            db.set_trace_callback(None)
+        # Trigger firings re-trace the statement that caused them.
+        assert len(set(statements)) == 2
+
+
 class TestGetUnresolvedDeps:
     def test_no_deps(self, db):
         task = _make_task(db)
@@ -1,9 +1,15 @@
 """Tests for takt task model."""
 
+import time
+
 import pytest
 
+from debussy.takt import models
 from debussy.takt.db import get_db, get_prefix
-from debussy.takt.models import create_task, get_task, list_tasks, update_task, generate_id
+from debussy.takt.models import (
+    create_task, create_tasks, get_deps_map, get_task, iter_tasks, list_ready_tasks,
+    list_tasks, update_task, generate_id,
+)
 
 
 @pytest.fixture
@@ -82,6 +88,77 @@ class TestCreateTask:
         assert set(t3["dependencies"]) == {t1["id"], t2["id"]}
 
 
+class TestCreateTasks:
+    def test_sequential_ids_in_input_order(self, db):
+        prefix = get_prefix(db)
+        create_task(db, "Existing")
+        tasks = create_tasks(db, [{"title": "A"}, {"title": "B"}, {"title": "C"}])
+        assert [t["id"] for t in tasks] == [f"{prefix}-2", f"{prefix}-3", f"{prefix}-4"]
+        assert [t["title"] for t in tasks] == ["A", "B", "C"]
+        assert create_task(db, "After")["id"] == f"{prefix}-5"
+
+    def test_fields(self, db):
+        [task] = create_tasks(db, [{"title": "A", "description": "d", "tags": ["bug"]}])
+        assert task["description"] == "d"
+        assert task["tags"] == ["bug"]
+        assert list_tasks(db, tag="bug")[0]["id"] == task["id"]
+
+    def test_local_key_deps(self, db):
+        tasks = create_tasks(db, [
+            {"key": "accept", "title": "Acceptance", "deps": ["a", "b"]},
+            {"key": "a", "title": "A"},
+            {"key": "b", "title": "B", "deps": ["a"]},
+        ])
+        accept, a, b = tasks
+        assert accept["dependencies"] == [a["id"], b["id"]]
+        assert b["dependencies"] == [a["id"]]
+
+    def test_existing_id_deps(self, db):
+        existing = create_task(db, "Existing")
+        [task] = create_tasks(db, [{"title": "New", "deps": [existing["id"]]}])
+        assert task["dependencies"] == [existing["id"]]
+
+    def test_unknown_dep_raises(self, db):
+        with pytest.raises(ValueError, match="Unknown dependency: NOPE-1"):
+            create_tasks(db, [{"title": "A", "deps": ["NOPE-1"]}])
+
+    def test_dependency_cycle_raises(self, db):
+        with pytest.raises(ValueError, match="Dependency cycle"):
+            create_tasks(db, [
+                {"key": "a", "title": "A", "deps": ["b"]},
+                {"key": "b", "title": "B", "deps": ["a"]},
+            ])
+
+    def test_self_dependency_raises(self, db):
+        with pytest.raises(ValueError, match="Dependency cycle: a -> a"):
+            create_tasks(db, [{"key": "a", "title": "A", "deps": ["a"]}])
+
+    def test_invalid_batch_reserves_no_ids(self, db):
+        prefix = get_prefix(db)
+        with pytest.raises(ValueError):
+            create_tasks(db, [{"title": "A", "deps": ["NOPE-1"]}])
+        assert create_task(db, "B")["id"] == f"{prefix}-1"
+
+    def test_duplicate_key_raises(self, db):
+        with pytest.raises(ValueError, match="Duplicate key"):
+            create_tasks(db, [{"key": "x", "title": "A"}, {"key": "x", "title": "B"}])
+
+    def test_missing_title_raises(self, db):
+        with pytest.raises(ValueError, match="no title"):
+            create_tasks(db, [{"title": "A"}, {"description": "oops"}])
+
+    def test_per_task_project(self, db):
+        db.execute(
+            "INSERT INTO projects (prefix, name, is_default, next_seq) VALUES ('FIX', 'Fixes', 0, 1)"
+        )
+        prefix = get_prefix(db)
+        tasks = create_tasks(db, [{"title": "A"}, {"title": "B", "project": "FIX"}, {"title": "C"}])
+        assert [t["id"] for t in tasks] == [f"{prefix}-1", "FIX-1", f"{prefix}-2"]
+
+    def test_empty(self, db):
+        assert create_tasks(db, []) == []
+
+
 class TestGetTask:
     def test_found(self, db):
         created = create_task(db, "Test")
@@ -129,6 +206,20 @@ class TestListTasks:
         assert len(list_tasks(db, tag="frontend")) == 1
         assert len(list_tasks(db)) == 3
 
+    def test_filter_tag_after_update(self, db):
+        task = create_task(db, "A", tags=["security"])
+        update_task(db, task["id"], tags=["frontend"])
+        assert list_tasks(db, tag="security") == []
+        assert [t["id"] for t in list_tasks(db, tag="frontend")] == [task["id"]]
+
+    def test_prioritize_tags(self, db):
+        plain = create_task(db, "Plain")
+        bug = create_task(db, "Bug", tags=["bug"])
+        both = create_task(db, "Both", tags=["bug", "priority"])
+        pri = create_task(db, "Priority", tags=["priority"])
+        ordered = [t["id"] for t in list_tasks(db, prioritize=["priority", "bug"])]
+        assert ordered == [both["id"], pri["id"], bug["id"], plain["id"]]
+
     def test_combined_filters(self, db):
         create_task(db, "A", tags=["security"])
         t2 = create_task(db, "B", tags=["security"])
@@ -140,6 +231,95 @@ class TestListTasks:
     def test_empty(self, db):
         assert list_tasks(db) == []
 
+    def test_includes_deps(self, db):
+        t1 = create_task(db, "A")
+        t2 = create_task(db, "B")
+        t3 = create_task(db, "C", deps=[t1["id"], t2["id"]])
+        by_id = {t["id"]: t for t in list_tasks(db)}
+        assert by_id[t3["id"]]["dependencies"] == [t1["id"], t2["id"]]
+        assert by_id[t1["id"]]["dependencies"] == []
+
+    def test_constant_query_count(self, db):
+        first = create_task(db, "Root")
+        for i in range(20):
+            create_task(db, f"Task {i}", deps=[first["id"]])
+        statements = []
+        db.set_trace_callback(statements.append)
+        try:
+            tasks = list_tasks(db, stage="backlog")
+        finally:
+            db.set_trace_callback(None)
+        assert len(tasks) == 21
+        assert len(statements) == 2
+
+    def test_limit_and_after_page_in_creation_order(self, db):
+        ids = [create_task(db, f"T{i}")["id"] for i in range(5)]
+        first = [t["id"] for t in list_tasks(db, limit=2)]
+        assert first == ids[:2]
+        rest = [t["id"] for t in list_tasks(db, after=first[-1])]
+        assert rest == ids[2:]
+        assert list_tasks(db, after=ids[-1]) == []
+
+    def test_after_unknown_task(self, db):
+        with pytest.raises(ValueError, match="Task not found"):
+            list_tasks(db, after="TST-999")
+
+    def test_after_with_prioritize_rejected(self, db):
+        task = create_task(db, "A")
+        with pytest.raises(ValueError):
+            list_tasks(db, after=task["id"], prioritize=["bug"])
+
+    def test_fields_projection(self, db):
+        dep = create_task(db, "Dep")
+        create_task(db, "Main", description="long text", deps=[dep["id"]], tags=["bug"])
+        tasks = list_tasks(db, fields=["title", "tags", "dependencies"])
+        assert tasks[1] == {"title": "Main", "tags": ["bug"], "dependencies": [dep["id"]]}
+
+    def test_fields_skip_description_and_deps(self, db):
+        create_task(db, "A", description="long text")
+        statements = []
+        db.set_trace_callback(statements.append)
+        try:
+            tasks = list_tasks(db, fields=["id", "stage"])
+        finally:
+            db.set_trace_callback(None)
+        assert tasks[0].keys() == {"id", "stage"}
+        assert len(statements) == 1
+        assert "description" not in statements[0]
+
+    def test_unknown_field(self, db):
+        with pytest.raises(ValueError, match="Unknown field"):
+            list_tasks(db, fields=["id", "nope"])
+
+    def test_iter_tasks_batches(self, db, monkeypatch):
+        monkeypatch.setattr(models, "_ITER_BATCH", 2)
+        root = create_task(db, "Root")
+        ids = [root["id"]] + [create_task(db, f"T{i}", deps=[root["id"]])["id"] for i in range(4)]
+        tasks = list(iter_tasks(db))
+        assert [t["id"] for t in tasks] == ids
+        assert all(t["dependencies"] == [root["id"]] for t in tasks[1:])
+
+
+class TestGetDepsMap:
+    def test_all(self, db):
+        t1 = create_task(db, "A")
+        t2 = create_task(db, "B", deps=[t1["id"]])
+        t3 = create_task(db, "C", deps=[t1["id"], t2["id"]])
+        assert get_deps_map(db) == {
+            t2["id"]: [t1["id"]],
+            t3["id"]: [t1["id"], t2["id"]],
+        }
+
+    def test_subset(self, db):
+        t1 = create_task(db, "A")
+        t2 = create_task(db, "B", deps=[t1["id"]])
+        create_task(db, "C", deps=[t1["id"]])
+        assert get_deps_map(db, [t1["id"], t2["id"]]) == {t2["id"]: [t1["id"]]}
+
+    def test_empty_ids(self, db):
+        create_task(db, "A")
+        assert get_deps_map(db, []) == {}
+
 
 class TestUpdateTask:
     def test_update_title(self, db):
@@ -185,3 +365,90 @@ class TestUpdateTask:
         task = create_task(db, "Test")
         updated = update_task(db, task["id"], rejection_count=2)
         assert updated["rejection_count"] == 2
+
+
+class TestTaskTags:
+    def _tags(self, db, task_id):
+        rows = db.execute(
+            "SELECT tag FROM task_tags WHERE task_id = ? ORDER BY position", (task_id,)
+        ).fetchall()
+        return [r["tag"] for r in rows]
+
+    def test_mirrors_tags_on_create(self, db):
+        task = create_task(db, "A", tags=["security", "frontend"])
+        assert self._tags(db, task["id"]) == ["security", "frontend"]
+
+    def test_mirrors_tags_on_update(self, db):
+        task = create_task(db, "A", tags=["security"])
+        update_task(db, task["id"], tags=["bug", "priority"])
+        assert self._tags(db, task["id"]) == ["bug", "priority"]
+
+    def test_removed_with_task(self, db):
+        task = create_task(db, "A", tags=["security"])
+        db.execute("DELETE FROM tasks WHERE id = ?", (task["id"],))
+        assert self._tags(db, task["id"]) == []
+
+    def test_tag_filter_uses_index(self, db):
+        plan = db.execute(
+            "EXPLAIN QUERY PLAN SELECT task_id FROM task_tags WHERE tag = ?", ("x",)
+        ).fetchall()
+        assert any("idx_task_tags_tag" in r["detail"] for r in plan)
+
+
+class TestUnresolvedCount:
+    def test_counts_open_deps(self, db):
+        a = create_task(db, "A")
+        b = create_task(db, "B")
+        c = create_task(db, "C", deps=[a["id"], b["id"]])
+        assert get_task(db, c["id"])["unresolved_count"] == 2
+
+    def test_done_deps_do_not_count(self, db):
+        a = create_task(db, "A")
+        update_task(db, a["id"], stage="done")
+        c = create_task(db, "C", deps=[a["id"]])
+        assert get_task(db, c["id"])["unresolved_count"] == 0
+
+    def test_follows_dep_stage(self, db):
+        a = create_task(db, "A")
+        c = create_task(db, "C", deps=[a["id"]])
+        update_task(db, a["id"], stage="acceptance")
+        assert get_task(db, c["id"])["unresolved_count"] == 0
+        update_task(db, a["id"], stage="done")
+        assert get_task(db, c["id"])["unresolved_count"] == 0
+        update_task(db, a["id"], stage="development")
+        assert get_task(db, c["id"])["unresolved_count"] == 1
+
+    def test_removing_dep_decrements(self, db):
+        a = create_task(db, "A")
+        c = create_task(db, "C", deps=[a["id"]])
+        db.execute("DELETE FROM dependencies WHERE task_id = ?", (c["id"],))
+        assert get_task(db, c["id"])["unresolved_count"] == 0
+
+
+class TestListReadyTasks:
+    def test_excludes_tasks_with_open_deps(self, db):
+        a = create_task(db, "A")
+        b = create_task(db, "B", deps=[a["id"]])
+        ready = list_ready_tasks(db, "backlog")
+        assert [t["id"] for t in ready] == [a["id"]]
+        update_task(db, a["id"], stage="done")
+        assert [t["id"] for t in list_ready_tasks(db, "backlog")] == [b["id"]]
+
+    def test_only_pending(self, db):
+        a = create_task(db, "A")
+        update_task(db, a["id"], status="blocked")
+        assert list_ready_tasks(db, "backlog") == []
+
+
+class TestTimestamps:
+    def test_epoch_ms(self, db):
+        before = int(time.time() * 1000)
+        task = create_task(db, "A")
+        after = int(time.time() * 1000)
+        assert before - 1 <= task["created_at"] <= after + 1
+        assert isinstance(task["updated_at"], int)
+
+    def test_same_millisecond_keeps_insertion_order(self, db):
+        tasks = create_tasks(db, [{"title": str(i)} for i in range(5)])
+        db.execute("UPDATE tasks SET created_at = 1")
+        assert [t["id"] for t in list_tasks(db)] == [t["id"] for t in tasks]
@@ -0,0 +1,93 @@
+"""Tests for opt-in SQL profiling."""
+
+import sqlite3
+import threading
+
+import pytest
+
+from debussy.takt import profile
+from debussy.takt.cli import main
+from debussy.takt.db import clear_connection_cache, get_db
+from debussy.takt.models import create_task, list_tasks
+
+
+@pytest.fixture
+def profiled(tmp_path, monkeypatch):
+    monkeypatch.setenv(profile.PROFILE_ENV, "1")
+    yield tmp_path
+    clear_connection_cache()
+    profile._recorders.pop(tmp_path, None)
+
+
+class TestConnection:
+    def test_disabled_uses_plain_connection(self, tmp_path, monkeypatch):
+        monkeypatch.delenv(profile.PROFILE_ENV, raising=False)
+        with get_db(tmp_path) as db:
+            assert type(db) is sqlite3.Connection
+
+    def test_records_statements_with_caller(self, profiled):
+        with get_db(profiled) as db:
+            create_task(db, "A")
+            list_tasks(db)
+        profile.recorder_for(profiled).flush()
+        callers = {caller for _, caller, _ in profile.load_samples(profiled)}
+        assert "debussy.takt.models.create_task" in callers
+        assert "debussy.takt.models.iter_tasks" in callers
+
+    def test_flushes_when_buffer_fills(self, profiled, monkeypatch):
+        monkeypatch.setattr(profile, "BUFFER_SIZE", 3)
+        rec = profile.Recorder(profiled / "m.jsonl")
+        for _ in range(3):
+            rec.record("SELECT  1", "t.f", 0.001)
+        assert not rec.samples
+        assert len((profiled / "m.jsonl").read_text().splitlines()) == 3
+
+    def test_concurrent_records_are_not_lost(self, profiled, monkeypatch):
+        monkeypatch.setattr(profile, "BUFFER_SIZE", 7)
+        rec = profile.Recorder(profiled / "m.jsonl")
+
+        def worker():
+            for _ in range(500):
+                rec.record("SELECT 1", "t.f", 0.001)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        rec.flush()
+        assert len((profiled / "m.jsonl").read_text().splitlines()) == 2000
+
+
+class TestSummarize:
+    def test_aggregates_by_sql_and_caller(self):
+        samples = [("SELECT 1", "m.f", float(us)) for us in range(1, 101)]
+        samples.append(("SELECT 2", "m.g", 5.0))
+        top = profile.summarize(samples)
+        assert top[0]["sql"] == "SELECT 1"
+        assert top[0]["count"] == 100
+        assert top[0]["total_ms"] == 5.05
+        assert top[0]["p95_ms"] == 0.095
+        assert profile.summarize(samples, top=1) == top[:1]
+
+    def test_normalizes_whitespace(self):
+        assert profile.normalize("SELECT *\n  FROM tasks") == "SELECT * FROM tasks"
+
+
+class TestCli:
+    def test_profile_report_and_reset(self, profiled, monkeypatch, capsys):
+        (profiled / ".git").mkdir()
+        monkeypatch.chdir(profiled)
+        assert main(["create", "A"]) == 0
+        profile.recorder_for(profiled).flush()
+        capsys.readouterr()
+
+        assert main(["profile", "--top", "3"]) == 0
+        out = capsys.readouterr().out
+        assert "TOTAL ms" in out
+        assert "debussy.takt." in out
+
+        assert main(["profile", "--reset"]) == 0
+        capsys.readouterr()
+        assert main(["profile"]) == 0
+        assert "No samples" in capsys.readouterr().out
@@ -0,0 +1,113 @@
+"""Tests for takt full-text search."""
+
+import pytest
+
+from debussy.takt.archive import archive_logs, archive_tasks
+from debussy.takt.db import get_db
+from debussy.takt.log import add_comment, add_log
+from debussy.takt.models import create_task, update_task
+from debussy.takt.search import search
+
+
+@pytest.fixture
+def db(tmp_path):
+    with get_db(tmp_path) as conn:
+        yield conn
+
+
+class TestSearch:
+    def test_matches_title(self, db):
+        task = create_task(db, "Refactor auth middleware")
+        create_task(db, "Unrelated")
+        results = search(db, "middleware")
+        assert [r["task_id"] for r in results] == [task["id"]]
+        assert results[0]["kind"] == "task"
+
+    def test_matches_description(self, db):
+        task = create_task(db, "Login", description="Touches the session cookie handling")
+        assert search(db, "cookie")[0]["task_id"] == task["id"]
+
+    def test_matches_comments(self, db):
+        task = create_task(db, "Something")
+        add_comment(db, task["id"], "dev", "fixed the flaky websocket reconnect")
+        results = search(db, "websocket")
+        assert results[0]["task_id"] == task["id"]
+        assert results[0]["kind"] == "comment"
+        assert "[websocket]" in results[0]["snippet"]
+
+    def test_ignores_transitions(self, db):
+        task = create_task(db, "Something")
+        add_log(db, task["id"], "transition", "system", "websocket -> done")
+        assert search(db, "websocket") == []
+
+    def test_title_ranks_above_comment(self, db):
+        commented = create_task(db, "Other")
+        add_comment(db, commented["id"], "dev", "mentions cache once")
+        titled = create_task(db, "Cache invalidation")
+        assert search(db, "cache")[0]["task_id"] == titled["id"]
+
+    def test_follows_title_update(self, db):
+        task = create_task(db, "Old name")
+        update_task(db, task["id"], title="Brand new name")
+        assert search(db, "old") == []
+        assert search(db, "brand")[0]["task_id"] == task["id"]
+
+    def test_removed_with_task(self, db):
+        task = create_task(db, "Doomed")
+        db.execute("DELETE FROM tasks WHERE id = ?", (task["id"],))
+        assert search(db, "doomed") == []
+
+    def test_filters(self, db):
+        a = create_task(db, "Parser work", tags=["backend"])
+        b = create_task(db, "Parser tests")
+        update_task(db, b["id"], stage="development")
+        assert [r["task_id"] for r in search(db, "parser", stage="development")] == [b["id"]]
+        assert [r["task_id"] for r in search(db, "parser", tag="backend")] == [a["id"]]
+        assert search(db, "parser", prefix="ZZZ") == []
+
+    def test_invalid_syntax_falls_back_to_literal(self, db):
+        task = create_task(db, "Fix auth-middleware crash")
+        assert search(db, 'auth-middleware "crash')[0]["task_id"] == task["id"]
+
+    def test_limit(self, db):
+        for i in range(5):
+            create_task(db, f"Widget {i}")
+        assert len(search(db, "widget", limit=3)) == 3
+
+
+class TestArchived:
+    def _done(self, db, title, comment):
+        task = create_task(db, title, tags=["backend"])
+        add_comment(db, task["id"], "dev", comment)
+        update_task(db, task["id"], stage="done")
+        return task
+
+    def test_finds_archived_task_and_comment(self, db):
+        task = self._done(db, "Parser rewrite", "tokenizer edge cases")
+        db.execute("UPDATE tasks SET updated_at = updated_at - 30 * 86400000")
+        assert archive_tasks(db) == 1
+        [hit] = search(db, "parser")
+        assert hit["task_id"] == task["id"] and hit["archived"]
+        [hit] = search(db, "tokenizer", tag="backend")
+        assert hit["kind"] == "comment" and hit["title"] == "Parser rewrite"
+        assert search(db, "parser", stage="development") == []
+
+    def test_archived_comment_of_live_task(self, db):
+        task = self._done(db, "Parser rewrite", "tokenizer edge cases")
+        db.execute("UPDATE log SET timestamp = timestamp - 60 * 86400000")
+        assert archive_logs(db) > 0
+        [hit] = search(db, "tokenizer")
+        assert hit["archived"] and hit["task_id"] == task["id"]
+        assert hit["stage"] == "done" and hit["title"] == "Parser rewrite"
+        assert search(db, "tokenizer", tag="frontend") == []
+        assert not search(db, "parser")[0]["archived"]
+
+    def test_live_matches_come_before_archived(self, db):
+        old = self._done(db, "Parser parser parser", "parser")
+        db.execute("UPDATE tasks SET updated_at = updated_at - 30 * 86400000")
+        assert archive_tasks(db) == 1
+        live = create_task(db, "Cleanup", description="touch the parser " + "and more " * 20)
+        hits = search(db, "parser")
+        assert [h["task_id"] for h in hits] == [live["id"], old["id"], old["id"]]
+        assert [h["archived"] for h in hits] == [False, True, True]
+        assert [h["task_id"] for h in search(db, "parser", limit=1)] == [live["id"]]
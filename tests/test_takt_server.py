@@ -0,0 +1,80 @@
+"""Tests for the takt Unix socket server."""
+
+import socket
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from debussy.takt import server as server_mod
+from debussy.takt.cli import main
+from debussy.takt.db import get_db, init_db
+from debussy.takt.models import get_task
+from debussy.takt.client import forward, socket_path
+from debussy.takt.server import TaktServer
+
+
+@pytest.fixture
+def project_dir(tmp_path, monkeypatch):
+    (tmp_path / ".git").mkdir()
+    init_db(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def running(project_dir):
+    srv = TaktServer(project_dir)
+    thread = threading.Thread(target=srv.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+    thread.join()
+
+
+class TestForward:
+    def test_none_without_socket(self, project_dir):
+        assert forward(["list"], project_dir) is None
+
+    def test_none_for_unserved_command(self, project_dir, running):
+        assert forward(["gc"], project_dir) is None
+        assert forward(["list", "--help"], project_dir) is None
+
+    def test_none_for_stale_socket(self, project_dir):
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(str(socket_path(project_dir)))
+        stale.close()
+        assert forward(["list"], project_dir) is None
+
+    def test_disabled_by_env(self, project_dir, running, monkeypatch):
+        monkeypatch.setenv("TAKT_NO_SERVER", "1")
+        assert forward(["list"], project_dir) is None
+
+
+class TestServer:
+    def test_cli_goes_through_server(self, project_dir, running, capsys):
+        with patch.object(server_mod, "_run", wraps=server_mod._run) as run:
+            assert main(["create", "Served task"]) == 0
+        task_id = capsys.readouterr().out.strip()
+        run.assert_called_once()
+        with get_db(project_dir) as db:
+            assert get_task(db, task_id)["title"] == "Served task"
+
+    def test_relays_exit_code_and_stderr(self, project_dir, running, capsys):
+        assert main(["show", "NOPE-1"]) == 1
+        assert "Task not found" in capsys.readouterr().err
+
+    def test_relays_usage_errors(self, project_dir, running, capsys):
+        assert main(["claim", "X-1"]) == 2
+        assert "--agent" in capsys.readouterr().err
+
+    def test_refuses_second_server(self, project_dir, running):
+        with pytest.raises(RuntimeError, match="already running"):
+            TaktServer(project_dir)
+
+    def test_removes_socket_on_close(self, project_dir):
+        srv = TaktServer(project_dir)
+        assert socket_path(project_dir).exists()
+        srv.server_close()
+        assert not socket_path(project_dir).exists()
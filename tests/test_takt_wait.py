@@ -0,0 +1,112 @@
+"""Tests for takt wait."""
+
+import threading
+import time
+
+import pytest
+
+from debussy.takt.cli import EXIT_TIMEOUT, EXIT_WAIT_MET, main
+from debussy.takt.db import get_db, init_db
+from debussy.takt.log import advance_task, block_task
+from debussy.takt.models import create_task
+from debussy.takt.wait import parse_condition, wait_for
+
+
+@pytest.fixture
+def db(tmp_path):
+    with get_db(tmp_path) as conn:
+        yield conn
+
+
+def _later(tmp_path, action, delay=0.05):
+    def run():
+        time.sleep(delay)
+        with get_db(tmp_path) as other:
+            action(other)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+class TestParseCondition:
+    def test_alternatives(self):
+        assert parse_condition("stage=done|status=blocked") == [
+            ("stage", "done"), ("status", "blocked"),
+        ]
+
+    @pytest.mark.parametrize("text", ["done", "title=x", "stage="])
+    def test_invalid(self, text):
+        with pytest.raises(ValueError, match="Invalid condition"):
+            parse_condition(text)
+
+
+class TestWaitFor:
+    def test_already_met(self, db):
+        task = create_task(db, "A")
+        assert wait_for(db, [task["id"]], [("stage", "backlog")]) == {task["id"]: 0}
+
+    def test_unknown_task(self, db):
+        with pytest.raises(ValueError, match="Task not found"):
+            wait_for(db, ["TST-404"], [("stage", "done")], timeout=0)
+
+    def test_timeout(self, db):
+        task = create_task(db, "A")
+        db.commit()
+        assert wait_for(db, [task["id"]], [("stage", "done")], timeout=0.05,
+                        poll_interval=0.01) is None
+
+    def test_wakes_on_commit(self, db, tmp_path):
+        task = create_task(db, "A")
+        db.commit()
+        writer = _later(tmp_path, lambda other: block_task(other, task["id"]))
+        met = wait_for(db, [task["id"]], [("stage", "done"), ("status", "blocked")],
+                       timeout=5, poll_interval=0.01)
+        writer.join()
+        assert met == {task["id"]: 1}
+
+    def test_require_all(self, db, tmp_path):
+        a, b = create_task(db, "A"), create_task(db, "B")
+        advance_task(db, a["id"])
+        db.commit()
+        ids = [a["id"], b["id"]]
+        assert wait_for(db, ids, [("stage", "development")]) == {a["id"]: 0}
+        writer = _later(tmp_path, lambda other: advance_task(other, b["id"]))
+        met = wait_for(db, ids, [("stage", "development")], require_all=True,
+                       timeout=5, poll_interval=0.01)
+        writer.join()
+        assert met == {a["id"]: 0, b["id"]: 0}
+
+
+class TestWaitCli:
+    @pytest.fixture
+    def project_dir(self, tmp_path, monkeypatch):
+        (tmp_path / ".git").mkdir()
+        init_db(tmp_path)
+        monkeypatch.chdir(tmp_path)
+        return tmp_path
+
+    def test_exit_code_names_condition(self, project_dir, capsys):
+        main(["create", "A"])
+        task_id = capsys.readouterr().out.strip()
+        main(["block", task_id])
+        capsys.readouterr()
+        code = main(["wait", task_id, "--until", "stage=done|status=blocked"])
+        assert code == EXIT_WAIT_MET + 1
+        assert f"{task_id}: status=blocked" in capsys.readouterr().out
+
+    def test_timeout_exit_code(self, project_dir, capsys):
+        main(["create", "A"])
+        task_id = capsys.readouterr().out.strip()
+        assert main(["wait", task_id, "--until", "stage=done", "--timeout", "0"]) == EXIT_TIMEOUT
+
+    def test_archived_task_is_done(self, project_dir, capsys):
+        main(["create", "A"])
+        task_id = capsys.readouterr().out.strip()
+        main(["advance", task_id, "--to", "done"])
+        with get_db(project_dir) as db:
+            db.execute("UPDATE tasks SET updated_at = updated_at - 30 * 86400000")
+        main(["gc"])
+        capsys.readouterr()
+        assert main(["wait", task_id, "--until", "stage=done", "--timeout", "0"]) == EXIT_WAIT_MET
+        assert f"{task_id}: stage=done" in capsys.readouterr().out
@@ -0,0 +1,139 @@
+"""Tests for tick.py — per-tick task snapshot with buffered writes."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from debussy.config import STAGE_DEVELOPMENT, STATUS_ACTIVE, STATUS_BLOCKED, STATUS_PENDING
+from debussy.pipeline_checker import reset_orphaned
+from debussy.takt import advance_task, claim_task, create_task, get_db, get_log, get_task, init_db, update_task
+from debussy.tick import TickSnapshot, tick_or_load
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    (tmp_path / ".git").mkdir()
+    init_db(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def _dev_task(db, title, **kwargs):
+    task = create_task(db, title, **kwargs)
+    advance_task(db, task["id"])
+    return task["id"]
+
+
+def test_load_skips_done_tasks(project):
+    with get_db() as db:
+        live = _dev_task(db, "Live")
+        done = _dev_task(db, "Done")
+        update_task(db, done, stage="done")
+
+    tick = TickSnapshot.load()
+    assert set(tick.tasks) == {live}
+    # Done tasks are still reachable, read once on demand.
+    assert tick.get(done)["stage"] == "done"
+    assert done in tick.tasks
+    assert tick.get("PRJ-999") is None
+
+
+def test_ready_matches_list_ready_order(project):
+    with get_db() as db:
+        plain = _dev_task(db, "Plain")
+        bug = _dev_task(db, "Bug", tags=["bug"])
+        urgent = _dev_task(db, "Urgent", tags=["priority"])
+        waiting = _dev_task(db, "Waiting", deps=[plain])
+        busy = _dev_task(db, "Busy")
+        update_task(db, busy, status=STATUS_ACTIVE)
+
+    tick = TickSnapshot.load()
+    ids = [t["id"] for t in tick.ready(STAGE_DEVELOPMENT, prioritize=["priority", "bug"])]
+    assert ids == [urgent, bug, plain]
+    assert waiting not in ids
+
+
+def test_writes_buffered_until_flush(project):
+    with get_db() as db:
+        task_id = _dev_task(db, "Stuck")
+        update_task(db, task_id, status=STATUS_ACTIVE)
+
+    tick = TickSnapshot.load()
+    tick.comment(task_id, "watcher", "timed out")
+    tick.release(task_id)
+    assert tick.status(task_id) == STATUS_PENDING
+    assert tick.pending_writes == 2
+    with get_db() as db:
+        assert get_task(db, task_id)["status"] == STATUS_ACTIVE
+
+    tick.flush()
+    assert tick.pending_writes == 0
+    with get_db() as db:
+        assert get_task(db, task_id)["status"] == STATUS_PENDING
+        assert any(e["message"] == "timed out" for e in get_log(db, task_id))
+
+
+def test_failed_write_does_not_undo_others(project):
+    with get_db() as db:
+        task_id = _dev_task(db, "Real")
+        update_task(db, task_id, status=STATUS_ACTIVE)
+
+    tick = TickSnapshot.load()
+    tick.release("PRJ-999")
+    tick.block(task_id)
+    tick.flush()
+    with get_db() as db:
+        assert get_task(db, task_id)["status"] == STATUS_BLOCKED
+
+
+def test_write_loses_to_concurrent_claim(project):
+    with get_db() as db:
+        task_id = _dev_task(db, "Capped")
+
+    tick = TickSnapshot.load()
+    tick.block(task_id)
+    with get_db() as db:
+        # An agent claims it before the flush.
+        claim_task(db, task_id, "developer-bach")
+    tick.flush()
+    with get_db() as db:
+        assert get_task(db, task_id)["status"] == STATUS_ACTIVE
+    assert tick.status(task_id) == STATUS_ACTIVE
+
+
+def test_reload_refreshes_dependents(project):
+    with get_db() as db:
+        dep = _dev_task(db, "Dep")
+        child = _dev_task(db, "Child", deps=[dep])
+
+    tick = TickSnapshot.load()
+    assert tick.get(child)["unresolved_count"] == 1
+    with get_db() as db:
+        update_task(db, dep, stage="done")
+    tick.reload(dep)
+    assert tick.get(dep)["stage"] == "done"
+    assert tick.get(child)["unresolved_count"] == 0
+    assert [t["id"] for t in tick.ready(STAGE_DEVELOPMENT)] == [child]
+
+
+def test_phase_with_tick_defers_writes(project):
+    with get_db() as db:
+        task_id = _dev_task(db, "Orphan")
+        update_task(db, task_id, status=STATUS_ACTIVE)
+    watcher = MagicMock()
+    watcher.running = {}
+
+    with TickSnapshot.load() as tick:
+        reset_orphaned(watcher, tick)
+        with get_db() as db:
+            assert get_task(db, task_id)["status"] == STATUS_ACTIVE
+    with get_db() as db:
+        assert get_task(db, task_id)["status"] == STATUS_PENDING
+
+
+def test_tick_or_load_keeps_given_tick(project):
+    tick = TickSnapshot([])
+    with tick_or_load(tick) as got:
+        assert got is tick
+    with tick_or_load(None) as got:
+        assert isinstance(got, TickSnapshot) and got is not tick
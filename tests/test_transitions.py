@@ -4,6 +4,8 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
+from debussy.fetcher import FetchResult
+from debussy.gitrefs import GitRefSnapshot
 from debussy.transitions import (
     MAX_RETRIES,
     _compute_next_stage, _dispatch_transition, _handle_agent_success,
@@ -11,7 +13,7 @@ from debussy.transitions import (
     ensure_stage_transition,
 )
 from debussy.takt import get_db, init_db, create_task, advance_task, update_task, get_task
-from debussy.takt.log import add_log
+from debussy.takt.log import TransitionConflict, add_log, get_log
 
 
 def _make_agent(bead="TST-1", spawned_stage="development"):
@@ -29,6 +31,12 @@ def _make_watcher():
     return watcher
 
 
+@pytest.fixture(autouse=True)
+def fetch_ok(monkeypatch):
+    """Gates fetch origin first; the test projects have no remote."""
+    monkeypatch.setattr("debussy.transitions.fetch_origin", lambda *a, **kw: FetchResult(True))
+
+
 @pytest.fixture
 def project(tmp_path, monkeypatch):
     (tmp_path / ".git").mkdir()
@@ -220,28 +228,57 @@ class TestEmptyBranch:
 
         assert get_task(db, task["id"])["status"] == "blocked"
 
+    def test_conflict_leaves_no_retry_behind(self, db):
+        task = _make_dev_task(db)
+        stale = get_task(db, task["id"])
+        update_task(db, task["id"], status="blocked")  # the conductor got there first
+        watcher = _make_watcher()
+        agent = _make_agent(bead=task["id"], spawned_stage="development")
+
+        with pytest.raises(TransitionConflict):
+            _handle_empty_branch(watcher, agent, stale, db)
+
+        assert task["id"] not in watcher.empty_branch_retries
+        assert not [e for e in get_log(db, task["id"]) if "empty branch" in e["message"]]
+        assert get_task(db, task["id"])["status"] == "blocked"
+
+
+def _ls_remote(stdout="", returncode=0):
+    return MagicMock(returncode=returncode, stdout=stdout)
+
 
 class TestRemoteBranchExists:
     @patch("debussy.transitions.subprocess.run")
-    def test_returns_true_when_branch_exists(self, mock_run):
-        mock_run.return_value = MagicMock(
-            returncode=0,
-            stdout="abc123\trefs/heads/feature/TST-1\n",
-        )
+    @patch("debussy.transitions.ref_snapshot",
+           return_value=GitRefSnapshot({"refs/remotes/origin/feature/TST-1": "abc123"}))
+    def test_returns_true_when_tracking_ref_exists(self, mock_refs, mock_run):
         assert _remote_branch_exists("TST-1") is True
+        mock_run.assert_not_called()
 
-    @patch("debussy.transitions.subprocess.run")
-    def test_returns_false_when_branch_missing(self, mock_run):
-        mock_run.return_value = MagicMock(returncode=0, stdout="")
+    @patch("debussy.transitions.subprocess.run", return_value=_ls_remote())
+    @patch("debussy.transitions.ref_snapshot",
+           return_value=GitRefSnapshot({"refs/heads/feature/TST-1": "abc123"}))
+    def test_returns_false_when_origin_lacks_branch(self, mock_refs, mock_run):
         assert _remote_branch_exists("TST-1") is False
+        assert mock_run.call_args[0][0][:3] == ["git", "ls-remote", "--heads"]
+
+    @patch("debussy.transitions.fetch_origin")
+    @patch("debussy.transitions.subprocess.run",
+           return_value=_ls_remote("abc123\trefs/heads/feature/TST-1\n"))
+    @patch("debussy.transitions.ref_snapshot", return_value=GitRefSnapshot({}))
+    def test_miss_confirmed_by_ls_remote(self, mock_refs, mock_run, mock_fetch):
+        """A push that landed after the fetch is found and fetched."""
+        assert _remote_branch_exists("TST-1") is True
+        mock_fetch.assert_called_once_with(["feature/TST-1"], force=True)
 
-    @patch("debussy.transitions.subprocess.run")
-    def test_returns_none_on_nonzero_exit(self, mock_run):
-        mock_run.return_value = MagicMock(returncode=128, stdout="")
+    @patch("debussy.transitions.subprocess.run", return_value=_ls_remote(returncode=128))
+    @patch("debussy.transitions.ref_snapshot", return_value=GitRefSnapshot({}, ok=False))
+    def test_returns_none_when_origin_unreachable(self, mock_refs, mock_run):
         assert _remote_branch_exists("TST-1") is None
 
-    @patch("debussy.transitions.subprocess.run", side_effect=OSError("network"))
-    def test_returns_none_on_exception(self, mock_run):
+    @patch("debussy.transitions.subprocess.run", side_effect=OSError("no git"))
+    @patch("debussy.transitions.ref_snapshot", return_value=GitRefSnapshot({}, ok=False))
+    def test_returns_none_on_exception(self, mock_refs, mock_run):
         assert _remote_branch_exists("TST-1") is None
 
 
@@ -269,6 +306,22 @@ class TestRemoteBranchGate:
         assert get_task(db, task["id"])["stage"] == "reviewing"
 
 
+    @patch("debussy.transitions._branch_has_commits")
+    @patch("debussy.transitions._remote_branch_exists")
+    def test_failed_fetch_skips_branch_checks(self, mock_remote, mock_commits, db, monkeypatch):
+        """Stale tracking refs must not send pushed work down the empty-branch path."""
+        monkeypatch.setattr("debussy.transitions.fetch_origin", lambda *a, **kw: FetchResult(False))
+        task = _make_dev_task(db)
+        watcher = _make_watcher()
+        agent = _make_agent(bead=task["id"], spawned_stage="development")
+
+        _dispatch_transition(watcher, agent, get_task(db, task["id"]), db)
+
+        mock_remote.assert_not_called()
+        mock_commits.assert_not_called()
+        assert get_task(db, task["id"])["stage"] == "reviewing"
+
+
 class TestMergeVerification:
     @patch("debussy.transitions._verify_merge_landed", return_value=True)
     @patch("debussy.transitions.delete_branch")
@@ -348,3 +401,58 @@ class TestEnsureStageTransition:
         result = ensure_stage_transition(watcher, agent)
 
         assert result is False
+
+    @patch("debussy.transitions._remote_branch_exists", return_value=True)
+    def test_concurrent_change_wins(self, mock_remote, project):
+        """A task the conductor blocked while the gate ran is not advanced."""
+        with get_db() as db:
+            task_id = _make_dev_task(db)["id"]
+
+        def conductor_blocks(*args):
+            with get_db() as db:
+                update_task(db, task_id, status="blocked")
+            return True
+
+        watcher = _make_watcher()
+        agent = _make_agent(bead=task_id, spawned_stage="development")
+        with patch("debussy.transitions._branch_has_commits", side_effect=conductor_blocks):
+            assert ensure_stage_transition(watcher, agent) is True
+
+        with get_db() as db:
+            updated = get_task(db, task_id)
+        assert (updated["stage"], updated["status"]) == ("development", "blocked")
+
+    @patch("debussy.transitions._remote_branch_exists", return_value=True)
+    def test_gate_runs_on_pool(self, mock_remote, project):
+        """With the pool running, the transition waits for the gate job."""
+        import threading
+        from debussy import workers
+
+        with get_db() as db:
+            task_id = _make_dev_task(db)["id"]
+        gate_open = threading.Event()
+        watcher = _make_watcher()
+        watcher.finishing = {}
+        agent = _make_agent(bead=task_id, spawned_stage="development")
+        agent.role = "developer"
+
+        pool = workers.start(1)
+        try:
+            with patch("debussy.transitions._branch_has_commits",
+                       side_effect=lambda *a: gate_open.wait(5)):
+                assert ensure_stage_transition(watcher, agent) is True
+                assert watcher.finishing == {f"developer:{task_id}": task_id}
+                with get_db() as db:
+                    assert get_task(db, task_id)["stage"] == "development"
+                gate_open.set()
+                for _ in range(500):
+                    if pool.has_finished():
+                        break
+                    threading.Event().wait(0.01)
+                workers.collect()
+        finally:
+            workers.stop()
+
+        assert watcher.finishing == {}
+        with get_db() as db:
+            assert get_task(db, task_id)["stage"] == "reviewing"
@@ -0,0 +1,99 @@
+"""Tests for the watcher's change-driven wakeups."""
+
+import subprocess
+import sys
+import threading
+import time
+
+from debussy.takt import create_task, get_db, list_tasks
+from debussy.waker import Waker
+
+
+def _db_paths(root):
+    db = root / ".takt" / "takt.db"
+    return [db, db.with_name("takt.db-wal")]
+
+
+def _later(action, delay=0.05):
+    thread = threading.Thread(target=lambda: (time.sleep(delay), action()))
+    thread.start()
+    return thread
+
+
+class TestWaker:
+    def test_times_out_when_idle(self, tmp_path):
+        waker = Waker([tmp_path / "missing"], check_interval=0.01)
+        start = time.monotonic()
+        assert waker.wait(0.05) == "timeout"
+        assert time.monotonic() - start >= 0.05
+
+    def test_wakes_on_commit_from_another_connection(self, tmp_path):
+        with get_db(tmp_path):
+            pass
+        waker = Waker(_db_paths(tmp_path), check_interval=0.01)
+
+        def write():
+            with get_db(tmp_path) as db:
+                create_task(db, "A")
+
+        writer = _later(write)
+        start = time.monotonic()
+        assert waker.wait(5) == "file"
+        assert time.monotonic() - start < 1
+        writer.join()
+
+    def test_reads_do_not_wake(self, tmp_path):
+        with get_db(tmp_path) as db:
+            create_task(db, "A")
+        waker = Waker(_db_paths(tmp_path), check_interval=0.01)
+        with get_db(tmp_path) as db:
+            list_tasks(db)
+        assert waker.wait(0.05) == "timeout"
+
+    def test_change_during_tick_wakes_next_wait(self, tmp_path):
+        config = tmp_path / "config.json"
+        waker = Waker([config], check_interval=0.01)
+        waker.mark()
+        config.write_text("{}")
+        assert waker.wait(5) == "file"
+
+    def test_wakes_on_process_exit(self, tmp_path):
+        proc = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(0.1)"])
+        try:
+            assert Waker([], check_interval=0.01).wait(5, procs=[proc]) == "proc"
+        finally:
+            proc.wait()
+
+    def test_should_exit(self, tmp_path):
+        assert Waker([], check_interval=0.01).wait(5, should_exit=lambda: True) == "exit"
+
+    def test_wakes_when_background_job_finishes(self, tmp_path):
+        done = threading.Event()
+        _later(done.set)
+        assert Waker([], check_interval=0.01).wait(5, jobs_done=done.is_set) == "job"
+
+    def test_debounces_wakes_after_mark(self, tmp_path):
+        config = tmp_path / "config.json"
+        waker = Waker([config], check_interval=0.01, min_interval=0.2)
+        waker.mark()
+        config.write_text("{}")
+        start = time.monotonic()
+        assert waker.wait(5) == "file"
+        assert time.monotonic() - start >= 0.15
+
+    def test_own_writes_do_not_wake(self, tmp_path):
+        config = tmp_path / "config.json"
+        waker = Waker([config], check_interval=0.01, min_interval=0)
+        waker.mark()
+        with waker.own_writes():
+            config.write_text("{}")
+        assert waker.wait(0.05) == "timeout"
+
+    def test_own_writes_keep_earlier_change(self, tmp_path):
+        config, other = tmp_path / "config.json", tmp_path / "other"
+        waker = Waker([config, other], check_interval=0.01, min_interval=0)
+        waker.mark()
+        other.write_text("agent")
+        with waker.own_writes():
+            config.write_text("{}")
+        assert waker.wait(5) == "file"
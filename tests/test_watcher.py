@@ -124,7 +124,6 @@ def test_pause_running_agents_stops_and_clears(project_dir, monkeypatch):
     agent.cleanup = lambda: None
     w.running = {"reviewer:PRJ-2": agent}
     w.used_names = {"reviewer-y"}
-    monkeypatch.setattr(watcher_mod, "get_task_status", lambda t: "pending")
     monkeypatch.setattr(w, "save_state", lambda: None)
     w._pause_running_agents("paused: test")
     assert stopped == ["reviewer-y"]
@@ -196,7 +195,6 @@ def _dead_agent(task="PRJ-1", role="developer"):
 def _prime_cleanup(monkeypatch, w, tail):
     monkeypatch.setattr(watcher_mod.time, "time", lambda: 1005.0)
     monkeypatch.setattr(watcher_mod, "read_log_tail", lambda p: tail)
-    monkeypatch.setattr(watcher_mod, "get_task_status", lambda t: "pending")
     monkeypatch.setattr(watcher_mod, "ensure_stage_transition", lambda *a: False)
     monkeypatch.setattr(watcher_mod, "comment_on_task", lambda *a: None)
     monkeypatch.setattr(watcher_mod, "format_death_comment", lambda *a: "")
@@ -261,6 +259,38 @@ def test_cleanup_returns_earliest_ts_across_deaths(project_dir, monkeypatch):
     assert ts == 1500000000.0
 
 
+def test_dead_developer_branch_deleted_after_worktree(project_dir, monkeypatch):
+    w = _blank_watcher()
+    agent = _dead_agent()
+    agent.worktree_path = "/wt/developer-x"
+    w.running = {"developer:PRJ-1": agent}
+    w.used_names = {"developer-x"}
+    _prime_cleanup(monkeypatch, w, "")
+    calls = []
+    monkeypatch.setattr(watcher_mod, "remove_worktree", lambda name: calls.append(("worktree", name)))
+    monkeypatch.setattr(watcher_mod, "delete_task_branch", lambda t: calls.append(("branch", t)))
+    w.cleanup_finished()
+    assert calls == [("worktree", "developer-x"), ("branch", "PRJ-1")]
+    assert w.used_names == set()
+
+
+def test_failed_branch_deletion_is_logged(project_dir, monkeypatch):
+    import subprocess
+    w = _blank_watcher()
+    w.running = {"developer:PRJ-1": _dead_agent()}
+    _prime_cleanup(monkeypatch, w, "")
+
+    def refuse(task_id):
+        raise subprocess.CalledProcessError(
+            1, ["git", "branch", "-D"], stderr="error: branch is checked out")
+
+    monkeypatch.setattr(watcher_mod, "delete_task_branch", refuse)
+    logged = []
+    monkeypatch.setattr(watcher_mod, "log", lambda msg, *a: logged.append(msg))
+    w.cleanup_finished()
+    assert any("Failed to tear down developer-x" in m and "checked out" in m for m in logged)
+
+
 def test_pause_running_agents_resets_active_task(project_dir, monkeypatch):
     import contextlib
     w = _blank_watcher()
@@ -273,14 +303,14 @@ def test_pause_running_agents_resets_active_task(project_dir, monkeypatch):
     w.running = {"developer:PRJ-3": agent}
     w.used_names = {"developer-z"}
     released, branches = [], []
-    monkeypatch.setattr(watcher_mod, "get_task_status", lambda t: "active")
     monkeypatch.setattr(watcher_mod, "get_db",
                         lambda: contextlib.nullcontext("DB"))
     monkeypatch.setattr(watcher_mod, "add_comment", lambda db, t, who, msg: None)
-    monkeypatch.setattr(watcher_mod, "release_task", lambda db, t: released.append(t))
+    monkeypatch.setattr(watcher_mod, "release_task",
+                        lambda db, t, expect_status: released.append((t, expect_status)))
     monkeypatch.setattr(watcher_mod, "delete_task_branch", lambda t: branches.append(t))
     monkeypatch.setattr(w, "save_state", lambda: None)
     w._pause_running_agents("Paused: quota limit reached")
-    assert released == ["PRJ-3"]
+    assert released == [("PRJ-3", "active")]
     assert branches == ["PRJ-3"]
     assert w.running == {}
@@ -0,0 +1,156 @@
+"""Tests for workers.py — keyed background jobs collected on the main thread."""
+
+import threading
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from debussy import workers
+
+
+@pytest.fixture
+def pool():
+    pool = workers.start(2)
+    yield pool
+    workers.stop()
+
+
+def _wait_finished(pool):
+    for _ in range(500):
+        if pool.has_finished():
+            return
+        time.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+
+def test_inline_without_pool():
+    seen = []
+    future = workers.submit("job", lambda x: x * 2, 21, on_done=lambda f: seen.append(f.result()))
+    assert future.result() == 42
+    assert seen == [42]
+    assert not workers.busy("job")
+
+
+def test_on_done_runs_on_collecting_thread(pool):
+    gate = threading.Event()
+    seen = []
+    workers.submit("job", gate.wait, 5,
+                   on_done=lambda f: seen.append(threading.current_thread()))
+    assert workers.busy("job")
+    assert workers.collect() == 0
+    gate.set()
+    _wait_finished(pool)
+    assert workers.collect() == 1
+    assert seen == [threading.main_thread()]
+    assert not workers.busy("job")
+
+
+def test_busy_prefix(pool):
+    gate = threading.Event()
+    workers.submit("teardown:bd-001:developer-bach", gate.wait, 5)
+    assert workers.busy_prefix("teardown:bd-001:")
+    assert not workers.busy_prefix("teardown:bd-002:")
+    gate.set()
+    _wait_finished(pool)
+    workers.collect()
+    assert not workers.busy_prefix("teardown:bd-001:")
+
+
+def test_same_key_joins_pending_job(pool):
+    gate = threading.Event()
+    calls = []
+
+    def job():
+        calls.append(1)
+        gate.wait(5)
+
+    first = workers.submit("job", job)
+    assert workers.submit("job", job) is first
+    gate.set()
+    _wait_finished(pool)
+    workers.collect()
+    assert calls == [1]
+
+
+def test_failures_are_logged(pool):
+    def boom():
+        raise OSError("remote hung up")
+
+    workers.submit("job", boom)
+    _wait_finished(pool)
+    with patch("debussy.workers.log") as mock_log:
+        workers.collect()
+    assert "remote hung up" in mock_log.call_args.args[0]
+
+
+def test_stop_waits_and_collects():
+    workers.start(1)
+    seen = []
+    workers.submit("job", lambda: "ok", on_done=lambda f: seen.append(f.result()))
+    workers.stop()
+    assert seen == ["ok"]
+    assert not workers.active()
+
+
+@patch("debussy.spawner.preflight_spawn", return_value=None)
+@patch("debussy.spawner.create_agent_worktree", return_value="/fake/wt")
+@patch("debussy.spawner.get_agent_name", return_value="developer-bach")
+@patch("debussy.spawner.get_config", return_value={})
+@patch("debussy.spawner._launch_agent")
+def test_spawn_prepares_worktree_on_pool(mock_launch, _cfg, _name, _wt, _pf, pool):
+    from debussy.spawner import spawn_agent
+
+    watcher = MagicMock()
+    watcher.running, watcher.starting = {}, {}
+    watcher.failures, watcher.spawn_counts = {}, {}
+    watcher.should_exit = False
+
+    assert spawn_agent(watcher, "developer", "bd-001", "development")
+    assert watcher.starting == {"developer:bd-001": "bd-001"}
+    _wait_finished(pool)
+    workers.collect()
+    assert watcher.starting == {}
+    assert mock_launch.call_args.args[-1] == "/fake/wt"
+
+
+def _spawn_watcher():
+    watcher = MagicMock()
+    watcher.running, watcher.starting = {}, {}
+    watcher.failures, watcher.spawn_counts = {}, {}
+    watcher.used_names, watcher.preflight_warned = set(), set()
+    watcher.should_exit = False
+    return watcher
+
+
+@patch("debussy.spawner.preflight_spawn")
+def test_spawn_waits_for_teardown_of_task(mock_preflight, pool):
+    from debussy.spawner import spawn_agent
+
+    gate = threading.Event()
+    workers.submit("teardown:bd-001:developer-bach", gate.wait, 5)
+    watcher = _spawn_watcher()
+    assert not spawn_agent(watcher, "developer", "bd-001", "development")
+    assert watcher.starting == {}
+    mock_preflight.assert_not_called()
+    gate.set()
+
+
+@patch("debussy.spawner.preflight_spawn", return_value="ref origin/feature/bd-001 not found")
+@patch("debussy.spawner.create_agent_worktree")
+@patch("debussy.spawner.get_agent_name", return_value="reviewer-bach")
+@patch("debussy.spawner._launch_agent")
+def test_spawn_runs_preflight_on_pool(mock_launch, _name, mock_wt, mock_preflight, pool):
+    from debussy.spawner import spawn_agent
+
+    watcher = _spawn_watcher()
+    watcher.used_names.add("reviewer-bach")
+    assert spawn_agent(watcher, "reviewer", "bd-001", "review")
+    _wait_finished(pool)
+    assert mock_preflight.call_args.args == ("reviewer", "bd-001")
+    assert watcher.failures == {}
+    workers.collect()
+    assert watcher.failures == {"bd-001": 1}
+    assert "reviewer-bach" not in watcher.used_names
+    mock_wt.assert_not_called()
+    mock_launch.assert_not_called()
@@ -7,9 +7,12 @@ from unittest.mock import patch
 
 import pytest
 
+from debussy.takt import create_task, get_db, init_db, update_task
+from debussy.takt.archive import archive_tasks
 from debussy.worktree import (
     WORKTREES_DIR,
     _branch_exists,
+    _get_done_task_ids,
     _remove_symlinks,
     _symlink_dirs,
     _worktree_path,
@@ -202,6 +205,14 @@ class TestDeleteTaskBranch:
         assert not wt.exists()
         assert not _branch_exists("feature/TST-11")
 
+    def test_raises_when_git_refuses(self, git_repo, tmp_path):
+        # Checked out outside .debussy/worktrees, so it is not removed first.
+        _git(git_repo, "worktree", "add", "-b", "feature/TST-12",
+             str(tmp_path / "elsewhere"), "master")
+        with pytest.raises(subprocess.CalledProcessError):
+            delete_task_branch("TST-12")
+        assert _branch_exists("feature/TST-12")
+
 
 # --- _branch_exists ---
 
@@ -329,3 +340,19 @@ class TestWorktreeLifecycle:
 
         assert active.exists()
         assert not stale.exists()
+
+
+class TestDoneTaskIds:
+    def test_reads_main_and_archived_tasks(self, git_repo):
+        shutil.rmtree(git_repo / ".takt")
+        init_db(git_repo)
+        with get_db(git_repo) as db:
+            done, archived, pending = (create_task(db, t)["id"] for t in "ABC")
+            for task_id in (done, archived):
+                update_task(db, task_id, stage="done")
+            db.execute(
+                "UPDATE tasks SET updated_at = updated_at - 30 * 86400000 WHERE id = ?",
+                (archived,),
+            )
+            assert archive_tasks(db) == 1
+        assert _get_done_task_ids([done, archived, pending, "ZZZ-9"]) == {done, archived}